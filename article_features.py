@@ -0,0 +1,62 @@
+from typing import Dict, FrozenSet, List
+
+from keyword_matcher import KeywordMatcher
+
+
+class ArticleFeatures:
+    """单篇文章的特征记录：一次扫描得到的各指示词分组命中情况
+    
+    hits 为 分组名 -> 命中的关键词下标集合，title_groups 为在标题中有命中的分组。
+    筛选和总结规则都只查询这份记录，不再重复扫描文本。
+    """
+    
+    __slots__ = ('hits', 'title_groups')
+    
+    def __init__(self, hits: Dict[str, FrozenSet[int]], title_groups: FrozenSet[str]):
+        self.hits = hits
+        self.title_groups = title_groups
+    
+    def has(self, group: str) -> bool:
+        """文章中是否出现该分组的任一指示词"""
+        return group in self.hits
+    
+    def count(self, group: str) -> int:
+        """文章中出现了该分组的多少个不同指示词"""
+        return len(self.hits.get(group, ()))
+    
+    def in_title(self, group: str) -> bool:
+        """标题中是否出现该分组的任一指示词"""
+        return group in self.title_groups
+    
+    def matched(self, group: str) -> List[int]:
+        """该分组中命中的指示词下标（按词表顺序）"""
+        return sorted(self.hits.get(group, ()))
+
+
+class FeatureExtractor:
+    """特征提取器：所有规则用到的指示词编译成一个匹配器，每篇文章只扫描一次"""
+    
+    def __init__(self, groups: Dict[str, List[str]]):
+        # groups: 分组名 -> 指示词列表（匹配不区分大小写）
+        self.matcher = KeywordMatcher(groups)
+    
+    def extract(self, title: str, summary: str) -> ArticleFeatures:
+        """扫描 "标题 摘要"，返回特征记录"""
+        content_lower = f"{title} {summary}".lower()
+        title_length = len(title.lower())
+        
+        hits = {}
+        title_groups = set()
+        for end, group, index in self.matcher.search(content_lower):
+            hits.setdefault(group, set()).add(index)
+            if end < title_length:
+                title_groups.add(group)
+        
+        return ArticleFeatures(
+            {group: frozenset(indexes) for group, indexes in hits.items()},
+            frozenset(title_groups)
+        )
+    
+    def keyword(self, group: str, index: int) -> str:
+        """根据命中下标取回原始指示词"""
+        return self.matcher.keyword(group, index)
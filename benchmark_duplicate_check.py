@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+去重检查基准
+对比三种判断批次文章是否已入库的方式在不同历史规模下的耗时：
+  full  原实现：读出全部 content_hash 建集合再查找
+  in    分块 IN 查询，只按唯一索引探测本批次的哈希
+  temp  批次哈希写入临时表后与唯一索引连接
+用法: python benchmark_duplicate_check.py [历史行数 ...]（默认 10000 1000000 10000000）
+
+参考结果（单核虚拟机，SQLite 3.40，毫秒/批次，批次中一半已入库）：
+  历史行数   批次      full       in     temp
+  10k        100        8.6     0.19     0.32
+  10k        1000       9.0     2.1      3.4
+  10k        10000     10.8    21.3     39.4
+  10k        100000    27.3   186      449
+  1M         100        979     0.22     0.21
+  1M         1000      1036     2.7      4.8
+  1M         10000      843    50.7     61.7
+  1M         100000    1057   385      497
+  10M        100      12952     0.16     0.23
+  10M        1000     12995     5.3      6.4
+  10M        10000    11793    60.0     75.7
+  10M        100000   13014   722      762
+分界点：full 的耗时随历史行数线性增长，探测方式只随批次大小增长，批次超过历史行数的
+1/4～1/2 时 full 才更快（一万行历史约五千篇，百万行历史约二三十万篇）。实际每次抓取只有
+几百篇，探测始终快几个数量级。临时表连接在各规模下与 IN 查询持平或更慢（多了写临时表的开销），
+因此 NewsDatabase.find_existing_hashes 只使用分块 IN 查询。
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import NewsDatabase
+
+BATCH_SIZES = [100, 1000, 10000, 100000]
+REPEAT = 3
+
+
+def grow(database: NewsDatabase, rows: int):
+    """用随机哈希把 articles 表补足到指定行数"""
+    with database._get_connection() as conn:
+        current = conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        conn.execute('''
+            WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+            INSERT INTO articles (title, link, content_hash)
+            SELECT 'title ' || i, 'https://example.com/' || i, lower(hex(randomblob(16))) FROM n
+        ''', (current, rows))
+        conn.commit()
+
+
+def make_batch(database: NewsDatabase, size: int) -> list:
+    """构造一个批次：一半为已入库文章的哈希，一半为新哈希"""
+    with database._get_connection() as conn:
+        stored = [row[0] for row in conn.execute(
+            'SELECT content_hash FROM articles WHERE id IN (SELECT abs(random()) % (SELECT MAX(id) FROM articles) + 1 '
+            'FROM articles LIMIT ?)', (size // 2,)
+        )]
+    fresh = ['%032x' % random.getrandbits(128) for _ in range(size - len(stored))]
+    batch = stored + fresh
+    random.shuffle(batch)
+    return batch
+
+
+def full_scan(database: NewsDatabase, batch: list) -> set:
+    """原实现：读出全部哈希"""
+    with database._get_connection() as conn:
+        existing_hashes = {row[0] for row in conn.execute('SELECT content_hash FROM articles')}
+    return {content_hash for content_hash in batch if content_hash in existing_hashes}
+
+
+def probe_temp(database: NewsDatabase, batch: list) -> set:
+    """批次哈希写入临时表后与唯一索引连接"""
+    with database._get_connection() as conn:
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS probe_hashes (content_hash TEXT PRIMARY KEY) WITHOUT ROWID')
+        conn.execute('DELETE FROM probe_hashes')
+        conn.executemany('INSERT OR IGNORE INTO probe_hashes (content_hash) VALUES (?)',
+                         [(content_hash,) for content_hash in batch])
+        return {row[0] for row in conn.execute(
+            'SELECT p.content_hash FROM probe_hashes p JOIN articles a ON a.content_hash = p.content_hash'
+        )}
+
+
+def best_time(func, *args) -> float:
+    """多次运行取最短耗时（毫秒）"""
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    row_counts = [int(arg) for arg in sys.argv[1:]] or [10000, 1000000, 10000000]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = os.path.join(temp_dir, 'config.ini')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            f.write(f"[database]\ndb_path = {os.path.join(temp_dir, 'benchmark.db')}\n")
+        database = NewsDatabase(config_file)
+
+        print("单位：毫秒/批次")
+        print(f"{'历史行数':<10}{'批次':>8}{'full':>10}{'in':>10}{'temp':>10}")
+        for rows in sorted(row_counts):
+            grow(database, rows)
+            for size in BATCH_SIZES:
+                batch = make_batch(database, size)
+                expected = full_scan(database, batch)
+                assert database.find_existing_hashes(batch) == expected == probe_temp(database, batch)
+                print(f"{rows:<10}{size:>8}{best_time(full_scan, database, batch):>10.2f}"
+                      f"{best_time(database.find_existing_hashes, batch):>10.2f}"
+                      f"{best_time(probe_temp, database, batch):>10.2f}")
+
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
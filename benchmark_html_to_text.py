@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+摘要提取微基准
+对比 BeautifulSoup 与 html_to_text 在典型RSS摘要上的耗时，并检查两者提取的文字一致（忽略空白）
+用法: python benchmark_html_to_text.py [重复次数] [RSS文件 ...]
+传入保存下来的RSS文件时，用其中每个条目的 description 作为样本，在真实输入上测量
+"""
+
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from news_scraper import html_to_text, iter_fast_entries
+
+# arXiv 摘要：纯文本为主，较长
+ARXIV_SUMMARY = (
+    "arXiv:2410.01234v1 Announce Type: new \n"
+    "Abstract: Large language models (LLMs) have demonstrated remarkable capabilities "
+    "across a wide range of natural language processing tasks. However, their reasoning "
+    "ability on multi-step problems remains limited. In this paper, we propose a novel "
+    "framework that combines chain-of-thought prompting with reinforcement learning from "
+    "verifier feedback. Our approach achieves state-of-the-art results on GSM8K, MATH and "
+    "ARC-Challenge, outperforming strong baselines by 4.2% on average. We further analyze "
+    "the scaling behavior of the method and show that smaller models benefit the most. "
+) * 3
+
+# 36氪摘要：HTML标签、实体和图片较多
+KR36_SUMMARY = (
+    '<p><img src="https://img.36krcdn.com/20241018/v2_abc.jpg" alt="" /></p>'
+    '<p>36氪获悉，AI大模型公司&ldquo;月之暗面&rdquo;近日完成新一轮融资，'
+    '投资方包括&nbsp;<strong>腾讯</strong>、<a href="https://36kr.com">阿里巴巴</a>等。</p>'
+    '<p>据悉，本轮融资将主要用于<em>大模型</em>训练与产品研发，&nbsp;'
+    '公司旗下智能助手Kimi的月活跃用户已突破千万。</p>'
+    '<blockquote><p>&ldquo;我们相信长文本是通往AGI的关键一步。&rdquo;</p></blockquote>'
+) * 6
+
+# rss.arxiv.org 条目的 description 原样格式（arXiv:1706.03762 的摘要原文）
+ARXIV_FEED_SUMMARY = (
+    "arXiv:1706.03762v7 Announce Type: replace \n"
+    "Abstract: The dominant sequence transduction models are based on complex recurrent or convolutional "
+    "neural networks in an encoder-decoder configuration. The best performing models also connect the "
+    "encoder and decoder through an attention mechanism. We propose a new simple network architecture, "
+    "the Transformer, based solely on attention mechanisms, dispensing with recurrence and convolutions "
+    "entirely. Experiments on two machine translation tasks show these models to be superior in quality "
+    "while being more parallelizable and requiring significantly less time to train. Our model achieves "
+    "28.4 BLEU on the WMT 2014 English-to-German translation task, improving over the existing best "
+    "results, including ensembles by over 2 BLEU. On the WMT 2014 English-to-French translation task, our "
+    "model establishes a new single-model state-of-the-art BLEU score of 41.8 after training for 3.5 days "
+    "on eight GPUs, a small fraction of the training costs of the best models from the literature. We "
+    "show that the Transformer generalizes well to other tasks by applying it successfully to English "
+    "constituency parsing both with large and limited training data."
+)
+
+# 36kr.com/feed 条目的 description 原样格式：编者按、带尺寸属性和图片处理参数的配图、加粗小标题、外链
+KR36_FEED_SUMMARY = (
+    '<p>编者按：本文来自微信公众号 <a href="https://mp.weixin.qq.com/s/AbCdEf123" rel="noopener noreferrer" '
+    'target="_blank">智能涌现（ID：AIEmergence）</a>，作者：周鑫雨，编辑：苏建勋，36氪经授权发布。</p>'
+    '<p>文｜周鑫雨</p><p>编辑｜苏建勋</p>'
+    '<p class="image-wrapper"><img data-img-size-val="1080,720" src="https://img.36krcdn.com/hsossms/'
+    '20241018/v2_5f1c2e8a7d3b4c6e9a0f1b2c3d4e5f60@000000_oswg86421oswg1080oswg720_img_000'
+    '?x-oss-process=image/format,jpg/interlace,1" /></p>'
+    '<p>2024年10月，大模型赛道的融资节奏明显放缓。据<strong>「智能涌现」</strong>了解，多家头部公司'
+    '正在将资源从基座模型训练转向应用落地，&ldquo;烧钱换参数&rdquo;的阶段正在过去。</p>'
+    '<h2><strong>01 从参数竞赛到应用竞赛</strong></h2>'
+    '<p>一位投资人告诉「智能涌现」，今年下半年以来，投资机构在尽调时更关注模型的推理成本和'
+    '付费用户留存，而不是榜单排名。&nbsp;</p>'
+    '<p>以月之暗面为例，Kimi智能助手在长文本之外陆续上线了搜索、&ldquo;探索版&rdquo;等功能，'
+    '用户侧的打磨正在成为新的竞争焦点。</p>'
+    '<p class="image-wrapper"><img data-img-size-val="1280,853" src="https://img.36krcdn.com/hsossms/'
+    '20241018/v2_0a9b8c7d6e5f4a3b2c1d0e9f8a7b6c5d@000000_oswg124580oswg1280oswg853_img_000'
+    '?x-oss-process=image/format,jpg/interlace,1" /></p>'
+    '<p>图源：视觉中国</p>'
+)
+
+SAMPLES = {'arxiv': ARXIV_SUMMARY, '36kr': KR36_SUMMARY,
+           'arxiv_feed': ARXIV_FEED_SUMMARY, '36kr_feed': KR36_FEED_SUMMARY}
+
+
+def bs4_summary(text: str) -> str:
+    """原实现：完整构建DOM后取文本"""
+    return BeautifulSoup(text, 'html.parser').get_text().strip()[:300] + "..."
+
+
+def fast_summary(text: str) -> str:
+    """新实现：凑够300个字符即停止扫描"""
+    return html_to_text(text, 300) + "..."
+
+
+def same_text(text: str) -> bool:
+    """html_to_text 提取的文字（忽略空白）是 BeautifulSoup 全文的前缀"""
+    fast = ''.join(html_to_text(text, 300).split())
+    return ''.join(BeautifulSoup(text, 'html.parser').get_text().split()).startswith(fast)
+
+
+def load_feed_samples(paths: list) -> dict:
+    """读取保存下来的RSS文件，每个条目的 description 作为一个样本"""
+    samples = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        for index, (_, _, summary_html, _, _) in enumerate(iter_fast_entries(content)):
+            if summary_html:
+                samples[f'{name}#{index}'] = summary_html
+    return samples
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    samples = load_feed_samples(sys.argv[2:]) or SAMPLES
+    print(f"每个样本重复 {number} 次，单位：微秒/条")
+    print(f"{'样本':<12}{'长度':>8}{'bs4':>12}{'html_to_text':>16}{'加速比':>10}{'文字一致':>10}")
+    for name, text in samples.items():
+        slow = timeit.timeit(lambda: bs4_summary(text), number=number) / number * 1e6
+        fast = timeit.timeit(lambda: fast_summary(text), number=number) / number * 1e6
+        print(f"{name:<12}{len(text):>8}{slow:>12.1f}{fast:>16.1f}{slow / fast:>9.1f}x"
+              f"{'是' if same_text(text) else '否':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
 import sqlite3
 import logging
-from typing import List, Dict, Set
+import threading
+from typing import List, Dict, Set, Tuple
 from datetime import datetime, timedelta
 import configparser
 import hashlib
+import json
+import statistics
+
+
+# 分块 IN 查询时每条语句的参数个数（低于旧版SQLite的999个参数上限）
+HASH_PROBE_CHUNK_SIZE = 500
+
+
+def compute_content_hash(title: str, link: str) -> str:
+    """生成内容哈希值用于去重（标题+链接的MD5，抓取解析时即计算并随文章传递）"""
+    return hashlib.md5(f"{title}{link}".encode('utf-8')).hexdigest()
+
 
 class NewsDatabase:
     """新闻数据库管理器"""
@@ -15,13 +28,63 @@ class NewsDatabase:
         self.db_path = self.config.get('database', 'db_path', fallback='ai_news.db')
         self.logger = logging.getLogger(__name__)
         
+        # 连接参数：WAL模式下读写互不阻塞，synchronous=NORMAL 只在检查点时fsync
+        self.journal_mode = self.config.get('database', 'journal_mode', fallback='WAL')
+        self.synchronous = self.config.get('database', 'synchronous', fallback='NORMAL')
+        self.cache_size_kb = int(self.config.get('database', 'cache_size_kb', fallback='8192'))
+        self.mmap_size = int(self.config.get('database', 'mmap_size', fallback='67108864'))
+        self.statement_cache_size = int(self.config.get('database', 'statement_cache_size', fallback='256'))
+        self.busy_timeout = float(self.config.get('database', 'busy_timeout', fallback='30'))
+        
+        # 每个线程一条长连接（Kivy界面线程、调度线程、抓取线程池各自复用），close() 时统一关闭
+        self._local = threading.local()
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        
         # 初始化数据库
         self.init_database()
     
+    def _get_connection(self) -> sqlite3.Connection:
+        """返回当前线程的长连接，首次使用时创建并设置PRAGMA
+        
+        连接仍按 `with conn:` 使用：代码块结束时提交，出错时回滚。
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                               cached_statements=self.statement_cache_size, check_same_thread=False)
+        conn.execute(f'PRAGMA journal_mode={self.journal_mode}')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        # 负数表示以KB为单位
+        conn.execute(f'PRAGMA cache_size={-self.cache_size_kb}')
+        conn.execute(f'PRAGMA mmap_size={self.mmap_size}')
+        self._local.conn = conn
+        
+        with self._connections_lock:
+            # 关闭已退出线程留下的连接（每次抓取的线程池都是新建的）
+            for thread in [t for t in self._connections if not t.is_alive()]:
+                self._connections.pop(thread).close()
+            self._connections[threading.current_thread()] = conn
+        return conn
+    
+    def close(self):
+        """关闭所有线程的数据库连接"""
+        with self._connections_lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    self.logger.error(f"关闭数据库连接失败: {str(e)}")
+            self._connections.clear()
+        # 其他线程再次访问时会重新建立连接
+        self._local = threading.local()
+    
     def init_database(self):
         """初始化数据库表"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 创建文章表
@@ -38,7 +101,11 @@ class NewsDatabase:
                         is_sent INTEGER DEFAULT 0,
                         sent_date DATETIME,
                         detected_keywords TEXT,
-                        ai_summary TEXT
+                        ai_summary TEXT,
+                        related_sources TEXT,
+                        label INTEGER,
+                        insight_code TEXT,
+                        value_tier INTEGER
                     )
                 ''')
                 
@@ -50,6 +117,28 @@ class NewsDatabase:
                     # 字段已存在，忽略错误
                     pass
                 
+                # 添加合并来源字段（如果表已存在）
+                try:
+                    cursor.execute('ALTER TABLE articles ADD COLUMN related_sources TEXT')
+                except sqlite3.OperationalError:
+                    # 字段已存在，忽略错误
+                    pass
+                
+                # 添加人工标注字段（如果表已存在）：1 相关，0 不相关，NULL 未标注，用于训练相关性模型
+                try:
+                    cursor.execute('ALTER TABLE articles ADD COLUMN label INTEGER')
+                except sqlite3.OperationalError:
+                    # 字段已存在，忽略错误
+                    pass
+                
+                # 添加结构化总结字段（如果表已存在）：核心亮点编码、价值等级，显示时再渲染为文字
+                try:
+                    cursor.execute('ALTER TABLE articles ADD COLUMN insight_code TEXT')
+                    cursor.execute('ALTER TABLE articles ADD COLUMN value_tier INTEGER')
+                except sqlite3.OperationalError:
+                    # 字段已存在，忽略错误
+                    pass
+                
                 # 创建发送记录表
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS send_logs (
@@ -61,10 +150,103 @@ class NewsDatabase:
                     )
                 ''')
                 
+                # 创建RSS源状态表（条件请求校验值、已处理条目的高水位）
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS feed_state (
+                        source TEXT PRIMARY KEY,
+                        url TEXT NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        last_entry_id TEXT,
+                        last_published DATETIME,
+                        consecutive_failures INTEGER DEFAULT 0,
+                        circuit_open_until DATETIME,
+                        recent_latencies TEXT,
+                        feed_url TEXT,
+                        feed_url_checked DATETIME,
+                        updated_date DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # 添加高水位字段（如果表已存在）
+                try:
+                    cursor.execute('ALTER TABLE feed_state ADD COLUMN last_entry_id TEXT')
+                    cursor.execute('ALTER TABLE feed_state ADD COLUMN last_published DATETIME')
+                except sqlite3.OperationalError:
+                    # 字段已存在，忽略错误
+                    pass
+                
+                # 添加健康状态字段（如果表已存在）
+                try:
+                    cursor.execute('ALTER TABLE feed_state ADD COLUMN consecutive_failures INTEGER DEFAULT 0')
+                    cursor.execute('ALTER TABLE feed_state ADD COLUMN circuit_open_until DATETIME')
+                    cursor.execute('ALTER TABLE feed_state ADD COLUMN recent_latencies TEXT')
+                except sqlite3.OperationalError:
+                    # 字段已存在，忽略错误
+                    pass
+                
+                # 添加自动发现字段（如果表已存在）
+                try:
+                    cursor.execute('ALTER TABLE feed_state ADD COLUMN feed_url TEXT')
+                    cursor.execute('ALTER TABLE feed_state ADD COLUMN feed_url_checked DATETIME')
+                except sqlite3.OperationalError:
+                    # 字段已存在，忽略错误
+                    pass
+                
+                # 创建RSS原始内容缓存表（响应体哈希 -> 解析结果）
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS feed_cache (
+                        source TEXT PRIMARY KEY,
+                        body_hash TEXT NOT NULL,
+                        articles TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        cached_date DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # 创建已处理文章表（抓取后处理过的所有文章，包括未通过筛选的，用于抓取后立即去重）
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS seen_articles (
+                        content_hash TEXT PRIMARY KEY,
+                        seen_date DATETIME NOT NULL,
+                        source TEXT,
+                        published_date DATETIME
+                    ) WITHOUT ROWID
+                ''')
+                
+                # 添加来源和发布时间字段（如果表已存在）：记录每个来源所有条目的发布时间，用于估算发布间隔
+                try:
+                    cursor.execute('ALTER TABLE seen_articles ADD COLUMN source TEXT')
+                    cursor.execute('ALTER TABLE seen_articles ADD COLUMN published_date DATETIME')
+                except sqlite3.OperationalError:
+                    # 字段已存在，忽略错误
+                    pass
+                
+                # 创建近似重复索引表（MinHash签名，以及签名分段键 -> 文章的LSH分桶）
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS story_signatures (
+                        content_hash TEXT PRIMARY KEY,
+                        signature BLOB NOT NULL,
+                        indexed_date DATETIME NOT NULL
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS story_bands (
+                        band_key INTEGER NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        indexed_date DATETIME NOT NULL,
+                        PRIMARY KEY (band_key, content_hash)
+                    ) WITHOUT ROWID
+                ''')
+                
                 # 创建索引
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_hash ON articles(content_hash)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_published_date ON articles(published_date)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_is_sent ON articles(is_sent)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_value_tier ON articles(value_tier)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_seen_date ON seen_articles(seen_date)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_story_signatures_date ON story_signatures(indexed_date)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_story_bands_date ON story_bands(indexed_date)')
                 
                 conn.commit()
                 self.logger.info("数据库初始化完成")
@@ -74,71 +256,70 @@ class NewsDatabase:
     
     def generate_content_hash(self, title: str, link: str) -> str:
         """生成内容哈希值用于去重"""
-        content = f"{title}{link}"
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+        return compute_content_hash(title, link)
     
-    def add_articles(self, articles: List[Dict]) -> int:
-        """批量添加文章，返回新增文章数量"""
-        new_articles_count = 0
+    def article_hash(self, article: Dict) -> str:
+        """返回文章的content_hash，没有时计算一次并保存在文章字典中，后续阶段直接复用"""
+        content_hash = article.get('content_hash')
+        if not isinstance(content_hash, str):
+            content_hash = article['content_hash'] = compute_content_hash(article['title'], article['link'])
+        return content_hash
+    
+    def add_articles(self, articles: List[Dict], raise_errors: bool = False) -> int:
+        """批量添加文章，返回新增文章数量
         
+        在一个事务中用 executemany 执行 INSERT OR IGNORE，content_hash 或链接已存在的文章
+        由唯一约束跳过，新增数量从连接的 total_changes 读取。
+        raise_errors 为 True 时写入失败（如数据库一直被锁定）抛出异常，而不是记录日志后返回0。
+        """
+        rows = []
+        for article in articles:
+            try:
+                # 提取关键词和总结（新文章只有编码字段，ai_summary 仅兼容旧调用方）
+                detected_keywords = ','.join(article.get('detected_keywords') or [])
+                ai_summary = article.get('ai_summary') or None
+                
+                # 近似重复合并进来的其他来源
+                related_sources = None
+                if article.get('related_sources'):
+                    related_sources = json.dumps(article['related_sources'], ensure_ascii=False)
+                
+                rows.append((
+                    article['title'],
+                    article['link'],
+                    article['summary'],
+                    article['source'],
+                    article['published'],
+                    self.article_hash(article),
+                    detected_keywords,
+                    ai_summary,
+                    related_sources,
+                    article.get('insight_code'),
+                    article.get('value_tier')
+                ))
+            except Exception as e:
+                self.logger.error(f"添加文章失败: {str(e)}")
+        
+        new_articles_count = 0
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for article in articles:
-                    try:
-                        # 生成内容哈希
-                        content_hash = self.generate_content_hash(
-                            article['title'], 
-                            article['link']
-                        )
-                        
-                        # 检查是否已存在
-                        cursor.execute(
-                            'SELECT id FROM articles WHERE content_hash = ?',
-                            (content_hash,)
-                        )
-                        
-                        if cursor.fetchone() is None:
-                            # 提取关键词和总结
-                            detected_keywords = ''
-                            ai_summary = ''
-                            
-                            if 'detected_keywords' in article:
-                                detected_keywords = ','.join(article['detected_keywords']) if article['detected_keywords'] else ''
-                            
-                            if 'ai_summary' in article:
-                                ai_summary = article['ai_summary'] or ''
-                            
-                            # 插入新文章
-                            cursor.execute('''
-                                INSERT INTO articles 
-                                (title, link, summary, source, published_date, content_hash, detected_keywords, ai_summary)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                article['title'],
-                                article['link'], 
-                                article['summary'],
-                                article['source'],
-                                article['published'],
-                                content_hash,
-                                detected_keywords,
-                                ai_summary
-                            ))
-                            new_articles_count += 1
-                            
-                    except sqlite3.IntegrityError:
-                        # 重复文章，跳过
-                        continue
-                    except Exception as e:
-                        self.logger.error(f"添加文章失败: {str(e)}")
-                        continue
-                
+            with self._get_connection() as conn:
+                changes_before = conn.total_changes
+                conn.executemany('''
+                    INSERT OR IGNORE INTO articles
+                    (title, link, summary, source, published_date, content_hash, detected_keywords, ai_summary,
+                     related_sources, insight_code, value_tier)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                new_articles_count = conn.total_changes - changes_before
                 conn.commit()
-                self.logger.info(f"成功添加 {new_articles_count} 篇新文章")
-                
+            
+            self.logger.info(f"成功添加 {new_articles_count} 篇新文章")
+        
         except Exception as e:
+            new_articles_count = 0  # 事务已回滚
             self.logger.error(f"批量添加文章失败: {str(e)}")
+            if raise_errors:
+                raise
         
         return new_articles_count
     
@@ -147,11 +328,12 @@ class NewsDatabase:
         articles = []
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 query = '''
-                    SELECT id, title, link, summary, source, published_date, content_hash, detected_keywords, ai_summary
+                    SELECT id, title, link, summary, source, published_date, content_hash, detected_keywords, ai_summary,
+                           related_sources, insight_code, value_tier
                     FROM articles 
                     WHERE is_sent = 0
                     ORDER BY published_date DESC
@@ -178,7 +360,10 @@ class NewsDatabase:
                         'published': datetime.fromisoformat(row[5]) if row[5] else None,
                         'content_hash': row[6],
                         'detected_keywords': detected_keywords,
-                        'ai_summary': row[8] or ''  # ai_summary 字段
+                        'ai_summary': row[8] or '',  # ai_summary 字段
+                        'related_sources': json.loads(row[9]) if row[9] else [],
+                        'insight_code': row[10],
+                        'value_tier': row[11]
                     })
                     
         except Exception as e:
@@ -189,7 +374,7 @@ class NewsDatabase:
     def mark_articles_as_sent(self, article_ids: List[int]) -> bool:
         """标记文章为已发送"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 placeholders = ','.join(['?'] * len(article_ids))
@@ -207,10 +392,44 @@ class NewsDatabase:
             self.logger.error(f"标记文章为已发送失败: {str(e)}")
             return False
     
+    def set_article_label(self, article_id: int, label: int | None) -> bool:
+        """标注文章是否相关（1 相关，0 不相关，None 取消标注）"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('UPDATE articles SET label = ? WHERE id = ?', (label, article_id))
+                conn.commit()
+                return cursor.rowcount > 0
+                
+        except Exception as e:
+            self.logger.error(f"标注文章失败: {str(e)}")
+            return False
+    
+    def get_labeled_articles(self) -> List[Dict]:
+        """获取已标注的文章（用于离线训练相关性模型）"""
+        articles = []
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT title, summary, label FROM articles
+                    WHERE label IS NOT NULL
+                    ORDER BY id
+                ''')
+                
+                for row in cursor.fetchall():
+                    articles.append({'title': row[0], 'summary': row[1] or '', 'label': row[2]})
+                    
+        except Exception as e:
+            self.logger.error(f"获取已标注文章失败: {str(e)}")
+        
+        return articles
+    
     def log_send_result(self, article_count: int, success: bool, error_message: str | None = None):
         """记录发送结果"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -228,7 +447,7 @@ class NewsDatabase:
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 删除旧的已发送文章
@@ -238,6 +457,9 @@ class NewsDatabase:
                 ''', (cutoff_date.isoformat(),))
                 
                 deleted_count = cursor.rowcount
+                
+                # 删除过期的已处理记录（早已超出抓取窗口，不会再出现在RSS中）
+                cursor.execute('DELETE FROM seen_articles WHERE seen_date < ?', (cutoff_date.isoformat(),))
                 conn.commit()
                 
                 self.logger.info(f"清理了 {deleted_count} 篇旧文章")
@@ -245,23 +467,30 @@ class NewsDatabase:
         except Exception as e:
             self.logger.error(f"清理旧文章失败: {str(e)}")
     
-    def get_recent_articles(self, limit: int = 20) -> List[Dict]:
-        """获取最近的文章（包括已发送和未发送）"""
+    def get_recent_articles(self, limit: int = 20, min_value_tier: int | None = None) -> List[Dict]:
+        """获取最近的文章（包括已发送和未发送），min_value_tier 为只返回该价值等级及以上的文章"""
         articles = []
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 query = '''
                     SELECT id, title, link, summary, source, published_date, 
-                           scraped_date, is_sent, detected_keywords, ai_summary
+                           scraped_date, is_sent, detected_keywords, ai_summary, insight_code, value_tier
                     FROM articles 
-                    ORDER BY scraped_date DESC
-                    LIMIT ?
                 '''
+                params = []
+                
+                # 按价值等级筛选（走 value_tier 索引）
+                if min_value_tier is not None:
+                    query += ' WHERE value_tier >= ?'
+                    params.append(min_value_tier)
                 
-                cursor.execute(query, (limit,))
+                query += ' ORDER BY scraped_date DESC LIMIT ?'
+                params.append(limit)
+                
+                cursor.execute(query, params)
                 rows = cursor.fetchall()
                 
                 for row in rows:
@@ -289,7 +518,9 @@ class NewsDatabase:
                         'scraped_date': row[6],
                         'is_sent': bool(row[7]),
                         'detected_keywords': ', '.join(detected_keywords) if detected_keywords else '',
-                        'ai_summary': row[9] or ''
+                        'ai_summary': row[9] or '',
+                        'insight_code': row[10],
+                        'value_tier': row[11]
                     })
                     
         except Exception as e:
@@ -302,7 +533,7 @@ class NewsDatabase:
         stats = {}
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 总文章数
@@ -336,25 +567,391 @@ class NewsDatabase:
         
         return stats
     
-    def get_duplicate_check_results(self, articles: List[Dict]) -> List[Dict]:
-        """检查文章重复并返回去重后的结果"""
-        unique_articles = []
-        existing_hashes = set()
+    def get_source_publish_intervals(self, days: int = 14, min_samples: int = 3) -> Dict[str, float]:
+        """根据最近的发布时间历史估算各来源的发布间隔（小时，取相邻文章间隔的中位数）
+        
+        发布时间取自已处理记录（抓取到的所有条目，包括未通过关键词筛选和被合并的），
+        反映来源真实的发布频率；升级前入库的文章也计入。
+        """
+        intervals = {}
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            cutoff_date = datetime.now() - timedelta(days=days)
+            
+            with self._get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # 获取已存在的哈希值
-                cursor.execute('SELECT content_hash FROM articles')
-                existing_hashes = set(row[0] for row in cursor.fetchall())
+                cursor.execute('''
+                    SELECT source, published_date
+                    FROM seen_articles
+                    WHERE seen_date >= ? AND published_date >= ?
+                    UNION
+                    SELECT source, published_date
+                    FROM articles
+                    WHERE published_date >= ?
+                    ORDER BY source, published_date
+                ''', (cutoff_date.isoformat(), cutoff_date.isoformat(' '), cutoff_date.isoformat(' ')))
+                rows = cursor.fetchall()
+            
+            publish_times = {}
+            for source, published_date in rows:
+                if published_date:
+                    publish_times.setdefault(source, []).append(datetime.fromisoformat(published_date))
+            
+            for source, times in publish_times.items():
+                gaps = [
+                    (later - earlier).total_seconds() / 3600
+                    for earlier, later in zip(times, times[1:])
+                    if later > earlier
+                ]
+                if len(gaps) >= min_samples:
+                    intervals[source] = statistics.median(gaps)
+                    
+        except Exception as e:
+            self.logger.error(f"估算来源发布间隔失败: {str(e)}")
+        
+        return intervals
+    
+    # feed_state 表中允许更新的字段
+    FEED_STATE_FIELDS = (
+        'etag', 'last_modified', 'last_entry_id', 'last_published',
+        'consecutive_failures', 'circuit_open_until', 'recent_latencies',
+        'feed_url', 'feed_url_checked'
+    )
+    
+    def get_feed_states(self) -> Dict[str, Dict]:
+        """获取所有RSS源的状态（条件请求校验值、高水位、健康状态、自动发现结果），按源名称索引"""
+        states = {}
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
                 
-            # 过滤重复文章
+                cursor.execute('''
+                    SELECT source, url, etag, last_modified, last_entry_id, last_published,
+                           consecutive_failures, circuit_open_until, recent_latencies,
+                           feed_url, feed_url_checked
+                    FROM feed_state
+                ''')
+                for row in cursor.fetchall():
+                    states[row[0]] = {
+                        'url': row[1],
+                        'etag': row[2],
+                        'last_modified': row[3],
+                        'last_entry_id': row[4],
+                        'last_published': datetime.fromisoformat(row[5]) if row[5] else None,
+                        'consecutive_failures': row[6] or 0,
+                        'circuit_open_until': datetime.fromisoformat(row[7]) if row[7] else None,
+                        'recent_latencies': [float(x) for x in row[8].split(',')] if row[8] else [],
+                        'feed_url': row[9],
+                        'feed_url_checked': datetime.fromisoformat(row[10]) if row[10] else None
+                    }
+                    
+        except Exception as e:
+            self.logger.error(f"获取RSS源状态失败: {str(e)}")
+        
+        return states
+    
+    def update_feed_state(self, source: str, url: str, **fields):
+        """更新RSS源状态，只写入传入的字段（见 FEED_STATE_FIELDS）"""
+        unknown = set(fields) - set(self.FEED_STATE_FIELDS)
+        if unknown:
+            raise ValueError(f"未知的RSS源状态字段: {', '.join(sorted(unknown))}")
+        
+        try:
+            columns = ['url'] + list(fields)
+            values = [url]
+            for value in fields.values():
+                if isinstance(value, datetime):
+                    value = value.isoformat()
+                elif isinstance(value, list):
+                    value = ','.join(f'{x:.3f}' for x in value)
+                values.append(value)
+            updates = ', '.join(f'{column} = excluded.{column}' for column in columns)
+            
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(f'''
+                    INSERT INTO feed_state (source, {', '.join(columns)}, updated_date)
+                    VALUES (?, {', '.join(['?'] * len(columns))}, CURRENT_TIMESTAMP)
+                    ON CONFLICT(source) DO UPDATE SET
+                        {updates},
+                        updated_date = excluded.updated_date
+                ''', [source] + values)
+                
+                conn.commit()
+                
+        except Exception as e:
+            self.logger.error(f"保存RSS源状态失败 {source}: {str(e)}")
+    
+    def get_feed_cache(self, source: str, ttl_hours: float) -> Dict | None:
+        """获取RSS源未过期的缓存：上次响应体哈希和解析出的文章列表"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT body_hash, articles FROM feed_cache
+                    WHERE source = ? AND cached_date >= datetime('now', ?)
+                ''', (source, f'-{ttl_hours} hours'))
+                row = cursor.fetchone()
+                
+            if row is None:
+                return None
+            
+            articles = json.loads(row[1])
             for article in articles:
-                content_hash = self.generate_content_hash(
-                    article['title'], 
-                    article['link']
+                if article.get('published'):
+                    article['published'] = datetime.fromisoformat(article['published'])
+            return {'body_hash': row[0], 'articles': articles}
+            
+        except Exception as e:
+            self.logger.error(f"读取RSS缓存失败 {source}: {str(e)}")
+            return None
+    
+    def save_feed_cache(self, source: str, body_hash: str, articles: List[Dict]):
+        """保存RSS源的响应体哈希和解析结果"""
+        try:
+            payload = json.dumps([
+                {
+                    key: value.isoformat() if isinstance(value, datetime) else value
+                    for key, value in article.items()
+                }
+                for article in articles
+            ], ensure_ascii=False)
+            
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    INSERT OR REPLACE INTO feed_cache (source, body_hash, articles, size, cached_date)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (source, body_hash, payload, len(payload.encode('utf-8'))))
+                
+                conn.commit()
+                
+        except Exception as e:
+            self.logger.error(f"保存RSS缓存失败 {source}: {str(e)}")
+    
+    def evict_feed_cache(self, max_bytes: int, ttl_hours: float) -> int:
+        """淘汰过期缓存，并按时间从旧到新淘汰直到总大小不超过 max_bytes，返回淘汰条数"""
+        deleted_count = 0
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    "DELETE FROM feed_cache WHERE cached_date < datetime('now', ?)",
+                    (f'-{ttl_hours} hours',)
+                )
+                deleted_count += cursor.rowcount
+                
+                # 从最新的缓存开始累计大小，超出上限的部分全部淘汰
+                cursor.execute('''
+                    DELETE FROM feed_cache WHERE source IN (
+                        SELECT source FROM (
+                            SELECT source,
+                                   SUM(size) OVER (ORDER BY cached_date DESC, source) AS running_size
+                            FROM feed_cache
+                        )
+                        WHERE running_size > ?
+                    )
+                ''', (max_bytes,))
+                deleted_count += cursor.rowcount
+                
+                conn.commit()
+                
+        except Exception as e:
+            self.logger.error(f"淘汰RSS缓存失败: {str(e)}")
+        
+        return deleted_count
+    
+    def find_existing_hashes(self, content_hashes, tables: Tuple[str, ...] = ('articles',)) -> Set[str]:
+        """返回本批次哈希中已存在于指定表的部分
+        
+        分块用 IN 查询，每个哈希走一次唯一索引查找，不把历史上所有哈希读入内存，
+        耗时只随批次大小增长（与读出全部哈希、临时表连接的对比见 benchmark_duplicate_check.py）。
+        """
+        content_hashes = list(set(content_hashes))
+        existing = set()
+        chunk_size = HASH_PROBE_CHUNK_SIZE // len(tables)
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(content_hashes), chunk_size):
+                chunk = content_hashes[start:start + chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(' UNION '.join(
+                    f'SELECT content_hash FROM {table} WHERE content_hash IN ({placeholders})' for table in tables
+                ), chunk * len(tables))
+                existing.update(row[0] for row in cursor.fetchall())
+        
+        return existing
+    
+    def filter_seen_articles(self, articles: List[Dict]) -> List[Dict]:
+        """抓取后立即去重：丢弃已处理过的文章（已处理记录和已入库文章）和本批次内的重复文章，返回新文章"""
+        try:
+            seen_hashes = self.find_existing_hashes(
+                [self.article_hash(article) for article in articles], ('seen_articles', 'articles')
+            )
+        except Exception as e:
+            self.logger.error(f"查询已处理文章失败: {str(e)}")
+            return articles  # 失败时返回原列表
+        
+        new_articles = []
+        for article in articles:
+            content_hash = article['content_hash']
+            if content_hash not in seen_hashes:
+                seen_hashes.add(content_hash)  # 防止本批次内重复
+                new_articles.append(article)
+        
+        return new_articles
+    
+    def mark_articles_seen(self, articles: List[Dict], raise_errors: bool = False):
+        """记录文章已处理，之后的抓取中不再过滤和总结；同时记录来源和发布时间，用于估算发布间隔
+        
+        raise_errors 为 True 时写入失败抛出异常。
+        """
+        now = datetime.now().isoformat()
+        rows = {
+            self.article_hash(article): (article.get('source'), article.get('published'))
+            for article in articles
+        }
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany(
+                    'INSERT OR IGNORE INTO seen_articles (content_hash, seen_date, source, published_date) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(content_hash, now, source, published) for content_hash, (source, published) in rows.items()]
                 )
+                conn.commit()
+        
+        except Exception as e:
+            self.logger.error(f"记录已处理文章失败: {str(e)}")
+            if raise_errors:
+                raise
+    
+    def find_story_candidates(self, band_keys) -> Tuple[Dict[int, List[str]], Dict[str, bytes]]:
+        """按LSH分段键查找候选故事，返回 (分段键 -> content_hash列表, content_hash -> 签名)"""
+        buckets = {}
+        signatures = {}
+        band_keys = list(band_keys)
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # 分批查询，避免超出SQLite的参数个数上限
+                for start in range(0, len(band_keys), 500):
+                    chunk = band_keys[start:start + 500]
+                    cursor.execute(f'''
+                        SELECT b.band_key, s.content_hash, s.signature
+                        FROM story_bands b
+                        JOIN story_signatures s ON s.content_hash = b.content_hash
+                        WHERE b.band_key IN ({','.join('?' * len(chunk))})
+                    ''', chunk)
+                    
+                    for band_key, content_hash, signature in cursor.fetchall():
+                        buckets.setdefault(band_key, []).append(content_hash)
+                        signatures[content_hash] = signature
+                        
+        except Exception as e:
+            self.logger.error(f"查找近似重复候选失败: {str(e)}")
+        
+        return buckets, signatures
+    
+    def add_story_signatures(self, entries: List[Tuple]):
+        """写入故事签名和分段键，entries 为 (content_hash, 签名, 分段键列表)"""
+        now = datetime.now().isoformat()
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO story_signatures (content_hash, signature, indexed_date)
+                    VALUES (?, ?, ?)
+                ''', [(content_hash, signature, now) for content_hash, signature, _ in entries])
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO story_bands (band_key, content_hash, indexed_date)
+                    VALUES (?, ?, ?)
+                ''', [
+                    (band_key, content_hash, now)
+                    for content_hash, _, band_keys in entries
+                    for band_key in band_keys
+                ])
+                
+                conn.commit()
+                
+        except Exception as e:
+            self.logger.error(f"写入近似重复索引失败: {str(e)}")
+    
+    def add_related_sources(self, updates: Dict[str, List[Dict]]):
+        """把近似重复文章的来源追加到已入库的故事上，updates 为 content_hash -> 来源列表"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                for content_hash, related in updates.items():
+                    cursor.execute(
+                        'SELECT related_sources FROM articles WHERE content_hash = ?',
+                        (content_hash,)
+                    )
+                    row = cursor.fetchone()
+                    if row is None:
+                        continue
+                    
+                    related_sources = json.loads(row[0]) if row[0] else []
+                    known_links = {item['link'] for item in related_sources}
+                    related_sources.extend(item for item in related if item['link'] not in known_links)
+                    
+                    cursor.execute(
+                        'UPDATE articles SET related_sources = ? WHERE content_hash = ?',
+                        (json.dumps(related_sources, ensure_ascii=False), content_hash)
+                    )
+                
+                conn.commit()
+                
+        except Exception as e:
+            self.logger.error(f"更新合并来源失败: {str(e)}")
+    
+    def evict_story_index(self, days: float) -> int:
+        """淘汰超过时间窗口的近似重复索引，返回淘汰的故事数"""
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        evicted = 0
+        
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('DELETE FROM story_bands WHERE indexed_date < ?', (cutoff_date,))
+                cursor.execute('DELETE FROM story_signatures WHERE indexed_date < ?', (cutoff_date,))
+                evicted = cursor.rowcount
+                
+                conn.commit()
+                
+        except Exception as e:
+            self.logger.error(f"淘汰近似重复索引失败: {str(e)}")
+        
+        if evicted:
+            self.logger.info(f"淘汰了 {evicted} 条近似重复索引")
+        return evicted
+    
+    def get_duplicate_check_results(self, articles: List[Dict]) -> List[Dict]:
+        """检查文章重复并返回去重后的结果"""
+        unique_articles = []
+        
+        try:
+            existing_hashes = self.find_existing_hashes([self.article_hash(article) for article in articles])
+            
+            # 过滤重复文章
+            for article in articles:
+                content_hash = article['content_hash']
                 
                 if content_hash not in existing_hashes:
                     unique_articles.append(article)
@@ -8,6 +8,8 @@ from typing import List, Dict
 import configparser
 from datetime import datetime
 
+from summary_format import summary_parts
+
 class EmailSender:
     """邮件发送器"""
     
@@ -47,6 +49,7 @@ class EmailSender:
                 .article-link {{ color: #4CAF50; text-decoration: none; font-weight: bold; }}
                 .article-link:hover {{ text-decoration: underline; }}
                 .footer {{ text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #888; font-size: 12px; }}
+                .topic-articles {{ color: #555; font-size: 13px; margin: 10px 0; padding-left: 18px; }}
                 .stats {{ background-color: #e8f5e8; padding: 10px; border-radius: 5px; margin-bottom: 20px; text-align: center; }}
             </style>
         </head>
@@ -58,7 +61,7 @@ class EmailSender:
                 </div>
                 
                 <div class="stats">
-                    <strong>📊 本期统计：共 {article_count} 篇文章 | 更新时间：{update_time}</strong>
+                    <strong>📊 本期统计：共 {article_count} 篇文章（{topic_count} 个话题） | 更新时间：{update_time}</strong>
                 </div>
                 
                 {articles_html}
@@ -82,37 +85,44 @@ class EmailSender:
                 if keywords:
                     keywords_html = f'<div class="article-keywords">🏷️ 关键词: {" • ".join(keywords)}</div>'
             
-            # AI总结（精简版）
+            # AI总结（精简版）：由结构化字段渲染，旧数据从 ai_summary 文本中解析
             ai_summary_html = ""
-            if 'ai_summary' in article and article['ai_summary']:
-                # 提取精简AI分析内容
-                summary_lines = article['ai_summary'].split('\n')
-                key_insight = ""
-                value_assessment = ""
-                
-                for line in summary_lines:
-                    line = line.strip()
-                    if line.startswith('🎯 核心亮点：'):
-                        key_insight = line.replace('🎯 核心亮点：', '').strip()
-                    elif line.startswith('📊 价值判断：'):
-                        value_assessment = line.replace('📊 价值判断：', '').strip()
-                
-                # 生成精简的AI分析显示
-                if key_insight and value_assessment:
-                    ai_summary_html = f'<div class="ai-summary">🤖 <strong>{key_insight}</strong> <span style="color: #666; font-size: 12px;">({value_assessment})</span></div>'
-                elif key_insight:
-                    ai_summary_html = f'<div class="ai-summary">🤖 {key_insight}</div>'
+            key_insight, value_assessment = summary_parts(article)
+            if key_insight and value_assessment:
+                ai_summary_html = f'<div class="ai-summary">🤖 <strong>{key_insight}</strong> <span style="color: #666; font-size: 12px;">({value_assessment})</span></div>'
+            elif key_insight:
+                ai_summary_html = f'<div class="ai-summary">🤖 {key_insight}</div>'
+            
+            # 同一事件的其他来源（近似重复合并）
+            related_html = ""
+            if article.get('related_sources'):
+                related_links = [
+                    f'<a href="{item["link"]}" target="_blank">{item["source"]}</a>'
+                    for item in article['related_sources']
+                ]
+                related_html = f' | 🔁 其他来源：{"、".join(related_links)}'
+            
+            # 同一话题的其他文章（话题聚类），只列标题和链接
+            topic_html = ""
+            if article.get('topic_articles'):
+                topic_items = ''.join(
+                    f'<li><a href="{item["link"]}" target="_blank">{item["title"]}</a>（{item["source"]}）</li>'
+                    for item in article['topic_articles']
+                )
+                topic_html = (f'<div class="topic-articles">📚 同一话题还有 {len(article["topic_articles"])} 篇：'
+                              f'<ul>{topic_items}</ul></div>')
             
             article_html = f"""
             <div class="article">
                 <div class="article-title">{i}. {article['title']}</div>
                 <div class="article-meta">
                     📰 来源：{article['source']} | 
-                    📅 发布时间：{article['published'].strftime('%Y-%m-%d %H:%M')}
+                    📅 发布时间：{article['published'].strftime('%Y-%m-%d %H:%M')}{related_html}
                 </div>
                 {keywords_html}
                 <div class="article-summary">{article['summary']}</div>
                 {ai_summary_html}
+                {topic_html}
                 <div>
                     <a href="{article['link']}" class="article-link" target="_blank">
                         🔗 阅读全文 →
@@ -128,7 +138,8 @@ class EmailSender:
         next_update = f"{next_update_hours}小时后"
         
         html_content = html_template.format(
-            article_count=len(articles),
+            article_count=self.count_articles(articles),
+            topic_count=len(articles),
             update_time=current_time,
             articles_html=articles_html,
             next_update=next_update
@@ -136,16 +147,23 @@ class EmailSender:
         
         return html_content
     
+    @staticmethod
+    def count_articles(articles: List[Dict]) -> int:
+        """文章总数（包括聚合到各话题下的文章）"""
+        return sum(1 + len(article.get('topic_articles', [])) for article in articles)
+    
     def send_news_email(self, articles: List[Dict]) -> bool:
-        """发送AI资讯邮件"""
+        """发送AI资讯邮件（articles 可以是话题聚类后的代表文章）"""
         try:
             if not articles:
                 self.logger.info("没有新文章，跳过邮件发送")
                 return True
             
+            article_count = self.count_articles(articles)
+            
             # 创建邮件对象
             msg = MIMEMultipart('alternative')
-            msg['Subject'] = f'🤖 AI资讯日报 - {datetime.now().strftime("%Y年%m月%d日")} ({len(articles)}篇)'
+            msg['Subject'] = f'🤖 AI资讯日报 - {datetime.now().strftime("%Y年%m月%d日")} ({article_count}篇)'
             msg['From'] = self.sender_email  # 使用简单格式，不包含显示名称
             msg['To'] = self.receiver_email
             
@@ -156,18 +174,21 @@ class EmailSender:
             text_content = f"""
 AI资讯日报 - {datetime.now().strftime('%Y年%m月%d日')}
 
-本期共有 {len(articles)} 篇AI相关文章：
+本期共有 {article_count} 篇AI相关文章（{len(articles)} 个话题）：
 
 """
             for i, article in enumerate(articles, 1):
+                sources = [article['source']] + [item['source'] for item in article.get('related_sources', [])]
                 text_content += f"""
 {i}. {article['title']}
-   来源：{article['source']}
+   来源：{'、'.join(sources)}
    时间：{article['published'].strftime('%Y-%m-%d %H:%M')}
    摘要：{article['summary']}
    链接：{article['link']}
-
 """
+                for item in article.get('topic_articles', []):
+                    text_content += f"   同一话题：{item['title']}（{item['source']}） {item['link']}\n"
+                text_content += "\n"
             
             text_content += "\n此邮件由AI资讯智能体自动发送"
             
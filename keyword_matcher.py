@@ -0,0 +1,75 @@
+from collections import deque
+from typing import Dict, List, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick 多模式匹配器（构建一次，重复使用）
+    
+    关键词按分组传入，匹配不区分大小写、不要求词边界（与 `keyword in text` 的子串语义一致）。
+    扫描耗时只与文本长度和命中数有关，与关键词数量无关。
+    """
+    
+    def __init__(self, groups: Dict[str, List[str]]):
+        # groups: 分组名 -> 关键词列表，命中结果以 (分组名, 列表下标) 表示
+        self.groups = {name: list(keywords) for name, keywords in groups.items()}
+        
+        self._goto = [{}]   # 状态转移：字符 -> 下一状态
+        self._fail = [0]    # 失配时回退的状态
+        self._output = [()]  # 到达该状态时结束的所有关键词（含失配链上的）
+        
+        for name, keywords in self.groups.items():
+            for index, keyword in enumerate(keywords):
+                self._add_pattern(keyword.lower(), (name, index))
+        self._build_fail_links()
+    
+    def _add_pattern(self, pattern: str, label: Tuple[str, int]):
+        """把一个关键词加入字典树"""
+        if not pattern:
+            return
+        
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] += (label,)
+    
+    def _build_fail_links(self):
+        """按广度优先顺序计算失配链接，并把失配状态的输出合并进来（第一层状态回退到根）"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+    
+    def search(self, text: str) -> List[Tuple[int, str, int]]:
+        """扫描已转为小写的文本，返回所有命中 (结束位置, 分组名, 列表下标)
+        
+        同一关键词多次出现时每次都会返回，结束位置为关键词最后一个字符的下标。
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        hits = []
+        state = 0
+        
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.extend((position, name, index) for name, index in output[state])
+        
+        return hits
+    
+    def keyword(self, name: str, index: int) -> str:
+        """根据命中结果取回原始关键词"""
+        return self.groups[name][index]
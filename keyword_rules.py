@@ -0,0 +1,131 @@
+import os
+import pickle
+import hashlib
+import logging
+import configparser
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from article_features import FeatureExtractor
+
+# 编译产物格式版本，匹配器实现变化时递增，使旧的缓存失效
+RULES_ARTIFACT_VERSION = 1
+
+# 规则文件中组成三层筛选关键词的小节
+FILTER_SECTIONS = {'high': 'filter_high', 'core': 'filter_core', 'exclude': 'filter_exclude'}
+
+
+class KeywordRules:
+    """关键词规则表
+    
+    从规则文件编译出特征提取器和关键词集合。编译结果按规则文件的哈希缓存到磁盘，
+    启动时直接加载；规则文件修改时间变化后可在运行中重新加载。
+    """
+    
+    def __init__(self, rules_file: str = 'keyword_rules.ini', cache_file: Optional[str] = None):
+        self.rules_file = rules_file
+        self.cache_file = cache_file or os.path.splitext(rules_file)[0] + '.cache'
+        self.logger = logging.getLogger(__name__)
+        
+        self.extractor: Optional[FeatureExtractor] = None
+        self.keyword_sets: Dict[str, FrozenSet[str]] = {}
+        self.digest = None
+        self._mtime = None
+        
+        self.load()
+    
+    @property
+    def groups(self) -> Dict[str, List[str]]:
+        """各分组的关键词列表（分组名 -> 关键词）"""
+        return self.extractor.matcher.groups
+    
+    def load(self):
+        """加载规则：缓存的编译产物与规则文件哈希一致时直接使用，否则重新编译并写入缓存"""
+        mtime = os.stat(self.rules_file).st_mtime_ns
+        with open(self.rules_file, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        
+        artifact = self._read_artifact(digest)
+        if artifact is None:
+            artifact = self.compile(data.decode('utf-8'))
+            artifact['digest'] = digest
+            self._write_artifact(artifact)
+        
+        self.extractor = artifact['extractor']
+        self.keyword_sets = artifact['keyword_sets']
+        self.digest = digest
+        self._mtime = mtime
+    
+    def reload_if_changed(self) -> bool:
+        """规则文件修改时间变化时重新加载，返回是否已加载新规则（出错时继续使用旧规则）"""
+        try:
+            mtime = os.stat(self.rules_file).st_mtime_ns
+            if mtime == self._mtime:
+                return False
+            
+            self.load()
+            self.logger.info(f"规则文件已更新，重新加载: {self.rules_file}")
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"重新加载规则文件失败，继续使用旧规则: {str(e)}")
+            return False
+    
+    @staticmethod
+    def compile(text: str) -> Dict:
+        """解析规则文件内容，编译为特征提取器和关键词集合"""
+        parser = configparser.ConfigParser(interpolation=None)
+        parser.read_string(text)
+        
+        def section_keywords(section: str) -> List[str]:
+            keywords = []
+            for value in parser[section].values():
+                keywords.extend(split_keywords(value))
+            return keywords
+        
+        groups = {group: section_keywords(section) for group, section in FILTER_SECTIONS.items()}
+        for name, value in parser['indicators'].items():
+            groups[name] = split_keywords(value)
+        
+        return {
+            'version': RULES_ARTIFACT_VERSION,
+            'extractor': FeatureExtractor(groups),
+            'keyword_sets': {
+                name: frozenset(split_keywords(value))
+                for name, value in parser['keyword_sets'].items()
+            }
+        }
+    
+    def _read_artifact(self, digest: str) -> Optional[Dict]:
+        """读取与规则文件哈希一致的编译产物，不存在或已失效时返回None"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                artifact = pickle.load(f)
+            if artifact.get('version') == RULES_ARTIFACT_VERSION and artifact.get('digest') == digest:
+                return artifact
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"规则缓存无法读取，重新编译: {str(e)}")
+        return None
+    
+    def _write_artifact(self, artifact: Dict):
+        """写入编译产物（先写临时文件再替换，避免读到半个文件）"""
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            self.logger.warning(f"规则缓存写入失败: {str(e)}")
+            if os.path.exists(temp_file):
+                os.unlink(temp_file)
+    
+    def has_keyword(self, keywords: Iterable[str], set_name: str) -> bool:
+        """筛选出的关键词中是否有属于该关键词集合的"""
+        return not self.keyword_sets[set_name].isdisjoint(keywords)
+
+
+def split_keywords(value: str) -> List[str]:
+    """拆分逗号分隔（可跨行）的关键词列表"""
+    return [keyword.strip() for keyword in value.replace('\n', ',').split(',') if keyword.strip()]
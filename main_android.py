@@ -22,6 +22,7 @@ from kivy.uix.progressbar import ProgressBar
 from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.core.text import LabelBase
+import asyncio
 import threading
 import sys
 from datetime import datetime
@@ -31,6 +32,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from scheduler import TaskScheduler
 from email_sender import EmailSender
 from database import NewsDatabase
+from summary_format import summary_parts
 
 class ArticleCard(BoxLayout):
     """文章卡片组件 - 修复版"""
@@ -81,9 +83,12 @@ class ArticleCard(BoxLayout):
         )
         self.add_widget(time_label)
         
-        # AI总结 - 简化显示
-        if article_data.get('ai_summary'):
-            summary_text = f"AI分析: {article_data['ai_summary']}"
+        # AI总结 - 简化显示（由结构化字段渲染）
+        key_insight, value_assessment = summary_parts(article_data)
+        if key_insight:
+            summary_text = f"AI分析: {key_insight}"
+            if value_assessment:
+                summary_text += f"（{value_assessment}）"
             summary_label = Label(
                 text=summary_text,
                 font_size='13sp',
@@ -209,6 +214,7 @@ class AINewsApp(App):
         self.scheduler = TaskScheduler()
         self.email_sender = EmailSender()
         self.database = NewsDatabase()
+        self._scrape_task = None
         
         # 主布局
         main_layout = BoxLayout(orientation='vertical')
@@ -363,32 +369,32 @@ class AINewsApp(App):
     
     def manual_scrape(self, instance):
         """手动抓取"""
+        # 上一次抓取尚未结束时不重复启动
+        if self._scrape_task is not None and not self._scrape_task.done():
+            return
+        
         self.status_label.text = '正在抓取AI资讯...'
         self.progress_bar.value = 0
         
-        # 在后台线程执行抓取
-        threading.Thread(target=self._do_scrape, daemon=True).start()
+        # 在Kivy的asyncio事件循环中执行抓取，不阻塞界面；保留任务引用，避免任务在完成前被垃圾回收
+        self._scrape_task = asyncio.ensure_future(self._do_scrape())
     
-    def _do_scrape(self):
+    async def _do_scrape(self):
         """执行抓取任务"""
         try:
-            # 模拟进度更新
-            Clock.schedule_once(lambda dt: setattr(self.progress_bar, 'value', 25), 0.5)
+            self.progress_bar.value = 25
             
             # 执行抓取
-            self.scheduler.run_once()
+            await self.scheduler.run_once_async()
             
-            Clock.schedule_once(lambda dt: setattr(self.progress_bar, 'value', 100), 1.0)
-            Clock.schedule_once(lambda dt: setattr(self.status_label, 'text', '抓取完成'), 1.0)
+            self.progress_bar.value = 100
+            self.status_label.text = '抓取完成'
             
             # 重新加载文章列表
-            Clock.schedule_once(lambda dt: self.load_articles(), 1.5)
+            self.load_articles()
             
         except Exception as e:
-            Clock.schedule_once(
-                lambda dt: setattr(self.status_label, 'text', f'抓取失败: {str(e)}'),
-                0
-            )
+            self.status_label.text = f'抓取失败: {str(e)}'
     
     def test_email(self, instance):
         """测试邮件发送"""
@@ -473,4 +479,5 @@ class AINewsApp(App):
 
 
 if __name__ == '__main__':
-    AINewsApp().run()
\ No newline at end of file
+    # 使用asyncio事件循环运行，使异步抓取与界面共用同一个循环
+    asyncio.run(AINewsApp().async_run(async_lib='asyncio'))
\ No newline at end of file
@@ -0,0 +1,181 @@
+import re
+import struct
+import hashlib
+import logging
+import configparser
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# MinHash签名长度 = 分段数 × 每段行数；32段×2行时，相似度0.4以上的文章几乎一定至少有一段完全相同，
+# 低相似度的候选再由签名相似度排除
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 英文按单词、中文按单字切分，相邻两个词元组成一个片段
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]')
+SHINGLE_SIZE = 2
+
+
+def _stable_hash(data: bytes) -> int:
+    """与进程无关的64位哈希（内置hash()每次启动随机化，不能用于持久化的签名）"""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+# 每个排列为 (a*x + b) mod p，系数由固定种子推导，保证各次运行的签名可比较
+_PERMUTATIONS = [
+    (_stable_hash(b'a%d' % i) % (_MERSENNE_PRIME - 1) + 1, _stable_hash(b'b%d' % i) % _MERSENNE_PRIME)
+    for i in range(NUM_PERM)
+]
+
+
+def shingles(text: str) -> set:
+    """把文本切成词元片段集合（不区分大小写，忽略标点和空白）"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) <= SHINGLE_SIZE:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> Optional[Tuple[int, ...]]:
+    """计算文本的MinHash签名，文本中没有可用词元时返回None"""
+    hashes = [_stable_hash(shingle.encode('utf-8')) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def band_keys(signature: Sequence[int]) -> List[int]:
+    """把签名分段，每段哈希为一个有符号64位整数（可直接存入SQLite INTEGER列）"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'<B{ROWS}I', band, *rows), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def signature_similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """由两个签名估计的Jaccard相似度"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    """签名序列化为定长二进制"""
+    return struct.pack(f'<{NUM_PERM}I', *signature)
+
+
+def unpack_signature(data: bytes) -> Tuple[int, ...]:
+    """从二进制还原签名"""
+    return struct.unpack(f'<{NUM_PERM}I', data)
+
+
+class NearDuplicateIndex:
+    """跨来源近似重复检测：标题+摘要的MinHash签名按分段建立LSH索引
+    
+    索引持久化在数据库中，按分段键查找候选文章（不随历史数据量线性增长），再用签名相似度确认。
+    同一事件的多篇报道合并为一个故事：保留第一篇，其余文章的来源和链接记入 related_sources。
+    超过时间窗口的签名会被淘汰，索引大小只与窗口内的文章数有关。
+    """
+    
+    def __init__(self, config_file: str = 'config.ini', database=None):
+        self.config = configparser.ConfigParser()
+        self.config.read(config_file, encoding='utf-8')
+        
+        self.database = database
+        self.logger = logging.getLogger(__name__)
+        
+        self.enabled = self.config.getboolean('scraping', 'near_duplicate_detection', fallback=True)
+        self.threshold = float(self.config.get('scraping', 'near_duplicate_threshold', fallback='0.5'))
+        self.window_days = float(self.config.get('scraping', 'near_duplicate_window_days', fallback='7'))
+    
+    def collapse(self, articles: List[Dict]) -> List[Dict]:
+        """把近似重复的文章合并为一个故事，返回保留下来的文章（顺序不变）
+        
+        与已入库故事重复的文章直接丢弃，其来源追加到该故事上；
+        本批次内重复的文章合并到批次内第一篇（按筛选得分排序时即得分最高的一篇）。
+        """
+        if not self.enabled or not articles:
+            return articles
+        
+        try:
+            self.database.evict_story_index(self.window_days)
+            
+            keys_list = []
+            for article in articles:
+                signature = minhash_signature(f"{article['title']} {article.get('summary', '')}")
+                article['story_signature'] = signature
+                keys_list.append(band_keys(signature) if signature else [])
+            
+            buckets, packed_signatures = self.database.find_story_candidates(
+                {key for keys in keys_list for key in keys}
+            )
+            stored_signatures = {
+                content_hash: unpack_signature(data) for content_hash, data in packed_signatures.items()
+            }
+            
+            stories = []
+            batch_buckets = {}    # 分段键 -> 本批次保留文章的下标
+            related_updates = {}  # 已入库故事的content_hash -> 新增的来源
+            
+            for article, keys in zip(articles, keys_list):
+                signature = article['story_signature']
+                if signature is None:
+                    stories.append(article)
+                    continue
+                
+                best_similarity = self.threshold
+                best_story = None
+                for key in keys:
+                    for content_hash in buckets.get(key, ()):
+                        similarity = signature_similarity(signature, stored_signatures[content_hash])
+                        if similarity >= best_similarity:
+                            best_similarity, best_story = similarity, content_hash
+                    for index in batch_buckets.get(key, ()):
+                        similarity = signature_similarity(signature, stories[index]['story_signature'])
+                        if similarity >= best_similarity:
+                            best_similarity, best_story = similarity, index
+                
+                related = {'source': article['source'], 'link': article['link']}
+                if best_story is None:
+                    article.setdefault('related_sources', [])
+                    for key in keys:
+                        batch_buckets.setdefault(key, []).append(len(stories))
+                    stories.append(article)
+                elif isinstance(best_story, int):
+                    stories[best_story]['related_sources'].append(related)
+                else:
+                    related_updates.setdefault(best_story, []).append(related)
+            
+            if related_updates:
+                self.database.add_related_sources(related_updates)
+            
+            self.logger.info(f"近似重复合并后剩余 {len(stories)} 篇文章"
+                             f"（合并 {len(articles) - len(stories)} 篇）")
+            return stories
+        
+        except Exception as e:
+            self.logger.error(f"近似重复检测失败: {str(e)}")
+            return articles  # 失败时返回原列表
+    
+    def add(self, articles: List[Dict]):
+        """把已入库文章的签名写入索引"""
+        if not self.enabled:
+            return
+        
+        entries = []
+        for article in articles:
+            signature = article.get('story_signature')
+            if signature is None:
+                continue
+            content_hash = self.database.article_hash(article)
+            entries.append((content_hash, pack_signature(signature), band_keys(signature)))
+        
+        if entries:
+            self.database.add_story_signatures(entries)
@@ -1,17 +1,384 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import html
+import itertools
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import feedparser
+from feedparser.datetimes import _parse_date as _feedparser_parse_date
+from lxml import etree
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from urllib.parse import urljoin
+from typing import Callable, List, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import threading
 import time
 import configparser
 
+from database import NewsDatabase, compute_content_hash
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：没有NumPy时逐篇打分
+    np = None
+from article_features import ArticleFeatures
+from keyword_rules import KeywordRules
+from relevance_model import RelevanceModel
+from summary_format import render_summary
+
+
+# 标签内部直到结尾的 ">"：引号中的属性值可以包含 ">"，引号不成对时退回到第一个 ">"；
+# 先确认后面还有 ">"，没有闭合的 "<" 不做逐字回溯
+_TAG_REST = r'(?=[^>]*>)(?:[^\'">]*(?:(?:"[^"]*"|\'[^\']*\')[^\'">]*)*>|[^>]*>)'
+
+# HTML片段的词法单元：注释、整体跳过的脚本/样式、标签、文本、孤立的 "<"
+_HTML_TOKEN_RE = re.compile(
+    r'<!--.*?(?:-->|$)'
+    r'|<(script|style)\b' + _TAG_REST + r'.*?(?:</\1\s*>|$)'
+    r'|</?([a-zA-Z][a-zA-Z0-9]*)' + _TAG_REST +
+    r'|[^<]+'
+    r'|<',
+    re.S | re.I
+)
+
+# 块级标签前后视为空白，避免相邻段落的文字粘在一起
+_BLOCK_TAGS = frozenset([
+    'p', 'br', 'div', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'table', 'blockquote',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'section', 'article', 'figure', 'figcaption'
+])
+
+
+def html_to_text(html_text: str, limit: int = 300) -> str:
+    """将HTML片段转为纯文本：去标签、解码实体、合并空白，凑够 limit 个字符即停止扫描"""
+    parts = []
+    length = 0
+    pending_space = False
+    
+    for match in _HTML_TOKEN_RE.finditer(html_text):
+        token = match.group(0)
+        if token[0] == '<' and len(token) > 1:
+            if match.group(2) and match.group(2).lower() in _BLOCK_TAGS:
+                pending_space = True
+            continue
+        
+        text = html.unescape(token)
+        words = text.split()
+        if not words:
+            pending_space = pending_space or bool(text)
+            continue
+        
+        if parts and (pending_space or text[0].isspace()):
+            parts.append(' ')
+            length += 1
+        chunk = ' '.join(words)
+        parts.append(chunk)
+        length += len(chunk)
+        pending_space = text[-1].isspace()
+        
+        if length >= limit:
+            break
+    
+    return ''.join(parts)[:limit]
+
+
+# 网页中声明订阅地址的 <link> 标签及其属性
+_LINK_TAG_RE = re.compile(r'<link\b[^>]*>', re.I)
+_TAG_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+FEED_MIME_TYPES = ('application/rss+xml', 'application/atom+xml', 'application/rdf+xml')
+
+
+def looks_like_html(body: bytes) -> bool:
+    """响应体是网页而不是RSS/Atom订阅"""
+    head = body[:1024].lower()
+    return b'<html' in head and not any(tag in head for tag in (b'<rss', b'<feed', b'<rdf:rdf'))
+
+
+def discover_feed_url(body: bytes, base_url: str) -> Optional[str]:
+    """从网页的 <link rel="alternate"> 中找出第一个RSS/Atom订阅地址（转换为绝对地址）"""
+    text = body[:256 * 1024].decode('utf-8', errors='replace')
+    head_end = text.lower().find('</head>')
+    if head_end != -1:
+        text = text[:head_end]
+    
+    for tag in _LINK_TAG_RE.finditer(text):
+        attrs = {
+            match.group(1).lower(): html.unescape(next(v for v in match.groups()[1:] if v is not None))
+            for match in _TAG_ATTR_RE.finditer(tag.group(0))
+        }
+        mime_type = attrs.get('type', '').split(';')[0].strip().lower()
+        if ('alternate' in attrs.get('rel', '').lower().split() and
+                mime_type in FEED_MIME_TYPES and attrs.get('href')):
+            return urljoin(base_url, attrs['href'].strip())
+    return None
+
+
+# 快速解析路径用到的命名空间
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+
+
+class UnsupportedFeedError(Exception):
+    """快速解析路径无法处理的订阅格式（交给feedparser解析）"""
+
+
+def _parse_feed_date(value: Optional[str]) -> Optional[datetime]:
+    """按feedparser的规则解析日期字符串，统一为UTC时间"""
+    parsed = _feedparser_parse_date(value.strip()) if value else None
+    return datetime(*parsed[:6]) if parsed else None
+
+
+def _rss_entry(item) -> tuple:
+    """从RSS 2.0的item元素提取 (title, link, summary, published, entry_id)"""
+    title = item.findtext('title')
+    link = item.findtext('link')
+    guid = item.find('guid')
+    guid_text = guid.text.strip() if guid is not None and guid.text else None
+    
+    # 没有link时，永久链接形式的guid即为文章链接
+    if not link and guid_text and guid.get('isPermaLink', 'true').lower() != 'false':
+        link = guid_text
+    if title is None or link is None:
+        raise UnsupportedFeedError('item 缺少 title 或 link')
+    
+    link = link.strip()
+    published = (_parse_feed_date(item.findtext('pubDate')) or
+                 _parse_feed_date(item.findtext(DC_NS + 'date')))
+    return title.strip(), link, item.findtext('description'), published, guid_text or link
+
+
+def _atom_entry(entry) -> tuple:
+    """从Atom的entry元素提取 (title, link, summary, published, entry_id)"""
+    title = entry.find(ATOM_NS + 'title')
+    summary = entry.find(ATOM_NS + 'summary')
+    if summary is None:
+        summary = entry.find(ATOM_NS + 'content')
+    
+    # XHTML内容需要按标记树处理，交给feedparser
+    for element in (title, summary):
+        if element is not None and (len(element) or element.get('type') == 'xhtml'):
+            raise UnsupportedFeedError('包含XHTML内容')
+    if title is None:
+        raise UnsupportedFeedError('entry 缺少 title')
+    
+    link = None
+    for link_element in entry.iterfind(ATOM_NS + 'link'):
+        if link_element.get('rel', 'alternate') == 'alternate':
+            link = link_element.get('href')
+            break
+    # 相对链接需要按 xml:base 解析，交给feedparser
+    if not link or not urlparse(link).scheme:
+        raise UnsupportedFeedError('entry 缺少绝对链接')
+    
+    entry_id = (entry.findtext(ATOM_NS + 'id') or '').strip()
+    published = (_parse_feed_date(entry.findtext(ATOM_NS + 'published')) or
+                 _parse_feed_date(entry.findtext(ATOM_NS + 'updated')))
+    summary_text = summary.text or '' if summary is not None else None
+    return (title.text or '').strip(), link.strip(), summary_text, published, entry_id or link.strip()
+
+
+def iter_fast_entries(content: bytes, complete: bool = True, chunk_size: int = 64 * 1024):
+    """增量解析RSS 2.0 / Atom，边读边逐条产出 (title, link, summary, published, entry_id)
+    
+    只提取用到的字段，处理完的条目立即从树中移除，内存占用与条目数无关。
+    根元素不是 rss 或 Atom feed 时抛出 UnsupportedFeedError，XML格式错误时抛出 lxml 的异常。
+    complete 为 False 表示内容被截断，此时丢弃最后一个不完整的条目，不再检查文档是否闭合。
+    """
+    parser = etree.XMLPullParser(events=('start', 'end'), resolve_entities=False, no_network=True)
+    kind = None
+    
+    for offset in range(0, len(content), chunk_size):
+        parser.feed(content[offset:offset + chunk_size])
+        for event, element in parser.read_events():
+            if kind is None:
+                if element.tag == 'rss':
+                    kind = 'rss'
+                elif element.tag == ATOM_NS + 'feed':
+                    kind = 'atom'
+                else:
+                    raise UnsupportedFeedError(f'不支持的根元素 {element.tag}')
+                continue
+            if event != 'end':
+                continue
+            
+            if kind == 'rss' and element.tag == 'item':
+                yield _rss_entry(element)
+            elif kind == 'atom' and element.tag == ATOM_NS + 'entry':
+                yield _atom_entry(element)
+            else:
+                continue
+            
+            # 释放已处理的条目及其之前的兄弟节点
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    
+    if kind is None:
+        raise UnsupportedFeedError('内容为空')
+    if complete:
+        # 格式错误要到结束解析时才会报告
+        parser.close()
+
+
+def _entry_published_time(entry) -> Optional[datetime]:
+    """读取条目的发布时间（没有发布时间时返回None）"""
+    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        return datetime(*entry.published_parsed[:6])
+    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+        return datetime(*entry.updated_parsed[:6])
+    return None
+
+
+def iter_feedparser_entries(content: bytes):
+    """用feedparser完整解析，产出与快速路径相同格式的条目"""
+    feed = feedparser.parse(content)
+    for entry in feed.entries:
+        yield (entry.title, entry.link, entry.get('summary'), _entry_published_time(entry),
+               entry.get('id') or entry.get('link'))
+
+
+def parse_feed_records(content: bytes, watermark: Optional[Dict] = None,
+                       complete: bool = True, max_age_hours: float = 10) -> Tuple[List[tuple], Dict]:
+    """解析RSS原始内容，返回紧凑的文章记录和更新后的高水位
+    
+    模块级函数，可在解析进程池中执行。每条记录为
+    (title, link, summary, published, entry_id)，跨进程传递时比字典更省序列化开销。
+    普通的RSS 2.0和Atom走lxml增量解析，其他格式或格式不规范时改用feedparser。
+    """
+    try:
+        return _collect_feed_records(iter_fast_entries(content, complete), watermark, max_age_hours)
+    except (etree.LxmlError, UnsupportedFeedError):
+        return _collect_feed_records(iter_feedparser_entries(content), watermark, max_age_hours)
+
+
+def _collect_feed_records(entries, watermark: Optional[Dict] = None,
+                          max_age_hours: float = 10) -> Tuple[List[tuple], Dict]:
+    """按高水位和时间窗口筛选条目
+    
+    watermark 为该源上次已处理的最新条目（last_entry_id、last_published），
+    已处理过的条目在提取摘要之前就被跳过。只保留最近 max_age_hours 小时内发布的条目。
+    """
+    records = []
+    watermark = watermark or {}
+    last_entry_id = watermark.get('last_entry_id')
+    last_published = watermark.get('last_published')
+    newest = {'last_entry_id': last_entry_id, 'last_published': last_published}
+    
+    for index, (title, link, summary_html, published_time, entry_id) in enumerate(entries):
+        if published_time is None:
+            # 无发布时间的源按倒序排列，遇到上次最新的条目即可停止
+            if entry_id and entry_id == last_entry_id:
+                break
+            if index == 0 and newest['last_published'] is None:
+                newest['last_entry_id'] = entry_id
+            published_time = datetime.now()
+        else:
+            # 早于高水位，或就是高水位那一条：已处理过
+            if last_published and (published_time < last_published or
+                                   (published_time == last_published and entry_id == last_entry_id)):
+                continue
+            if newest['last_published'] is None or published_time > newest['last_published']:
+                newest = {'last_entry_id': entry_id, 'last_published': published_time}
+        
+        # 只获取时间窗口内的文章
+        if published_time and (datetime.now() - published_time).total_seconds() > max_age_hours * 3600:
+            continue
+        
+        # 提取摘要，处理HTML标签（只扫描到够300个字符为止）
+        summary = ""
+        if summary_html is not None:
+            summary = html_to_text(summary_html, 300) + "..."
+        
+        records.append((title, link, summary, published_time, entry_id))
+    
+    return records, newest
+
+
+def _run_sync(coroutine, async_name: str):
+    """在当前线程没有运行中的事件循环时执行协程并返回结果
+    
+    asyncio.run 不能在事件循环内调用（如Kivy界面、其他协程中），此时关闭协程并给出明确的错误，
+    调用方应改为 await 对应的异步方法。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    coroutine.close()
+    raise RuntimeError(f"已在运行中的事件循环内，不能使用同步接口，请改为 await {async_name}()")
+
+
+class HostRateLimiter:
+    """按主机限速：同一主机的相邻请求至少间隔 min_interval 秒，不同主机互不影响"""
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def reserve(self, url: str) -> float:
+        """为URL所在主机预约下一个请求时间片，返回需要等待的秒数"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.min_interval
+        return slot - now
+    
+    def try_reserve(self, url: str) -> bool:
+        """该主机的时间片已到时立即预约下一个时间片并返回 True，否则不预约并返回 False"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            if self._next_allowed.get(host, now) > now:
+                return False
+            self._next_allowed[host] = now + self.min_interval
+        return True
+    
+    def pending(self, url: str) -> float:
+        """距离该主机下一个可用时间片的秒数（不预约）"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            return self._next_allowed.get(host, 0) - time.monotonic()
+    
+    async def wait_async(self, url: str):
+        """异步等待直到可以请求该主机"""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    @contextlib.asynccontextmanager
+    async def request_slot(self, url: str, semaphore: asyncio.Semaphore):
+        """等到该主机的时间片后再获取请求名额，退出时归还名额
+        
+        等待同一主机的间隔时不占用名额，不阻塞其他主机的请求；获得名额后再确认时间片，
+        同一主机的请求不会因为排队等名额而挤在一起。
+        """
+        while True:
+            delay = self.pending(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await semaphore.acquire()
+            if self.try_reserve(url):
+                break
+            semaphore.release()
+        
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
 class AINewsScraper:
     """AI资讯抓取器"""
     
-    def __init__(self, config_file: str = 'config.ini'):
+    def __init__(self, config_file: str = 'config.ini', database: Optional[NewsDatabase] = None):
         self.config = configparser.ConfigParser()
         self.config.read(config_file, encoding='utf-8')
         
@@ -34,61 +401,493 @@ class AINewsScraper:
         # RSS源配置
         self.rss_sources = dict(self.config.items('sources'))
         
-    def fetch_rss_feed(self, url: str, source_name: str) -> List[Dict]:
-        """抓取RSS源数据"""
+        # 并发抓取配置：最大在途请求数，以及同一主机两次请求的最小间隔（秒）
+        self.fetch_workers = int(
+            self.config.get('scraping', 'fetch_workers', fallback='8')
+        )
+        self.host_limiter = HostRateLimiter(float(
+            self.config.get('scraping', 'per_host_interval_seconds', fallback='2')
+        ))
+        
+        # 长连接池会话，所有抓取请求（包括后续的内容补充抓取）共用
+        self.session = self._create_session()
+        
+        # 数据库用于保存各RSS源的状态（条件请求校验值等）
+        self.database = database or NewsDatabase(config_file)
+        
+        # 原始内容缓存：响应体与上次相同则直接复用解析结果
+        self.feed_cache_ttl_hours = float(
+            self.config.get('scraping', 'feed_cache_ttl_hours', fallback='24')
+        )
+        self.feed_cache_max_bytes = int(
+            self.config.get('scraping', 'feed_cache_max_bytes', fallback=str(5 * 1024 * 1024))
+        )
+        
+        # 熔断：连续失败达到阈值后跳过该源，退避时间按失败次数指数增长
+        self.circuit_failure_threshold = int(
+            self.config.get('scraping', 'circuit_failure_threshold', fallback='3')
+        )
+        self.circuit_backoff_minutes = float(
+            self.config.get('scraping', 'circuit_backoff_minutes', fallback='30')
+        )
+        self.circuit_max_backoff_hours = float(
+            self.config.get('scraping', 'circuit_max_backoff_hours', fallback='24')
+        )
+        
+        # 时间窗口：只获取最近 fetch_window_hours 小时内发布的文章；
+        # 轮询间隔更长的源由调度器在 source_fetch_windows 中放宽（来源 -> 小时），保证两次抓取之间的文章不会漏掉
+        self.fetch_window_hours = float(
+            self.config.get('scraping', 'fetch_window_hours', fallback='10')
+        )
+        self.source_fetch_windows = {}
+        
+        # 自适应超时：按该源最近响应时间的P95推算，限制在上下限之间
+        self.min_timeout_seconds = float(
+            self.config.get('scraping', 'min_timeout_seconds', fallback='5')
+        )
+        self.max_timeout_seconds = float(
+            self.config.get('scraping', 'max_timeout_seconds', fallback='30')
+        )
+        self.timeout_latency_multiplier = float(
+            self.config.get('scraping', 'timeout_latency_multiplier', fallback='3')
+        )
+        
+        # 整个抓取阶段的时限（秒），超时返回已完成的部分结果
+        self.fetch_deadline_seconds = float(
+            self.config.get('scraping', 'fetch_deadline_seconds', fallback='180')
+        )
+        
+        # 解析进程池：0 表示在线程中解析；小于 parse_pool_min_bytes 的内容不值得跨进程
+        self.parse_workers = int(
+            self.config.get('scraping', 'parse_workers', fallback='0')
+        )
+        self.parse_pool_min_bytes = int(
+            self.config.get('scraping', 'parse_pool_min_bytes', fallback=str(256 * 1024))
+        )
+        self._parse_pool = None
+        
+        # 总结进程池：0 表示逐篇总结；文章数达到 summary_pool_min_articles 时才分块并行（重新总结历史数据时）
+        self.summary_workers = int(
+            self.config.get('scraping', 'summary_workers', fallback='0')
+        )
+        self.summary_pool_min_articles = int(
+            self.config.get('scraping', 'summary_pool_min_articles', fallback='1000')
+        )
+        self.summary_chunk_size = int(
+            self.config.get('scraping', 'summary_chunk_size', fallback='250')
+        )
+        self._summary_pool = None
+        self._summary_pool_digest = None  # 总结进程池载入的规则表版本（规则文件哈希）
+        
+        # 自动发现的订阅地址缓存多久（小时）后重新从网页确认
+        self.feed_discovery_ttl_hours = float(
+            self.config.get('scraping', 'feed_discovery_ttl_hours', fallback='168')
+        )
+        
+        # 关键词规则表：筛选关键词和总结指示词编译成一个特征提取器（编译结果缓存在磁盘上）
+        self.rules = KeywordRules(
+            self.config.get('scraping', 'rules_file', fallback='keyword_rules.ini'),
+            self.config.get('scraping', 'rules_cache_file', fallback=None)
+        )
+        
+        # 文章数量达到该值且安装了NumPy时，关键词筛选改为批量打分（重新处理历史数据时）
+        self.batch_scoring_min_articles = int(
+            self.config.get('scraping', 'batch_scoring_min_articles', fallback='500')
+        )
+        
+        # 相关性打分方式：rules 为关键词规则（默认），model 为离线训练的学习模型（需要NumPy）
+        self.relevance_model = None
+        if self.config.get('scraping', 'relevance_scorer', fallback='rules') == 'model':
+            self.relevance_model = self._load_relevance_model(
+                self.config.get('scraping', 'relevance_model_file', fallback='relevance_model.npz')
+            )
+        
+        # 单个源的内容大小上限（字节），可在 [feed_max_bytes] 中按源单独配置
+        self.max_feed_bytes = int(
+            self.config.get('scraping', 'max_feed_bytes', fallback=str(2 * 1024 * 1024))
+        )
+        
+    def _load_relevance_model(self, model_file: str) -> Optional[RelevanceModel]:
+        """加载相关性学习模型，无法使用时返回None（退回关键词规则）"""
+        if np is None:
+            self.logger.warning("未安装NumPy，无法使用学习模型，改用关键词规则筛选")
+            return None
+        
+        try:
+            model = RelevanceModel.load(model_file)
+            self.logger.info(f"已加载相关性模型: {model_file}")
+            return model
+        except Exception as e:
+            self.logger.error(f"加载相关性模型失败，改用关键词规则筛选: {str(e)}")
+            return None
+    
+    def _create_session(self) -> requests.Session:
+        """创建带连接池和重试策略的HTTP会话"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        
+        # 幂等GET请求的重试与指数退避：连接错误、限流和服务端错误时重试
+        retry = Retry(
+            total=int(self.config.get('scraping', 'http_retries', fallback='2')),
+            backoff_factor=float(self.config.get('scraping', 'http_backoff_factor', fallback='0.5')),
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        
+        # pool_connections: 缓存连接池的主机数；pool_maxsize: 每个主机保持的长连接数
+        adapter = HTTPAdapter(
+            pool_connections=int(self.config.get('scraping', 'http_pool_hosts', fallback='32')),
+            pool_maxsize=int(self.config.get('scraping', 'http_pool_per_host', fallback='4')),
+            max_retries=retry
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def close(self):
+        """关闭HTTP会话、解析进程池和总结进程池，释放连接池"""
+        self.session.close()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True)
+            self._parse_pool = None
+        if self._summary_pool is not None:
+            self._summary_pool.shutdown(wait=True)
+            self._summary_pool = None
+    
+    def _download_feed(self, url: str, feed_state: Optional[Dict] = None, timeout: float = 30,
+                       max_bytes: Optional[int] = None) -> Tuple[requests.Response, bytes]:
+        """下载RSS源原始内容（阻塞I/O，由异步引擎放到线程池中执行）
+        
+        以流的方式读取响应体，超过 max_bytes 的部分不再读取，返回响应和读到的内容。
+        
+        如果有上次保存的ETag/Last-Modified，则发送条件请求，内容未变化时服务器返回304
+        """
+        headers = {}
+        # 校验值属于实际抓取的地址（自动发现的订阅地址优先）
+        if feed_state and (feed_state.get('feed_url') or feed_state.get('url')) == url:
+            if feed_state.get('etag'):
+                headers['If-None-Match'] = feed_state['etag']
+            if feed_state.get('last_modified'):
+                headers['If-Modified-Since'] = feed_state['last_modified']
+        
+        response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if max_bytes and len(body) >= max_bytes:
+                    del body[max_bytes:]
+                    break
+            return response, bytes(body)
+        finally:
+            response.close()
+    
+    def _max_feed_bytes(self, source_name: str) -> int:
+        """单个源的内容大小上限：[feed_max_bytes] 中的单独配置优先"""
+        return int(self.config.get('feed_max_bytes', source_name, fallback=str(self.max_feed_bytes)))
+    
+    def _parse_feed(self, content: bytes, source_name: str, watermark: Optional[Dict] = None,
+                    complete: bool = True, max_age_hours: float = 10) -> Tuple[List[Dict], Dict]:
+        """解析RSS原始内容为文章列表（CPU密集，由异步引擎交给执行器）
+        
+        watermark 为该源上次已处理的最新条目（last_entry_id、last_published），
+        已处理过的条目在提取摘要之前就被跳过。complete 为 False 表示内容因大小上限被截断。
+        max_age_hours 为该源的时间窗口。返回文章列表和更新后的高水位。
+        """
+        records, newest = parse_feed_records(content, watermark, complete, max_age_hours)
+        return self._build_articles(records, source_name), newest
+    
+    @staticmethod
+    def _build_articles(records: List[tuple], source_name: str) -> List[Dict]:
+        """将紧凑的解析记录还原为文章字典"""
+        articles = []
+        for title, link, summary, published_time, entry_id in records:
+            articles.append({
+                'title': title,
+                'link': link,
+                'summary': summary,
+                'published': published_time,
+                'source': source_name,
+                'entry_id': entry_id,
+                'content_hash': compute_content_hash(title, link)  # 用于去重，入库前各阶段复用
+            })
+        return articles
+    
+    @property
+    def feature_extractor(self):
+        """当前规则表的特征提取器（规则重新加载后随之更新）"""
+        return self.rules.extractor
+    
+    def _get_parse_pool(self) -> Optional[ProcessPoolExecutor]:
+        """按需创建解析进程池（parse_workers 为 0 时不使用）"""
+        if self.parse_workers <= 0:
+            return None
+        if self._parse_pool is None:
+            try:
+                self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+            except (NotImplementedError, OSError) as e:
+                # 平台不支持多进程（如没有 sem_open）：此后一律在线程中解析
+                self.logger.warning(f"无法创建解析进程池，改为在线程中解析: {str(e)}")
+                self.parse_workers = 0
+                return None
+        return self._parse_pool
+    
+    async def _parse_feed_async(self, content: bytes, source_name: str, watermark: Optional[Dict] = None,
+                                complete: bool = True, max_age_hours: float = 10) -> Tuple[List[Dict], Dict]:
+        """大体积内容交给进程池解析，小内容或进程池不可用时在线程中解析"""
+        loop = asyncio.get_running_loop()
+        pool = self._get_parse_pool() if len(content) >= self.parse_pool_min_bytes else None
+        
+        if pool is not None:
+            watermark = watermark or {}
+            try:
+                records, newest = await loop.run_in_executor(
+                    pool, parse_feed_records, content, {
+                        'last_entry_id': watermark.get('last_entry_id'),
+                        'last_published': watermark.get('last_published')
+                    }, complete, max_age_hours
+                )
+                return self._build_articles(records, source_name), newest
+            except BrokenProcessPool as e:
+                # 进程池不可用（如平台不支持多进程）：此后一律在线程中解析
+                self.logger.warning(f"解析进程池不可用，改为在线程中解析: {str(e)}")
+                self.parse_workers = 0
+                self._parse_pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+        
+        return await loop.run_in_executor(
+            None, self._parse_feed, content, source_name, watermark, complete, max_age_hours
+        )
+    
+    def _cached_feed_url(self, feed_state: Dict) -> Optional[str]:
+        """读取未过期的自动发现结果：订阅地址，'' 表示该网页没有订阅地址，None 表示需要（重新）发现"""
+        checked = feed_state.get('feed_url_checked')
+        if checked is None or datetime.now() - checked > timedelta(hours=self.feed_discovery_ttl_hours):
+            return None
+        return feed_state.get('feed_url') or ''
+    
+    def _fetch_window_hours(self, source_name: str) -> float:
+        """该源的时间窗口（小时）：不短于 fetch_window_hours，轮询间隔较长的源按调度器设置的窗口"""
+        return max(self.fetch_window_hours, self.source_fetch_windows.get(source_name, 0))
+    
+    def _adaptive_timeout(self, feed_state: Dict) -> float:
+        """根据该源最近响应时间的P95计算请求超时，样本不足时使用上限"""
+        latencies = sorted(feed_state.get('recent_latencies') or [])
+        if len(latencies) < 3:
+            return self.max_timeout_seconds
+        
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return min(self.max_timeout_seconds,
+                   max(self.min_timeout_seconds, p95 * self.timeout_latency_multiplier))
+    
+    @staticmethod
+    def _record_success(feed_state: Dict, latency: float) -> Dict:
+        """请求成功：关闭熔断并记录最近20次响应时间"""
+        latencies = (feed_state.get('recent_latencies') or []) + [latency]
+        return {
+            'consecutive_failures': 0,
+            'circuit_open_until': None,
+            'recent_latencies': latencies[-20:]
+        }
+    
+    def _record_failure(self, feed_state: Dict, source_name: str) -> Dict:
+        """请求失败：累计连续失败次数，达到阈值后按指数退避打开熔断"""
+        failures = (feed_state.get('consecutive_failures') or 0) + 1
+        open_until = None
+        
+        if failures >= self.circuit_failure_threshold:
+            backoff_minutes = min(
+                self.circuit_backoff_minutes * 2 ** (failures - self.circuit_failure_threshold),
+                self.circuit_max_backoff_hours * 60
+            )
+            open_until = datetime.now() + timedelta(minutes=backoff_minutes)
+            self.logger.warning(
+                f"{source_name} 已连续失败 {failures} 次，熔断 {backoff_minutes:.0f} 分钟"
+            )
+        
+        return {'consecutive_failures': failures, 'circuit_open_until': open_until}
+    
+    async def fetch_rss_feed_async(self, url: str, source_name: str,
+                                   semaphore: Optional[asyncio.Semaphore] = None,
+                                   io_executor: Optional[ThreadPoolExecutor] = None,
+                                   feed_state: Optional[Dict] = None,
+                                   watermarks: Optional[Dict] = None) -> List[Dict]:
+        """异步抓取RSS源数据：信号量限制在途请求数，下载和解析交给执行器
+        
+        传入 watermarks 时新的校验值、高水位和内容缓存只放进这个字典，由调用方在文章入库成功后
+        用 save_watermarks 保存，入库失败时下次不会因条件请求返回304或高水位而漏掉这些条目；
+        否则解析成功后立即保存。
+        """
         articles = []
+        loop = asyncio.get_running_loop()
+        semaphore = semaphore or asyncio.BoundedSemaphore(1)
+        
         try:
-            self.logger.info(f"正在抓取 {source_name}: {url}")
+            if feed_state is None:
+                feed_states = await loop.run_in_executor(None, self.database.get_feed_states)
+                feed_state = feed_states.get(source_name, {})
             
-            # 设置超时和重试
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
+            # URL变化后，旧的状态（校验值、高水位、健康状态）不再适用
+            if feed_state.get('url') != url:
+                feed_state = {}
             
-            # 解析RSS
-            feed = feedparser.parse(response.content)
+            # 熔断中的源直接跳过，等退避时间过后再试
+            open_until = feed_state.get('circuit_open_until')
+            if open_until and open_until > datetime.now():
+                self.logger.warning(
+                    f"{source_name} 熔断中（连续失败 {feed_state.get('consecutive_failures', 0)} 次），"
+                    f"{open_until.strftime('%Y-%m-%d %H:%M')} 前跳过"
+                )
+                return articles
             
-            for entry in feed.entries:
-                # 解析发布时间
-                published_time = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published_time = datetime(*entry.published_parsed[:6])
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    published_time = datetime(*entry.updated_parsed[:6])
-                else:
-                    published_time = datetime.now()
-                
-                # 只获取最近10小时的文章
-                if published_time and (datetime.now() - published_time).total_seconds() > 10 * 3600:
-                    continue
-                
-                # 提取摘要，处理HTML标签
-                summary = ""
-                if hasattr(entry, 'summary'):
-                    soup = BeautifulSoup(entry.summary, 'html.parser')
-                    summary = soup.get_text().strip()[:300] + "..."
-                
-                article = {
-                    'title': entry.title,
-                    'link': entry.link,
-                    'summary': summary,
-                    'published': published_time,
-                    'source': source_name,
-                    'content_hash': hash(entry.title + entry.link)  # 用于去重
-                }
+            # 配置的是网页而不是RSS时，使用缓存的自动发现结果
+            resolved_url = self._cached_feed_url(feed_state)
+            if resolved_url == '':
+                self.logger.info(f"{source_name} 的网页中没有RSS订阅地址，等待重新发现前跳过")
+                return articles
+            fetch_url = resolved_url or url
+            discovery = {}
+            
+            timeout = self._adaptive_timeout(feed_state)
+            max_age_hours = self._fetch_window_hours(source_name)
+            
+            # 先等到该主机的时间片再占用请求名额，等待同主机间隔时不阻塞其他主机的源
+            async with self.host_limiter.request_slot(fetch_url, semaphore):
+                self.logger.info(f"正在抓取 {source_name}: {fetch_url}（超时 {timeout:.0f} 秒）")
+                started = time.monotonic()
+                max_bytes = self._max_feed_bytes(source_name)
+                response, body = await loop.run_in_executor(
+                    io_executor, self._download_feed, fetch_url, feed_state, timeout, max_bytes
+                )
                 
-                articles.append(article)
+                if resolved_url is None:
+                    # 没有可用的发现结果：返回网页时从中查找订阅地址，返回RSS时清除旧的发现结果
+                    feed_url = None
+                    if response.status_code != 304 and looks_like_html(body):
+                        feed_url = discover_feed_url(body, response.url or url)
+                        if not feed_url:
+                            self.logger.warning(f"{source_name} 返回的是网页，且未找到RSS订阅地址")
+                            discovery = {'feed_url': '', 'feed_url_checked': datetime.now()}
+                            health = self._record_success(feed_state, time.monotonic() - started)
+                            await loop.run_in_executor(None, functools.partial(
+                                self.database.update_feed_state, source_name, url, **discovery, **health
+                            ))
+                            return articles
+                        
+                        self.logger.info(f"{source_name} 返回的是网页，发现RSS订阅地址: {feed_url}")
+                        await self.host_limiter.wait_async(feed_url)
+                        response, body = await loop.run_in_executor(
+                            io_executor, self._download_feed, feed_url, feed_state, timeout, max_bytes
+                        )
+                    discovery = {
+                        'feed_url': feed_url,
+                        'feed_url_checked': datetime.now() if feed_url else None
+                    }
                 
+                health = self._record_success(feed_state, time.monotonic() - started)
+            
+            # 内容未变化，无需解析
+            if response.status_code == 304:
+                self.logger.info(f"{source_name} 内容未更新（304），跳过解析")
+                await loop.run_in_executor(None, functools.partial(
+                    self.database.update_feed_state, source_name, url, **discovery, **health
+                ))
+                return articles
+            
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            
+            # 有些源不支持条件请求但返回完全相同的内容：哈希相同则复用上次的解析结果
+            body_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+            cached = await loop.run_in_executor(
+                None, self.database.get_feed_cache, source_name, self.feed_cache_ttl_hours
+            )
+            if cached and cached['body_hash'] == body_hash:
+                articles = self._filter_cached_articles(cached['articles'], feed_state, max_age_hours)
+                self.logger.info(f"{source_name} 内容与上次相同（缓存命中），跳过解析，获取到 {len(articles)} 篇文章")
+                if watermarks is not None:
+                    watermarks[source_name] = (url, validators, None)
+                    validators = {}
+                await loop.run_in_executor(None, functools.partial(
+                    self.database.update_feed_state, source_name, url, **validators, **discovery, **health
+                ))
+                return articles
+            
+            # 超过大小上限时只解析已读取的部分（最新的条目在前）
+            complete = len(body) < max_bytes
+            if not complete:
+                self.logger.warning(f"{source_name} 内容超过 {max_bytes} 字节上限，只解析前面的部分")
+            
+            # 解析不占用请求名额
+            articles, newest = await self._parse_feed_async(body, source_name, feed_state, complete, max_age_hours)
             self.logger.info(f"从 {source_name} 获取到 {len(articles)} 篇文章")
             
+            # 解析成功后再保存校验值、高水位和缓存，避免解析失败时下次被跳过
+            state = {**validators, **newest}
+            cache = (body_hash, [dict(article) for article in articles])
+            if watermarks is not None:
+                watermarks[source_name] = (url, state, cache)
+                state, cache = {}, None
+            await loop.run_in_executor(None, functools.partial(
+                self.database.update_feed_state, source_name, url,
+                **state, **discovery, **health
+            ))
+            if cache is not None:
+                await loop.run_in_executor(None, self.database.save_feed_cache, source_name, *cache)
+        
         except Exception as e:
             self.logger.error(f"抓取 {source_name} 时出错: {str(e)}")
+            health = self._record_failure(feed_state or {}, source_name)
+            await loop.run_in_executor(None, functools.partial(
+                self.database.update_feed_state, source_name, url, **health
+            ))
             
         return articles
     
+    @staticmethod
+    def _filter_cached_articles(articles: List[Dict], watermark: Dict, max_age_hours: float = 10) -> List[Dict]:
+        """对缓存的解析结果重新应用高水位和时间窗口，结果与重新解析相同内容一致"""
+        last_entry_id = watermark.get('last_entry_id')
+        last_published = watermark.get('last_published')
+        if last_published is None and last_entry_id is not None:
+            # 无发布时间的源按倒序排列：与实时解析一样取到上次最新的条目为止，发布时间记为当前时间
+            fresh_articles = []
+            for article in articles:
+                if article.get('entry_id') == last_entry_id:
+                    break
+                fresh_articles.append(dict(article, published=datetime.now()))
+            return fresh_articles
+        
+        # 没有高水位（首次抓取，或上次入库失败未保存）时只按时间窗口筛选
+        fresh_articles = []
+        for article in articles:
+            published_time = article['published']
+            if last_published and (published_time < last_published or (
+                    published_time == last_published and article.get('entry_id') == last_entry_id)):
+                continue
+            if (datetime.now() - published_time).total_seconds() > max_age_hours * 3600:
+                continue
+            fresh_articles.append(article)
+        
+        return fresh_articles
+    
+    def fetch_rss_feed(self, url: str, source_name: str) -> List[Dict]:
+        """抓取RSS源数据（同步接口，封装异步实现）
+        
+        内部使用 asyncio.run，只能在没有运行中事件循环的线程里调用，事件循环内请 await fetch_rss_feed_async，
+        否则抛出 RuntimeError。
+        """
+        return _run_sync(self.fetch_rss_feed_async(url, source_name), 'fetch_rss_feed_async')
+    
     def scrape_web_article(self, url: str) -> Optional[str]:
         """抓取网页文章内容（备用方法）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=20)
+            response = self.session.get(url, timeout=20)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -116,16 +915,58 @@ class AINewsScraper:
             self.logger.error(f"抓取网页内容失败 {url}: {str(e)}")
             return None
     
-    def get_ai_news(self) -> List[Dict]:
-        """获取所有AI资讯"""
+    async def get_ai_news_async(self, source_names: Optional[List[str]] = None,
+                                watermarks: Optional[Dict] = None) -> List[Dict]:
+        """异步获取AI资讯（不会阻塞调用方的事件循环），source_names 为 None 时抓取所有源
+        
+        watermarks 见 fetch_rss_feed_async：传入时各源的高水位留给调用方在入库成功后保存。
+        """
         all_articles = []
+        sources = {
+            source_name: url for source_name, url in self.rss_sources.items()
+            if source_names is None or source_name in source_names
+        }
+        semaphore = asyncio.BoundedSemaphore(max(1, self.fetch_workers))
         
-        for source_name, url in self.rss_sources.items():
-            articles = self.fetch_rss_feed(url, source_name)
-            all_articles.extend(articles)
-            
-            # 添加延迟，避免请求过快
-            time.sleep(2)
+        # 一次性读取所有源的状态
+        loop = asyncio.get_running_loop()
+        feed_states = await loop.run_in_executor(None, self.database.get_feed_states)
+        
+        io_executor = ThreadPoolExecutor(max_workers=max(1, self.fetch_workers))
+        tasks = [
+            asyncio.ensure_future(self.fetch_rss_feed_async(
+                url, source_name, semaphore, io_executor, feed_states.get(source_name, {}), watermarks
+            ))
+            for source_name, url in sources.items()
+        ]
+        
+        done, pending = set(), set()
+        try:
+            # 整个抓取阶段有时限，超时后放弃未完成的源，返回部分结果
+            if tasks:
+                done, pending = await asyncio.wait(tasks, timeout=self.fetch_deadline_seconds)
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                unfinished = [name for name, task in zip(sources, tasks) if task in pending]
+                self.logger.warning(
+                    f"抓取超过整体时限 {self.fetch_deadline_seconds:.0f} 秒，返回部分结果，"
+                    f"未完成的源: {', '.join(unfinished)}"
+                )
+        finally:
+            # 不等待仍在进行的请求线程，它们会在各自的超时后结束
+            io_executor.shutdown(wait=False, cancel_futures=True)
+        
+        # 按提交顺序收集结果，保证输出顺序稳定
+        for task in tasks:
+            if task in done:
+                all_articles.extend(task.result())
+        
+        # 淘汰过期或超出容量上限的原始内容缓存
+        await loop.run_in_executor(
+            None, self.database.evict_feed_cache, self.feed_cache_max_bytes, self.feed_cache_ttl_hours
+        )
         
         # 按发布时间排序
         all_articles.sort(key=lambda x: x['published'], reverse=True)
@@ -133,104 +974,60 @@ class AINewsScraper:
         self.logger.info(f"总共获取到 {len(all_articles)} 篇AI资讯")
         return all_articles
     
+    def get_ai_news(self, source_names: Optional[List[str]] = None,
+                    watermarks: Optional[Dict] = None) -> List[Dict]:
+        """获取AI资讯（同步接口，封装异步实现），source_names 为 None 时抓取所有源
+        
+        内部使用 asyncio.run，只能在没有运行中事件循环的线程里调用，事件循环内请 await get_ai_news_async，
+        否则抛出 RuntimeError。
+        """
+        return _run_sync(self.get_ai_news_async(source_names, watermarks), 'get_ai_news_async')
+    
+    def save_watermarks(self, watermarks: Dict):
+        """保存抓取时暂存的源状态，在文章入库成功后调用
+        
+        watermarks 为 来源 -> (url, 校验值和高水位, (响应体哈希, 解析结果) 或 None)。
+        """
+        for source_name, (url, state, cache) in watermarks.items():
+            self.database.update_feed_state(source_name, url, **state)
+            if cache is not None:
+                self.database.save_feed_cache(source_name, *cache)
+    
     def filter_ai_keywords(self, articles: List[Dict]) -> List[Dict]:
         """根据AI关键词过滤文章（多层筛选，更精准）"""
         
-        # 第一层：高优先级关键词（新工具、新模型发布相关）
-        high_priority_keywords = [
-            # 新AI工具/平台发布
-            'released', 'launched', 'introduced', 'unveiled', 'announced', 'debuts',
-            '发布', '推出', '上线', '发布会', '正式发布', '宣布', '首发', '开源',
-            
-            # 新大模型相关
-            'new model', 'latest model', 'breakthrough model', 'next-generation',
-            '新模型', '最新模型', '新一代', '突破性模型', '全新模型',
-            
-            # 版本更新
-            'version', 'v2', 'v3', 'v4', '2.0', '3.0', '4.0', 'update', 'upgrade',
-            '版本', '升级', '更新', 'beta', 'alpha',
-            
-            # 技术突破
-            'breakthrough', 'milestone', 'achievement', 'innovation', 'revolutionary',
-            '突破', '里程碑', '创新', '革命性', '颠覆性',
-        ]
+        extractor = self.feature_extractor
         
-        # 第二层：核心AI技术关键词
-        core_ai_keywords = [
-            # 大模型相关
-            'gpt', 'llm', 'large language model', 'transformer', 'chatgpt', 'claude', 
-            'gemini', 'llama', 'bert', 'palm', 'deepseek', 'qwen', 'baichuan',
-            '大语言模型', '大模型', '生成式AI', '对话模型',
-            
-            # AI工具平台
-            'copilot', 'cursor', 'qoder', 'trae', 'midjourney', 'dalle', 'stable diffusion',
-            'sora', 'runway', 'luma', 'pika', 'kling', '文心一言', '通义千问', 'kimi',
-            
-            # 技术公司/组织
-            'openai', 'anthropic', 'google ai', 'deepmind', 'microsoft ai', 'meta ai',
-            'nvidia', 'hugging face', '百度', '阿里巴巴', '腾讯', '字节跳动', '华为',
-            '科大讯飞', '商汤', '旷视', '智谱AI', '月之暗面', '面壁智能',
-            
-            # AI应用领域
-            'artificial intelligence', 'machine learning', 'deep learning', 'neural network',
-            'computer vision', 'natural language processing', 'generative ai', 'multimodal',
-            '人工智能', '机器学习', '深度学习', '神经网络', '计算机视觉', 
-            '自然语言处理', '多模态', '智能体', 'agent',
-        ]
+        # 一次扫描得到每篇文章所有指示词的命中（同一关键词只计一次），后续总结复用这份特征
+        features_list = [extractor.extract(article['title'], article['summary']) for article in articles]
+        for article, features in zip(articles, features_list):
+            article['features'] = features
         
-        # 第三层：排除关键词（降低噪音）
-        exclude_keywords = [
-            'advertisement', 'promotion', 'marketing', 'sponsored', 'affiliate',
-            '广告', '推广', '营销', '赞助', '联盟',
-            'tutorial', 'how to', 'guide', 'tips', 'tricks',
-            '教程', '如何', '指南', '技巧', '攻略',
-        ]
+        # 配置了学习模型时整批推理；否则用关键词规则，文章数量多且安装了NumPy时批量打分
+        if self.relevance_model is not None:
+            scores, order = self.relevance_model.rank(
+                [f"{article['title']} {article['summary']}" for article in articles]
+            )
+        elif np is not None and len(articles) >= self.batch_scoring_min_articles:
+            scores, order = self._rank_articles_batch(features_list)
+        else:
+            scores, order = self._rank_articles(features_list)
         
+        # 按相关性分数降序输出
         filtered_articles = []
-        for article in articles:
-            title = article['title']
-            summary = article['summary']
-            content = f"{title} {summary}"
-            content_lower = content.lower()
-            
-            # 计算文章相关性分数
-            relevance_score = 0
-            detected_keywords = []
-            
-            # 检查高优先级关键词（权重3）
-            for keyword in high_priority_keywords:
-                if keyword.lower() in content_lower:
-                    relevance_score += 3
-                    detected_keywords.append(keyword)
-            
-            # 检查核心AI关键词（权重1）
-            for keyword in core_ai_keywords:
-                if keyword.lower() in content_lower:
-                    relevance_score += 1
-                    detected_keywords.append(keyword)
-            
-            # 检查排除关键词（负权重）
-            for keyword in exclude_keywords:
-                if keyword.lower() in content_lower:
-                    relevance_score -= 2
+        for index in order:
+            article = articles[index]
+            features = features_list[index]
+            detected_keywords = (
+                [extractor.keyword('high', i) for i in features.matched('high')] +
+                [extractor.keyword('core', i) for i in features.matched('core')]
+            )
             
-            # 额外加分项：标题中包含关键词
-            title_lower = title.lower()
-            if any(keyword.lower() in title_lower for keyword in high_priority_keywords):
-                relevance_score += 2
-            
-            # 筛选条件：相关性分数 >= 4 且包含至少一个核心关键词
-            has_core_keyword = any(keyword.lower() in content_lower for keyword in core_ai_keywords)
-            
-            if relevance_score >= 4 and has_core_keyword:
-                # 去重并限制关键词数量
-                unique_keywords = list(dict.fromkeys(detected_keywords))  # 保持顺序去重
-                article['detected_keywords'] = unique_keywords[:5]
-                article['relevance_score'] = relevance_score
-                filtered_articles.append(article)
-        
-        # 按相关性分数降序排序
-        filtered_articles.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+            # 去重并限制关键词数量
+            unique_keywords = list(dict.fromkeys(detected_keywords))  # 保持顺序去重
+            article['detected_keywords'] = unique_keywords[:5]
+            article['relevance_score'] = scores[index]
+            filtered_articles.append(article)
         
         self.logger.info(f"使用精准筛选策略，过滤后剩余 {len(filtered_articles)} 篇高质量AI文章")
         
@@ -240,155 +1037,157 @@ class AINewsScraper:
             
         return filtered_articles
     
+    @staticmethod
+    def _rank_articles(features_list: List[ArticleFeatures]) -> Tuple[List[int], List[int]]:
+        """逐篇计算相关性分数，返回所有文章的分数和入选文章按分数降序的下标"""
+        scores = []
+        selected = []
+        for index, features in enumerate(features_list):
+            # 计算文章相关性分数：高优先级关键词权重3，核心AI关键词权重1，排除关键词负权重
+            relevance_score = 3 * features.count('high') + features.count('core') - 2 * features.count('exclude')
+            
+            # 额外加分项：标题中包含关键词
+            if features.in_title('high'):
+                relevance_score += 2
+            scores.append(relevance_score)
+            
+            # 筛选条件：相关性分数 >= 4 且包含至少一个核心关键词
+            if relevance_score >= 4 and features.has('core'):
+                selected.append(index)
+        
+        # 稳定排序：同分文章保持原有顺序
+        selected.sort(key=lambda i: scores[i], reverse=True)
+        return scores, selected
+    
+    @staticmethod
+    def _rank_articles_batch(features_list: List[ArticleFeatures]) -> Tuple[List[int], List[int]]:
+        """用NumPy批量计算相关性分数（结果与 _rank_articles 相同）
+        
+        同一层的关键词权重相同，文章×关键词的命中矩阵乘以权重向量，等价于
+        文章×[高优先级、核心、排除命中数, 标题加分] 的计数矩阵乘以 [3, 1, -2, 2]。
+        筛选和排序都用数组运算完成。
+        """
+        count = len(features_list)
+        empty = ()
+        counts = np.fromiter(itertools.chain.from_iterable(
+            (len(f.hits.get('high', empty)), len(f.hits.get('core', empty)),
+             len(f.hits.get('exclude', empty)), 'high' in f.title_groups)
+            for f in features_list
+        ), dtype=np.int64, count=4 * count).reshape(count, 4)
+        
+        scores = counts @ np.array([3, 1, -2, 2], dtype=np.int64)
+        has_core_keyword = counts[:, 1] > 0
+        
+        # 稳定排序：同分文章保持原有顺序
+        selected = np.flatnonzero((scores >= 4) & has_core_keyword)
+        selected = selected[np.argsort(-scores[selected], kind='stable')]
+        return scores.tolist(), selected.tolist()
+    
     def summarize_article(self, article: Dict) -> str:
-        """对单篇文章进行精简智能总结"""
+        """对单篇文章进行精简智能总结，返回渲染后的总结文本（用于直接显示）"""
+        fields = self.summarize_article_fields(article)
+        if not fields:
+            return f"文章标题: {article.get('title', '')}。总结生成失败"
+        return render_summary({**article, **fields})
+    
+    def summarize_article_fields(self, article: Dict) -> Dict:
+        """对单篇文章进行精简智能总结，返回编码后的总结字段（insight_code、value_tier），失败时返回空字典
+        
+        数据库只保存这些编码，邮件和界面显示时再渲染为文字。
+        """
         try:
             title = article.get('title', '')
             summary = article.get('summary', '')
-            source = article.get('source', '')
             keywords = article.get('detected_keywords', [])
             
-            # 合并标题和摘要用于分析
-            content = f"{title} {summary}"
+            # 复用筛选阶段的特征记录，未经过筛选的文章在这里提取
+            features = article.get('features') or self.feature_extractor.extract(title, summary)
             
             # 提取关键信息
-            analysis_result = self._analyze_content_concise(content, keywords)
-            
-            # 生成精简的结构化总结
-            summary_text = f"""
-📰 {title}
-
-🎯 核心亮点：{analysis_result['key_insight']}
-
-📊 价值判断：{analysis_result['value_assessment']}
-
-📱 来源：{source}
-"""
-            
-            return summary_text
+            return self._analyze_content_concise(features, keywords)
             
         except Exception as e:
             self.logger.error(f"文章总结失败: {str(e)}")
-            return f"文章标题: {article.get('title', '')}。总结生成失败：{str(e)}"
+            return {}
     
-    def _analyze_content_concise(self, content: str, keywords: List[str]) -> Dict[str, str]:
-        """精简分析文章内容并提取关键信息"""
-        content_lower = content.lower()
-        
+    def _analyze_content_concise(self, features: ArticleFeatures, keywords: List[str]) -> Dict:
+        """精简分析文章内容并提取关键信息（编码形式）"""
         # 核心亮点提取（一句话概括）
-        key_insight = self._extract_key_insight(content, keywords)
+        insight_code = self._extract_key_insight(features, keywords)
         
         # 价值判断（简洁评估）
-        value_assessment = self._assess_value(content, keywords)
+        value_tier = self._assess_value(features, keywords)
         
         return {
-            'key_insight': key_insight,
-            'value_assessment': value_assessment
+            'insight_code': insight_code,
+            'value_tier': value_tier
         }
     
-    def _extract_key_insight(self, content: str, keywords: List[str]) -> str:
-        """提取核心亮点（一句话总结）"""
-        content_lower = content.lower()
-        
+    def _extract_key_insight(self, features: ArticleFeatures, keywords: List[str]) -> str:
+        """提取核心亮点编码（对应 summary_format.KEY_INSIGHTS 中的一句话总结，只依据筛选出的关键词）"""
+        rules = self.rules
         # 根据关键词类型生成精简亮点
         
         # 新模型/工具发布
-        if any(kw in ['released', 'launched', 'unveiled', '发布', '推出', '上线'] for kw in keywords):
-            if any(kw in ['gpt', 'llm', '大语言模型', '大模型'] for kw in keywords):
-                return "新大语言模型正式发布，性能和能力有显著提升"
-            elif any(kw in ['ai tool', 'platform', '平台', '工具'] for kw in keywords):
-                return "新AI工具/平台发布，为用户提供更好的AI体验"
+        if rules.has_keyword(keywords, 'insight_release'):
+            if rules.has_keyword(keywords, 'insight_llm'):
+                return 'llm_release'
+            elif rules.has_keyword(keywords, 'insight_tool'):
+                return 'tool_release'
             else:
-                return "重要AI产品或技术正式发布"
+                return 'release'
         
         # 技术突破
-        elif any(kw in ['breakthrough', 'milestone', '突破', '里程碑', '创新'] for kw in keywords):
-            if any(kw in ['performance', '性能', 'capability', '能力'] for kw in keywords):
-                return "技术性能实现重大突破，超越现有水平"
+        elif rules.has_keyword(keywords, 'insight_breakthrough'):
+            if rules.has_keyword(keywords, 'insight_performance'):
+                return 'performance'
             else:
-                return "AI技术取得重要突破性进展"
+                return 'breakthrough'
         
         # 投资融资
-        elif any(kw in ['investment', 'funding', '融资', '投资'] for kw in keywords):
-            return "AI公司获得重要资本注入，促进技术发展"
+        elif rules.has_keyword(keywords, 'insight_funding'):
+            return 'funding'
         
         # 版本更新
-        elif any(kw in ['version', 'update', 'upgrade', '版本', '升级', '更新'] for kw in keywords):
-            return "产品版本重大更新，功能和性能进一步优化"
+        elif rules.has_keyword(keywords, 'insight_update'):
+            return 'update'
         
         # 合作伙伴
-        elif any(kw in ['partnership', 'collaboration', '合作', '战略联盟'] for kw in keywords):
-            return "AI领域重要合作达成，推动行业发展"
+        elif rules.has_keyword(keywords, 'insight_partnership'):
+            return 'partnership'
         
         # 市场竞争
-        elif any(kw in ['competition', 'market', '竞争', '市场'] for kw in keywords):
-            return "AI市场竞争格局发生变化，影响行业走向"
+        elif rules.has_keyword(keywords, 'insight_market'):
+            return 'market'
         
         # 政策监管
-        elif any(kw in ['policy', 'regulation', '政策', '监管', '法规'] for kw in keywords):
-            return "AI相关政策或监管出台，影响行业发展方向"
+        elif rules.has_keyword(keywords, 'insight_policy'):
+            return 'policy'
         
         # 默认情况
         else:
-            return "AI领域值得关注的重要动态"
-    
-    def _assess_value(self, content: str, keywords: List[str]) -> str:
-        """评估文章价值（简洁判断）"""
-        content_lower = content.lower()
-        
-        # 高价值关键词
-        high_value_indicators = [
-            'breakthrough', 'revolutionary', 'milestone', 'first-ever', 'unprecedented',
-            '突破', '革命性', '里程碑', '首次', '史上首次', '前所未有',
-            'launched', 'released', 'unveiled', 'announced',
-            '发布', '推出', '上线', '正式发布'
-        ]
-        
-        # 中等价值关键词
-        medium_value_indicators = [
-            'funding', 'investment', 'partnership', 'collaboration',
-            '融资', '投资', '合作', '战略联盟',
-            'update', 'upgrade', 'improvement',
-            '更新', '升级', '改进'
-        ]
-        
-        # 低价值关键词
-        low_value_indicators = [
-            'analysis', 'report', 'study', 'survey', 'tutorial',
-            '分析', '报告', '研究', '调查', '教程'
-        ]
-        
-        # 计算价值分数
-        value_score = 0
-        
-        for indicator in high_value_indicators:
-            if indicator.lower() in content_lower:
-                value_score += 3
-                
-        for indicator in medium_value_indicators:
-            if indicator.lower() in content_lower:
-                value_score += 2
-                
-        for indicator in low_value_indicators:
-            if indicator.lower() in content_lower:
-                value_score -= 1
+            return 'general'
+    
+    def _assess_value(self, features: ArticleFeatures, keywords: List[str]) -> int:
+        """评估文章价值等级（对应 summary_format.VALUE_TIERS，3 最高）"""
+        # 计算价值分数：高价值指示词+3，中等价值+2，低价值-1
+        value_score = (3 * features.count('value_high') + 2 * features.count('value_medium') -
+                       features.count('value_low'))
         
-        # 根据分数返回价值判断
+        # 根据分数返回价值等级
         if value_score >= 6:
-            return "🔥 高价值资讯，对行业影响重大"
+            return 3
         elif value_score >= 3:
-            return "🟡 重要资讯，值得持续关注"
+            return 2
         elif value_score >= 0:
-            return "🔵 一般资讯，了解即可"
+            return 1
         else:
-            return "⚪ 参考信息，价值有限"
+            return 0
     
     def _generate_content_summary(self, content: str) -> str:
         """生成内容概述"""
-        # 简化内容，去除HTML标签和多余空格
-        import re
-        clean_content = re.sub(r'<[^>]+>', '', content)
-        clean_content = ' '.join(clean_content.split())
+        # 去除HTML标签和多余空格，多取一个字符用于判断是否需要截断
+        clean_content = html_to_text(content, 301)
         
         # 截取前300个字符作为概述基础
         if len(clean_content) > 300:
@@ -398,44 +1197,44 @@ class AINewsScraper:
             
         return summary_base
     
-    def _extract_key_points(self, content: str, keywords: List[str]) -> str:
+    def _extract_key_points(self, features: ArticleFeatures, keywords: List[str]) -> str:
         """提取核心要点"""
-        content_lower = content.lower()
+        rules = self.rules
         points = []
         
         # 根据不同类型的AI关键词提取要点
-        if any(kw in ['ChatGPT', 'GPT', '大语言模型', 'LLM', '生成式AI'] for kw in keywords):
-            if 'gpt' in content_lower or 'chatgpt' in content_lower:
+        if rules.has_keyword(keywords, 'points_llm'):
+            if features.has('llm'):
                 points.append("• 涉及大语言模型技术发展")
-            if any(word in content_lower for word in ['升级', 'update', '更新', '发布']):
+            if features.has('release'):
                 points.append("• 可能包含技术升级或新版本发布")
                 
-        elif any(kw in ['机器学习', 'machine learning', 'ML', '深度学习'] for kw in keywords):
-            if any(word in content_lower for word in ['算法', 'algorithm', '模型', 'model']):
+        elif rules.has_keyword(keywords, 'points_ml'):
+            if features.has('algorithm'):
                 points.append("• 涉及机器学习算法或模型改进")
-            if any(word in content_lower for word in ['训练', 'training', '数据', 'data']):
+            if features.has('training'):
                 points.append("• 可能讨论训练方法或数据处理技术")
                 
-        elif any(kw in ['自动驾驶', '智能驾驶', 'autonomous', '汽车'] for kw in keywords):
-            if any(word in content_lower for word in ['测试', 'test', '路测', '试验']):
+        elif rules.has_keyword(keywords, 'points_autonomous'):
+            if features.has('testing'):
                 points.append("• 可能涉及自动驾驶测试或试验")
-            if any(word in content_lower for word in ['安全', 'safety', '事故', '法规']):
+            if features.has('safety_regulation'):
                 points.append("• 关注自动驾驶安全性或法规问题")
                 
-        elif any(kw in ['机器人', 'robot', 'robotics'] for kw in keywords):
-            if any(word in content_lower for word in ['服务', 'service', '应用', 'application']):
+        elif rules.has_keyword(keywords, 'points_robot'):
+            if features.has('service_application'):
                 points.append("• 涉及机器人服务应用")
-            if any(word in content_lower for word in ['制造', 'manufacturing', '工业', 'industrial']):
+            if features.has('industrial'):
                 points.append("• 可能关注工业机器人发展")
                 
         # 通用要点检测
-        if any(word in content_lower for word in ['突破', 'breakthrough', '创新', 'innovation']):
+        if features.has('innovation'):
             points.append("• 可能包含技术突破或创新")
-        if any(word in content_lower for word in ['投资', 'investment', '融资', 'funding']):
+        if features.has('funding'):
             points.append("• 涉及投资或融资信息")
-        if any(word in content_lower for word in ['竞争', 'competition', '市场', 'market']):
+        if features.has('competition'):
             points.append("• 涉及市场竞争态势")
-        if any(word in content_lower for word in ['政策', 'policy', '监管', 'regulation']):
+        if features.has('regulation'):
             points.append("• 可能涉及政策或监管动态")
             
         if not points:
@@ -443,46 +1242,76 @@ class AINewsScraper:
             
         return '\n'.join(points[:4])  # 最多显示4个要点
     
-    def _analyze_impact(self, content: str, keywords: List[str]) -> str:
+    def _analyze_impact(self, features: ArticleFeatures, keywords: List[str]) -> str:
         """分析潜在影响"""
-        content_lower = content.lower()
-        
+        rules = self.rules        
         # 技术影响分析
-        if any(kw in ['ChatGPT', 'GPT', '大语言模型'] for kw in keywords):
-            if any(word in content_lower for word in ['能力', 'capability', '性能', 'performance']):
+        if rules.has_keyword(keywords, 'impact_llm'):
+            if features.has('capability'):
                 return "可能对AI对话系统和自然语言处理领域产生积极影响"
-            elif any(word in content_lower for word in ['风险', 'risk', '问题', 'problem']):
+            elif features.has('risk'):
                 return "需要关注大语言模型的潜在风险和伦理问题"
                 
-        elif any(kw in ['自动驾驶', '智能驾驶'] for kw in keywords):
-            if any(word in content_lower for word in ['安全', 'safety']):
+        elif rules.has_keyword(keywords, 'impact_autonomous'):
+            if features.has('safety'):
                 return "对交通安全和智能交通系统发展具有重要意义"
-            elif any(word in content_lower for word in ['商业化', 'commercial']):
+            elif features.has('commercial'):
                 return "可能推动自动驾驶技术的商业化进程"
                 
-        elif any(kw in ['机器人'] for kw in keywords):
-            if any(word in content_lower for word in ['服务', 'service']):
+        elif rules.has_keyword(keywords, 'impact_robot'):
+            if features.has('service'):
                 return "可能改变服务行业的工作模式和效率"
-            elif any(word in content_lower for word in ['制造', 'manufacturing']):
+            elif features.has('manufacturing'):
                 return "对制造业自动化和效率提升有积极作用"
                 
         # 通用影响分析
-        if any(word in content_lower for word in ['突破', 'breakthrough']):
+        if features.has('breakthrough'):
             return "技术突破可能推动整个AI行业的发展进步"
-        elif any(word in content_lower for word in ['投资', 'investment', '融资']):
+        elif features.has('capital'):
             return "资本动向可能影响AI产业的发展方向和速度"
-        elif any(word in content_lower for word in ['政策', 'policy', '监管']):
+        elif features.has('policy'):
             return "政策变化可能对AI行业发展产生规范和引导作用"
         else:
             return "为AI技术发展和应用提供有价值的参考信息"
     
-    def summarize_articles_batch(self, articles: List[Dict]) -> List[Dict]:
-        """批量对文章进行总结"""
+    def summarize_articles_batch(self, articles: List[Dict],
+                                 progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """批量对文章进行总结，总结字段（insight_code、value_tier）写入各篇文章（结果顺序与输入一致）
+        
+        文章数达到 summary_pool_min_articles 且配置了 summary_workers 时分块交给进程池并行总结，
+        否则逐篇总结；进程池不可用时剩余部分改为逐篇总结。
+        progress(已完成数, 总数) 在每完成一块后调用，默认写日志。
+        """
         try:
-            self.logger.info(f"开始对 {len(articles)} 篇文章进行总结...")
+            total = len(articles)
+            self.logger.info(f"开始对 {total} 篇文章进行总结...")
+            progress = progress or (lambda done, count: self.logger.info(f"总结进度: {done}/{count}"))
             
-            for article in articles:
-                article['ai_summary'] = self.summarize_article(article)
+            done = 0
+            pool = self._get_summary_pool() if total >= self.summary_pool_min_articles else None
+            if pool is not None:
+                chunk_size = max(1, self.summary_chunk_size)
+                chunks = [
+                    [_summary_payload(article) for article in articles[start:start + chunk_size]]
+                    for start in range(0, total, chunk_size)
+                ]
+                try:
+                    for summaries in pool.map(_summarize_chunk, chunks):
+                        for article, fields in zip(articles[done:done + len(summaries)], summaries):
+                            article.update(fields)
+                        done += len(summaries)
+                        progress(done, total)
+                except BrokenProcessPool as e:
+                    # 进程池不可用（如平台不支持多进程）：此后一律逐篇总结
+                    self.logger.warning(f"总结进程池不可用，剩余 {total - done} 篇改为逐篇总结: {str(e)}")
+                    self.summary_workers = 0
+                    self._summary_pool = None
+                    pool.shutdown(wait=False, cancel_futures=True)
+            
+            for article in articles[done:]:
+                article.update(self.summarize_article_fields(article))
+            if done < total:
+                progress(total, total)
             
             self.logger.info(f"文章总结完成")
             return articles
@@ -490,6 +1319,71 @@ class AINewsScraper:
         except Exception as e:
             self.logger.error(f"批量文章总结失败: {str(e)}")
             return articles
+    
+    def _get_summary_pool(self) -> Optional[ProcessPoolExecutor]:
+        """按需创建总结进程池（summary_workers 为 0 时不使用），每个进程启动时载入一次规则表
+        
+        规则表重新加载后（哈希变化）关闭旧进程池并用新规则重建，与逐篇总结使用同一份规则。
+        """
+        if self.summary_workers <= 0:
+            return None
+        if self._summary_pool is not None and self._summary_pool_digest != self.rules.digest:
+            self.logger.info("规则表已更新，重建总结进程池")
+            self._summary_pool.shutdown(wait=True)
+            self._summary_pool = None
+        if self._summary_pool is None:
+            try:
+                self._summary_pool = ProcessPoolExecutor(
+                    max_workers=self.summary_workers,
+                    initializer=_init_summary_worker,
+                    initargs=(self.rules,)
+                )
+            except (NotImplementedError, OSError) as e:
+                # 平台不支持多进程（如没有 sem_open）：此后一律逐篇总结
+                self.logger.warning(f"无法创建总结进程池，改为逐篇总结: {str(e)}")
+                self.summary_workers = 0
+                return None
+            self._summary_pool_digest = self.rules.digest
+        return self._summary_pool
+
+
+class _SummaryWorker:
+    """总结进程中的总结器：只带规则表，总结逻辑直接复用 AINewsScraper 的方法"""
+    
+    summarize_article_fields = AINewsScraper.summarize_article_fields
+    _analyze_content_concise = AINewsScraper._analyze_content_concise
+    _extract_key_insight = AINewsScraper._extract_key_insight
+    _assess_value = AINewsScraper._assess_value
+    feature_extractor = AINewsScraper.feature_extractor
+    
+    def __init__(self, rules: KeywordRules):
+        self.rules = rules
+        self.logger = logging.getLogger(__name__)
+
+
+_summary_worker = None
+
+
+def _init_summary_worker(rules: KeywordRules):
+    """总结进程的初始化函数"""
+    global _summary_worker
+    _summary_worker = _SummaryWorker(rules)
+
+
+def _summary_payload(article: Dict) -> Dict:
+    """总结用到的文章字段（只把这些字段发送给总结进程）"""
+    return {
+        'title': article.get('title', ''),
+        'summary': article.get('summary', ''),
+        'source': article.get('source', ''),
+        'detected_keywords': article.get('detected_keywords', []),
+        'features': article.get('features')
+    }
+
+
+def _summarize_chunk(articles: List[Dict]) -> List[Dict]:
+    """在总结进程中总结一块文章，返回各篇的总结字段"""
+    return [_summary_worker.summarize_article_fields(article) for article in articles]
 
 if __name__ == "__main__":
     # 测试抓取功能
@@ -0,0 +1,105 @@
+import re
+import zlib
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：没有NumPy时不能使用学习模型，筛选退回关键词规则
+    np = None
+
+# 模型文件格式版本，特征提取方式变化时递增，使旧模型失效
+MODEL_FORMAT_VERSION = 1
+
+# 英文按单词、中文按单字切分，特征为单个词元和相邻两个词元
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]')
+
+
+def hashed_ngrams(text: str, feature_bits: int) -> List[int]:
+    """把文本转为哈希n-gram特征下标（去重），下标范围为 [0, 2**feature_bits)"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    ngrams = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+    mask = (1 << feature_bits) - 1
+    # crc32 与进程无关，训练和推理得到的下标一致
+    return list({zlib.crc32(ngram.encode('utf-8')) & mask for ngram in ngrams})
+
+
+def featurize(texts: Sequence[str], feature_bits: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """批量提取特征，返回 (所有文章的特征下标拼接, 每个下标所属的文章序号)"""
+    rows = [hashed_ngrams(text, feature_bits) for text in texts]
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    indices = np.fromiter((i for row in rows for i in row), dtype=np.int64, count=int(lengths.sum()))
+    return indices, np.repeat(np.arange(len(rows)), lengths)
+
+
+class RelevanceModel:
+    """相关性学习模型：哈希n-gram特征上的线性模型，权重由朴素贝叶斯的对数几率比得到
+    
+    推理对整批文章一次完成：取出所有特征的权重后按文章求和，不逐篇循环打分。
+    模型文件只保存训练中出现过的特征的权重，加载时展开为稠密数组。
+    """
+    
+    def __init__(self, weights: 'np.ndarray', bias: float, feature_bits: int, threshold: float = 0.5):
+        self.weights = weights
+        self.bias = bias
+        self.feature_bits = feature_bits
+        self.threshold = threshold
+    
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[int], feature_bits: int = 18,
+              alpha: float = 1.0, threshold: float = 0.5) -> 'RelevanceModel':
+        """用标注数据训练（labels 中 1 表示相关，0 表示不相关），两类都至少需要一篇"""
+        labels = np.asarray(labels, dtype=bool)
+        if labels.all() or not labels.any():
+            raise ValueError("训练数据需要同时包含相关和不相关的文章")
+        
+        size = 1 << feature_bits
+        indices, rows = featurize(texts, feature_bits)
+        positive = labels[rows]
+        positive_counts = np.bincount(indices[positive], minlength=size).astype(np.float64)
+        negative_counts = np.bincount(indices[~positive], minlength=size).astype(np.float64)
+        
+        # 平滑后的对数几率比，只保留训练中出现过的特征
+        weights = (np.log((positive_counts + alpha) / (positive_counts.sum() + alpha * size)) -
+                   np.log((negative_counts + alpha) / (negative_counts.sum() + alpha * size)))
+        weights[(positive_counts + negative_counts) == 0] = 0
+        bias = float(np.log(labels.sum() / (~labels).sum()))
+        
+        return cls(weights.astype(np.float32), bias, feature_bits, threshold)
+    
+    @classmethod
+    def load(cls, path: str) -> 'RelevanceModel':
+        """从模型文件加载"""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != MODEL_FORMAT_VERSION:
+                raise ValueError(f"模型文件版本不兼容: {int(data['version'])}")
+            
+            feature_bits = int(data['feature_bits'])
+            weights = np.zeros(1 << feature_bits, dtype=np.float32)
+            weights[data['indices']] = data['values']
+            return cls(weights, float(data['bias']), feature_bits, float(data['threshold']))
+    
+    def save(self, path: str):
+        """保存为压缩的模型文件（只保存非零权重）"""
+        indices = np.flatnonzero(self.weights).astype(np.uint32)
+        np.savez_compressed(
+            path,
+            version=MODEL_FORMAT_VERSION,
+            feature_bits=self.feature_bits,
+            bias=self.bias,
+            threshold=self.threshold,
+            indices=indices,
+            values=self.weights[indices]
+        )
+    
+    def predict_proba(self, texts: Sequence[str]) -> 'np.ndarray':
+        """批量计算每篇文章相关的概率"""
+        indices, rows = featurize(texts, self.feature_bits)
+        logits = np.bincount(rows, weights=self.weights[indices], minlength=len(texts)) + self.bias
+        return 0.5 * (1.0 + np.tanh(logits / 2))  # 即sigmoid，对很大的对数几率不会溢出
+    
+    def rank(self, texts: Sequence[str]) -> Tuple[List[float], List[int]]:
+        """返回所有文章的分数（相关概率）和入选文章按分数降序的下标，与关键词打分的返回格式相同"""
+        scores = np.round(self.predict_proba(texts), 4)
+        selected = np.flatnonzero(scores >= self.threshold)
+        selected = selected[np.argsort(-scores[selected], kind='stable')]
+        return scores.tolist(), selected.tolist()
@@ -1,9 +1,10 @@
+import asyncio
 import schedule
 import time
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import configparser
-from typing import Callable
+from typing import Callable, List, Dict
 import threading
 import signal
 import sys
@@ -11,6 +12,8 @@ import sys
 from news_scraper import AINewsScraper
 from email_sender import EmailSender
 from database import NewsDatabase
+from near_duplicate import NearDuplicateIndex
+from topic_clustering import TopicClusterer
 
 class TaskScheduler:
     """任务调度器"""
@@ -31,9 +34,11 @@ class TaskScheduler:
         self.logger = logging.getLogger(__name__)
         
         # 初始化组件
-        self.scraper = AINewsScraper(config_file)
-        self.email_sender = EmailSender(config_file)
         self.database = NewsDatabase(config_file)
+        self.scraper = AINewsScraper(config_file, self.database)
+        self.email_sender = EmailSender(config_file)
+        self.story_index = NearDuplicateIndex(config_file, self.database)
+        self.topic_clusterer = TopicClusterer(config_file)
         
         # 调度配置
         self.update_interval_hours = int(
@@ -43,6 +48,23 @@ class TaskScheduler:
             self.config.get('scraping', 'max_articles_per_send', fallback='10')
         )
         
+        # 自适应轮询：按各来源的历史发布间隔分别决定抓取频率
+        self.adaptive_polling = self.config.getboolean(
+            'scraping', 'adaptive_polling', fallback=False
+        )
+        self.min_poll_interval_hours = float(
+            self.config.get('scraping', 'min_poll_interval_hours', fallback='0.25')
+        )
+        self.max_poll_interval_hours = float(
+            self.config.get('scraping', 'max_poll_interval_hours', fallback='24')
+        )
+        # 时间窗口比轮询间隔多出的余量（小时），覆盖检查延迟和偶尔的抓取失败
+        self.poll_window_margin_hours = float(
+            self.config.get('scraping', 'poll_window_margin_hours', fallback='2')
+        )
+        self.source_poll_intervals = {}  # 来源 -> 轮询间隔（小时）
+        self.source_next_poll = {}       # 来源 -> 下次应抓取的时间
+        
         # 运行状态
         self.is_running = False
         self.scheduler_thread = None
@@ -57,74 +79,205 @@ class TaskScheduler:
         self.stop()
         sys.exit(0)
     
-    def scrape_and_process_news(self):
-        """抓取和处理新闻的核心任务"""
+    def scrape_and_process_news(self, source_names: List[str] | None = None, send_email: bool = True):
+        """抓取和处理新闻的核心任务，source_names 为 None 时抓取所有源"""
         try:
             self.logger.info("=" * 50)
             self.logger.info("开始执行新闻抓取任务")
             
             # 1. 抓取AI资讯
             self.logger.info("步骤1: 抓取AI资讯...")
-            all_articles = self.scraper.get_ai_news()
+            # 高水位暂存在 watermarks 中，文章入库成功后才保存，入库失败时下次重新抓取这些条目
+            watermarks = {}
+            all_articles = self.scraper.get_ai_news(source_names, watermarks)
+            self.mark_sources_polled(source_names)
             
-            if not all_articles:
-                self.logger.warning("没有抓取到任何文章")
-                return
+            self.process_articles(all_articles, send_email, watermarks)
             
-            # 2. 过滤AI相关内容
-            self.logger.info("步骤2: 过滤AI相关内容...")
-            filtered_articles = self.scraper.filter_ai_keywords(all_articles)
-            
-            if not filtered_articles:
-                self.logger.warning("过滤后没有AI相关文章")
-                return
+        except Exception as e:
+            self.logger.error(f"执行新闻抓取任务时出错: {str(e)}")
+            self.database.log_send_result(0, False, str(e))
+    
+    async def scrape_and_process_news_async(self, source_names: List[str] | None = None,
+                                            send_email: bool = True):
+        """抓取和处理新闻的核心任务（异步版本，供事件循环中的调用方使用）"""
+        try:
+            self.logger.info("=" * 50)
+            self.logger.info("开始执行新闻抓取任务")
             
-            # 2.5. 对过滤后的文章进行总结
-            self.logger.info("步骤2.5: 对AI文章进行智能总结...")
-            summarized_articles = self.scraper.summarize_articles_batch(filtered_articles)
+            # 1. 抓取AI资讯
+            self.logger.info("步骤1: 抓取AI资讯...")
+            watermarks = {}
+            all_articles = await self.scraper.get_ai_news_async(source_names, watermarks)
+            self.mark_sources_polled(source_names)
             
-            # 3. 去重并添加到数据库
-            self.logger.info("步骤3: 去重并保存到数据库...")
-            unique_articles = self.database.get_duplicate_check_results(summarized_articles)
-            new_articles_count = self.database.add_articles(unique_articles)
+            # 过滤、入库和发邮件都是阻塞操作，放到线程池中执行
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.process_articles, all_articles, send_email, watermarks)
             
-            # 4. 获取待发送的文章（包括之前未发送的）
-            self.logger.info("步骤4: 准备发送邮件...")
-            unsent_articles = self.database.get_unsent_articles(
-                limit=self.max_articles_per_send
+        except Exception as e:
+            self.logger.error(f"执行新闻抓取任务时出错: {str(e)}")
+            self.database.log_send_result(0, False, str(e))
+    
+    def refresh_poll_intervals(self):
+        """根据数据库中的发布时间历史更新各来源的轮询间隔"""
+        publish_intervals = self.database.get_source_publish_intervals()
+        
+        for source_name in self.scraper.rss_sources:
+            interval = publish_intervals.get(source_name, self.update_interval_hours)
+            self.source_poll_intervals[source_name] = min(
+                self.max_poll_interval_hours, max(self.min_poll_interval_hours, interval)
             )
+            # 抓取时的时间窗口至少覆盖一个轮询间隔，低频来源两次抓取之间发布的文章不会被丢弃
+            self.scraper.source_fetch_windows[source_name] = (
+                self.source_poll_intervals[source_name] + self.poll_window_margin_hours
+            )
+        
+        self.logger.info("各来源轮询间隔（小时）: " + ', '.join(
+            f"{name}={hours:.2f}" for name, hours in self.source_poll_intervals.items()
+        ))
+    
+    def mark_sources_polled(self, source_names: List[str] | None = None):
+        """记录来源已抓取，并按其轮询间隔计算下次抓取时间（source_names 为 None 时表示所有源，空列表不记录）"""
+        if source_names is None:
+            source_names = list(self.scraper.rss_sources)
+        
+        now = datetime.now()
+        for source_name in source_names:
+            interval = self.source_poll_intervals.get(source_name, self.update_interval_hours)
+            self.source_next_poll[source_name] = now + timedelta(hours=interval)
+    
+    def get_due_sources(self) -> List[str]:
+        """获取已到抓取时间的来源"""
+        now = datetime.now()
+        return [
+            source_name for source_name in self.scraper.rss_sources
+            if self.source_next_poll.get(source_name, now) <= now
+        ]
+    
+    def scheduled_scrape(self):
+        """定时抓取任务：自适应轮询时只抓取到期的来源，并发送邮件"""
+        if not self.adaptive_polling:
+            self.scrape_and_process_news()
+            return
+        
+        self.refresh_poll_intervals()
+        due_sources = self.get_due_sources()
+        if not due_sources:
+            # 没有到期的来源：不抓取，只发送之前轮询入库的未发送文章
+            self.logger.info("没有到期的来源，跳过抓取")
+            self.send_unsent_articles()
+            return
+        
+        self.scrape_and_process_news(due_sources)
+    
+    def poll_due_sources(self):
+        """高频检查：抓取到期的来源并入库，邮件仍按 update_interval_hours 发送"""
+        due_sources = self.get_due_sources()
+        if not due_sources:
+            return
+        
+        self.logger.info(f"到期来源: {', '.join(due_sources)}")
+        self.scrape_and_process_news(due_sources, send_email=False)
+    
+    def process_articles(self, all_articles: List[Dict], send_email: bool = True, watermarks: Dict | None = None):
+        """处理抓取到的文章：过滤、总结、去重入库，并按需发送邮件
+        
+        watermarks 为抓取时暂存的各源高水位，入库成功后才保存（入库失败时抛出异常，不保存）。
+        """
+        new_articles_count = self.ingest_articles(all_articles)
+        if watermarks:
+            self.scraper.save_watermarks(watermarks)
+        
+        if not send_email:
+            self.logger.info(f"本次新增 {new_articles_count} 篇文章，邮件将在下次定时任务中发送")
+            return
+        
+        # 即使本次没有新文章，之前轮询入库的未发送文章也要发送
+        self.send_unsent_articles(new_articles_count)
+    
+    def ingest_articles(self, all_articles: List[Dict]) -> int:
+        """去重、过滤、合并近似重复、总结并保存文章，返回新增文章数量（写入数据库失败时抛出异常）"""
+        if not all_articles:
+            self.logger.warning("没有抓取到任何文章")
+            return 0
+        
+        # 2. 去重：已处理过的文章（包括之前未通过筛选的）不再进入后续步骤
+        self.logger.info("步骤2: 去重...")
+        new_articles = self.database.filter_seen_articles(all_articles)
+        stage_counts = [('抓取', len(all_articles)), ('新文章', len(new_articles))]
+        new_articles_count = 0
+        
+        if new_articles:
+            # 2.5. 过滤AI相关内容（规则文件有修改时先重新加载）
+            self.logger.info("步骤2.5: 过滤AI相关内容...")
+            self.scraper.rules.reload_if_changed()
+            filtered_articles = self.scraper.filter_ai_keywords(new_articles)
+            stage_counts.append(('AI相关', len(filtered_articles)))
             
-            if not unsent_articles:
-                self.logger.info("没有待发送的文章")
-                if new_articles_count == 0:
-                    self.logger.info("也没有新文章，任务完成")
-                return
-            
-            # 5. 发送邮件
-            self.logger.info(f"步骤5: 发送邮件，包含 {len(unsent_articles)} 篇文章（其中 {new_articles_count} 篇新文章）...")
-            send_success = self.email_sender.send_news_email(unsent_articles)
-            
-            # 6. 更新发送状态
-            if send_success:
-                article_ids = [article['id'] for article in unsent_articles]
-                self.database.mark_articles_as_sent(article_ids)
-                self.database.log_send_result(len(unsent_articles), True)
-                self.logger.info("任务执行成功！")
-            else:
-                self.database.log_send_result(len(unsent_articles), False, "邮件发送失败")
-                self.logger.error("邮件发送失败")
-            
-            # 7. 清理旧数据
-            self.logger.info("步骤6: 清理旧数据...")
-            self.database.cleanup_old_articles(days=30)
+            # 2.6. 把不同来源对同一事件的报道合并为一个故事（重复报道不再总结和入库）
+            self.logger.info("步骤2.6: 合并近似重复报道...")
+            stories = self.story_index.collapse(filtered_articles)
+            stage_counts.append(('合并后', len(stories)))
             
-            self.logger.info("新闻抓取任务完成")
-            self.logger.info("=" * 50)
+            if stories:
+                # 3. 对文章进行总结并保存到数据库
+                self.logger.info("步骤3: 智能总结并保存到数据库...")
+                summarized_articles = self.scraper.summarize_articles_batch(stories)
+                content_hashes = [self.database.article_hash(article) for article in summarized_articles]
+                known_hashes = self.database.find_existing_hashes(content_hashes)
+                new_articles_count = self.database.add_articles(summarized_articles, raise_errors=True)
+                
+                # 只把真正写入的文章加入近似重复索引：内容哈希或链接已存在而被跳过的文章不在 articles 表中
+                inserted_hashes = self.database.find_existing_hashes(content_hashes) - known_hashes
+                self.story_index.add([
+                    article for article, content_hash in zip(summarized_articles, content_hashes)
+                    if content_hash in inserted_hashes
+                ])
+                stage_counts.append(('入库', new_articles_count))
             
-        except Exception as e:
-            self.logger.error(f"执行新闻抓取任务时出错: {str(e)}")
-            self.database.log_send_result(0, False, str(e))
+            self.database.mark_articles_seen(new_articles, raise_errors=True)
+        
+        self.logger.info("各阶段文章数: " + ' → '.join(f"{name} {count}" for name, count in stage_counts))
+        return new_articles_count
     
+    def send_unsent_articles(self, new_articles_count: int = 0):
+        """发送待发送的文章（包括之前未发送的），并清理旧数据"""
+        # 4. 获取待发送的文章（包括之前未发送的）
+        self.logger.info("步骤4: 准备发送邮件...")
+        unsent_articles = self.database.get_unsent_articles(
+            limit=self.max_articles_per_send
+        )
+        
+        if not unsent_articles:
+            self.logger.info("没有待发送的文章")
+            if new_articles_count == 0:
+                self.logger.info("也没有新文章，任务完成")
+            return
+        
+        # 5. 发送邮件
+        self.logger.info(f"步骤5: 发送邮件，包含 {len(unsent_articles)} 篇文章（其中 {new_articles_count} 篇新文章）...")
+        # 同一话题的文章在邮件中合并展示
+        topics = self.topic_clusterer.cluster(unsent_articles)
+        send_success = self.email_sender.send_news_email(topics)
+        
+        # 6. 更新发送状态
+        if send_success:
+            article_ids = [article['id'] for article in unsent_articles]
+            self.database.mark_articles_as_sent(article_ids)
+            self.database.log_send_result(len(unsent_articles), True)
+            self.logger.info("任务执行成功！")
+        else:
+            self.database.log_send_result(len(unsent_articles), False, "邮件发送失败")
+            self.logger.error("邮件发送失败")
+        
+        # 7. 清理旧数据
+        self.logger.info("步骤6: 清理旧数据...")
+        self.database.cleanup_old_articles(days=30)
+        
+        self.logger.info("新闻抓取任务完成")
+        self.logger.info("=" * 50)
+        
     def send_daily_summary(self):
         """发送每日统计摘要"""
         try:
@@ -157,9 +310,16 @@ class TaskScheduler:
         try:
             # 主要的新闻抓取任务
             schedule.every(self.update_interval_hours).hours.do(
-                self.scrape_and_process_news
+                self.scheduled_scrape
             )
             
+            # 自适应轮询：按最短轮询间隔检查到期的来源
+            if self.adaptive_polling:
+                self.refresh_poll_intervals()
+                schedule.every(max(1, int(self.min_poll_interval_hours * 60))).minutes.do(
+                    self.poll_due_sources
+                )
+            
             # 每日清理任务（凌晨3点执行）
             schedule.every().day.at("03:00").do(
                 self.database.cleanup_old_articles, days=30
@@ -172,6 +332,8 @@ class TaskScheduler:
             
             self.logger.info(f"调度任务设置完成:")
             self.logger.info(f"• 新闻抓取: 每 {self.update_interval_hours} 小时执行一次")
+            if self.adaptive_polling:
+                self.logger.info(f"• 自适应轮询: 每 {self.min_poll_interval_hours} 小时检查一次到期来源")
             self.logger.info(f"• 数据清理: 每天凌晨3点执行")
             self.logger.info(f"• 统计摘要: 每周一上午9点执行")
             
@@ -237,6 +399,10 @@ class TaskScheduler:
         # 清空调度任务
         schedule.clear()
         
+        # 释放抓取器的HTTP连接池和数据库连接
+        self.scraper.close()
+        self.database.close()
+        
         self.logger.info("AI资讯智能体已停止")
     
     def run_once(self):
@@ -244,6 +410,11 @@ class TaskScheduler:
         self.logger.info("手动执行抓取任务...")
         self.scrape_and_process_news()
     
+    async def run_once_async(self):
+        """手动执行一次抓取任务（异步版本，不阻塞调用方的事件循环）"""
+        self.logger.info("手动执行抓取任务...")
+        await self.scrape_and_process_news_async()
+    
     def get_next_run_time(self) -> str:
         """获取下次运行时间"""
         jobs = schedule.jobs
@@ -258,6 +429,7 @@ class TaskScheduler:
         return {
             'is_running': self.is_running,
             'update_interval': self.update_interval_hours,
+            'adaptive_polling': self.adaptive_polling,
             'max_articles_per_send': self.max_articles_per_send,
             'next_run_time': self.get_next_run_time(),
             'scheduled_jobs': len(schedule.jobs)
@@ -0,0 +1,63 @@
+from typing import Dict, Tuple
+
+# 核心亮点编码 -> 文案（编码存入数据库 articles.insight_code，已有编码的含义不要修改）
+KEY_INSIGHTS = {
+    'llm_release': "新大语言模型正式发布，性能和能力有显著提升",
+    'tool_release': "新AI工具/平台发布，为用户提供更好的AI体验",
+    'release': "重要AI产品或技术正式发布",
+    'performance': "技术性能实现重大突破，超越现有水平",
+    'breakthrough': "AI技术取得重要突破性进展",
+    'funding': "AI公司获得重要资本注入，促进技术发展",
+    'update': "产品版本重大更新，功能和性能进一步优化",
+    'partnership': "AI领域重要合作达成，推动行业发展",
+    'market': "AI市场竞争格局发生变化，影响行业走向",
+    'policy': "AI相关政策或监管出台，影响行业发展方向",
+    'general': "AI领域值得关注的重要动态",
+}
+
+# 价值等级 -> 文案（等级存入数据库 articles.value_tier，数值越大价值越高）
+VALUE_TIERS = {
+    3: "🔥 高价值资讯，对行业影响重大",
+    2: "🟡 重要资讯，值得持续关注",
+    1: "🔵 一般资讯，了解即可",
+    0: "⚪ 参考信息，价值有限",
+}
+
+INSIGHT_PREFIX = '🎯 核心亮点：'
+VALUE_PREFIX = '📊 价值判断：'
+
+
+def summary_parts(article: Dict) -> Tuple[str, str]:
+    """返回文章的 (核心亮点, 价值判断) 文案，没有总结时为空字符串
+    
+    优先使用编码字段；旧数据只有 ai_summary 文本时从中解析。
+    """
+    key_insight = KEY_INSIGHTS.get(article.get('insight_code'), '')
+    value_assessment = VALUE_TIERS.get(article.get('value_tier'), '')
+    if key_insight or value_assessment or not article.get('ai_summary'):
+        return key_insight, value_assessment
+    
+    for line in article['ai_summary'].split('\n'):
+        line = line.strip()
+        if line.startswith(INSIGHT_PREFIX):
+            key_insight = line[len(INSIGHT_PREFIX):].strip()
+        elif line.startswith(VALUE_PREFIX):
+            value_assessment = line[len(VALUE_PREFIX):].strip()
+    return key_insight, value_assessment
+
+
+def render_summary(article: Dict) -> str:
+    """渲染完整的精简总结文本（显示时调用，不再存入数据库）"""
+    key_insight, value_assessment = summary_parts(article)
+    if not key_insight and not value_assessment:
+        return article.get('ai_summary') or ''
+    
+    return f"""
+📰 {article.get('title', '')}
+
+{INSIGHT_PREFIX}{key_insight}
+
+{VALUE_PREFIX}{value_assessment}
+
+📱 来源：{article.get('source', '')}
+"""
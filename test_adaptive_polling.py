@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应轮询测试脚本
+验证根据发布历史学习各来源的轮询间隔，并只抓取到期的来源
+"""
+
+import os
+import sys
+import unittest
+import tempfile
+from unittest import mock
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scheduler import TaskScheduler
+from test_concurrent_fetch import make_response
+
+
+class TestAdaptivePolling(unittest.TestCase):
+    """自适应轮询测试类"""
+
+    def setUp(self):
+        """创建临时配置和数据库"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[email]
+smtp_server = smtp.example.com
+smtp_port = 465
+sender_email = test@example.com
+sender_password = test_password
+receiver_email = test@example.com
+
+[scraping]
+update_interval_hours = 1
+adaptive_polling = true
+min_poll_interval_hours = 0.25
+max_poll_interval_hours = 24
+per_host_interval_seconds = 0
+
+[sources]
+busy = https://busy.example.com/rss
+daily = https://daily.example.com/rss
+new_source = https://new.example.com/rss
+
+[database]
+db_path = {os.path.join(self.temp_dir, 'test_adaptive_polling.db')}
+""")
+
+    def tearDown(self):
+        """删除临时文件"""
+        for name in os.listdir(self.temp_dir):
+            try:
+                os.unlink(os.path.join(self.temp_dir, name))
+            except PermissionError:
+                pass
+        os.rmdir(self.temp_dir)
+
+    def add_history(self, scheduler, source, gap_hours, count, stored=range(0)):
+        """按固定间隔写入发布历史：所有条目记为已处理，下标在 stored 中的条目同时入库"""
+        now = datetime.now()
+        articles = [
+            {
+                'title': f'{source} {i}',
+                'link': f'https://{source}.example.com/{i}',
+                'summary': '',
+                'source': source,
+                'published': now - timedelta(hours=gap_hours * i)
+            }
+            for i in range(count)
+        ]
+        scheduler.database.mark_articles_seen(articles)
+        scheduler.database.add_articles([articles[i] for i in stored])
+
+    def test_intervals_learned_from_history(self):
+        """高频来源间隔短，低频来源间隔长，无历史的来源使用默认间隔"""
+        scheduler = TaskScheduler(self.config_file)
+        self.add_history(scheduler, 'busy', 0.1, 10)
+        self.add_history(scheduler, 'daily', 24, 5)
+
+        scheduler.refresh_poll_intervals()
+        intervals = scheduler.source_poll_intervals
+        self.assertEqual(intervals['busy'], 0.25)        # 限制在下限
+        self.assertAlmostEqual(intervals['daily'], 24)
+        self.assertEqual(intervals['new_source'], 1)
+
+    def test_interval_counts_filtered_entries(self):
+        """未通过筛选的条目也计入发布历史：混合类来源只有少数文章入库时，间隔仍按全部条目估算"""
+        scheduler = TaskScheduler(self.config_file)
+        self.add_history(scheduler, 'busy', 0.5, 48, stored=range(0, 48, 12))
+
+        scheduler.refresh_poll_intervals()
+        self.assertAlmostEqual(scheduler.source_poll_intervals['busy'], 0.5)
+
+    def test_only_due_sources_polled(self):
+        """抓取后按各自间隔计算下次时间，只有到期的来源会被再次抓取"""
+        scheduler = TaskScheduler(self.config_file)
+        self.add_history(scheduler, 'daily', 24, 5)
+        scheduler.refresh_poll_intervals()
+
+        self.assertEqual(len(scheduler.get_due_sources()), 3)
+        scheduler.mark_sources_polled()
+        self.assertEqual(scheduler.get_due_sources(), [])
+
+        # 两小时后，只有非每日来源到期
+        for source in scheduler.source_next_poll:
+            scheduler.source_next_poll[source] -= timedelta(hours=2)
+        self.assertEqual(sorted(scheduler.get_due_sources()), ['busy', 'new_source'])
+
+    def test_nothing_due_does_not_reset_schedule(self):
+        """没有到期的来源时不抓取，也不推迟各来源的下次抓取时间"""
+        scheduler = TaskScheduler(self.config_file)
+        scheduler.refresh_poll_intervals()
+        scheduler.mark_sources_polled()
+        next_poll = dict(scheduler.source_next_poll)
+
+        scheduler.mark_sources_polled([])
+        self.assertEqual(scheduler.source_next_poll, next_poll)
+
+        with mock.patch.object(scheduler.scraper, 'get_ai_news') as get_ai_news, \
+                mock.patch.object(scheduler, 'send_unsent_articles') as send_unsent:
+            scheduler.scheduled_scrape()
+            get_ai_news.assert_not_called()
+            send_unsent.assert_called_once()
+        self.assertEqual(scheduler.source_next_poll, next_poll)
+
+    def test_slow_source_keeps_entries_between_polls(self):
+        """每天抓取一次的来源，时间窗口覆盖轮询间隔，20小时前发布的文章不会被丢弃"""
+        scheduler = TaskScheduler(self.config_file)
+        self.add_history(scheduler, 'daily', 24, 5)
+        scheduler.refresh_poll_intervals()
+        self.assertGreaterEqual(scheduler.scraper._fetch_window_hours('daily'), 24)
+        self.assertEqual(scheduler.scraper._fetch_window_hours('busy'), scheduler.scraper.fetch_window_hours)
+
+        published = format_datetime(datetime.utcnow() - timedelta(hours=20))
+        body = (f"<rss version='2.0'><channel><item><guid>drop-1</guid><title>Daily drop</title>"
+                f"<link>https://daily.example.com/drop-1</link><pubDate>{published}</pubDate>"
+                f"<description>summary</description></item></channel></rss>").encode('utf-8')
+        scheduler.scraper.session.get = mock.Mock(return_value=make_response(body))
+
+        articles = scheduler.scraper.get_ai_news(['daily', 'busy'])
+        self.assertEqual([a['source'] for a in articles], ['daily'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -49,12 +49,13 @@ db_path = test_ai_news.db
         # 删除临时文件
         if os.path.exists(self.config_file):
             os.unlink(self.config_file)
-        # 尝试删除测试数据库文件，忽略权限错误
-        try:
-            if os.path.exists('test_ai_news.db'):
-                os.unlink('test_ai_news.db')
-        except PermissionError:
-            pass  # 文件可能还在使用中，忽略错误
+        # 尝试删除测试数据库文件（包括WAL日志），忽略权限错误
+        for path in ('test_ai_news.db', 'test_ai_news.db-wal', 'test_ai_news.db-shm'):
+            try:
+                if os.path.exists(path):
+                    os.unlink(path)
+            except PermissionError:
+                pass  # 文件可能还在使用中，忽略错误
     
     def test_database_module(self):
         """测试数据库模块"""
@@ -129,7 +130,19 @@ db_path = test_ai_news.db
             filtered = scraper.filter_ai_keywords(test_articles)
             self.assertEqual(len(filtered), 1, "应该过滤出1篇AI相关文章")
             self.assertIn('AI', filtered[0]['title'], "过滤的文章应该包含AI关键词")
-            
+
+            # 测试HTML转纯文本：去标签、解码实体、合并空白、按长度截断
+            from news_scraper import html_to_text
+            self.assertEqual(
+                html_to_text('<p>AI&nbsp;<b>模型</b></p><script>x()</script><p>发布  了</p>'),
+                'AI 模型 发布 了'
+            )
+            self.assertEqual(html_to_text('a < b'), 'a < b')
+            # 引号中的属性值可以包含 ">"
+            self.assertEqual(html_to_text('<a href="x>y">t</a> <img alt=\'a>b\'>图'), 't 图')
+            self.assertEqual(html_to_text('<p title="1 > 0">AI</p><p>模型</p>'), 'AI 模型')
+            self.assertEqual(len(html_to_text('<p>' + '字' * 1000 + '</p>', 300)), 300)
+
             print("✅ 新闻抓取模块测试通过")
             
         except Exception as e:
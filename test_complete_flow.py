@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from news_scraper import AINewsScraper
 from database import NewsDatabase
 from email_sender import EmailSender
+from summary_format import render_summary
 import sqlite3
 
 def test_complete_flow():
@@ -54,8 +55,8 @@ def test_complete_flow():
             print(f"\n文章 {i}:")
             print(f"   标题: {article['title'][:50]}...")
             print(f"   关键词: {', '.join(article.get('detected_keywords', [])[:3])}")
-            if article.get('ai_summary'):
-                summary_lines = article['ai_summary'].split('\n')
+            if render_summary(article):
+                summary_lines = render_summary(article).strip().split('\n')
                 print(f"   总结: {summary_lines[0] if summary_lines else '无'}...")
     
     print("\n步骤5: 保存到数据库...")
@@ -73,10 +74,10 @@ def test_complete_flow():
             print(f"\n文章 {i}:")
             print(f"   标题: {article['title']}")
             print(f"   关键词: {', '.join(article.get('detected_keywords', []))}")
-            print(f"   总结状态: {'已生成' if article.get('ai_summary') else '未生成'}")
+            print(f"   总结状态: {'已生成' if render_summary(article) else '未生成'}")
             
-            if article.get('ai_summary'):
-                print(f"   总结预览: {article['ai_summary'][:100]}...")
+            if render_summary(article):
+                print(f"   总结预览: {render_summary(article)[:100]}...")
     
     print("\n步骤7: 测试邮件发送...")
     if unsent_articles:
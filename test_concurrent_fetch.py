@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发抓取测试脚本
+验证不同主机并行抓取、同一主机按间隔限速
+"""
+
+import os
+import sys
+import asyncio
+import time
+import unittest
+import tempfile
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from news_scraper import AINewsScraper, HostRateLimiter
+
+
+def make_response(body: bytes, status_code: int = 200, headers: dict = None) -> requests.Response:
+    """构造一个不经过网络的HTTP响应"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
+class TestConcurrentFetch(unittest.TestCase):
+    """并发抓取测试类"""
+
+    def setUp(self):
+        """创建包含同主机和不同主机源的临时配置"""
+        self.temp_config = tempfile.NamedTemporaryFile(mode='w', suffix='.ini', delete=False)
+        self.temp_config.write("""
+[scraping]
+fetch_workers = 4
+per_host_interval_seconds = 0.3
+
+[sources]
+arxiv_ai = https://rss.arxiv.org/rss/cs.AI
+arxiv_ml = https://rss.arxiv.org/rss/cs.LG
+kr36 = https://36kr.com/feed
+ithome = https://www.ithome.com/rss/
+
+[database]
+db_path = test_concurrent_fetch.db
+""")
+        self.temp_config.close()
+        self.config_file = self.temp_config.name
+
+    def tearDown(self):
+        """删除临时文件"""
+        for path in (self.config_file, 'test_concurrent_fetch.db', 'test_concurrent_fetch.db-wal',
+                     'test_concurrent_fetch.db-shm'):
+            try:
+                if os.path.exists(path):
+                    os.unlink(path)
+            except PermissionError:
+                pass
+
+    def test_rate_limiter_spaces_same_host(self):
+        """同一主机的预约时间片按间隔递增，不同主机无需等待"""
+        limiter = HostRateLimiter(1.0)
+        self.assertLessEqual(limiter.reserve('https://rss.arxiv.org/rss/cs.AI'), 0)
+        self.assertGreater(limiter.reserve('https://rss.arxiv.org/rss/cs.LG'), 0.9)
+        self.assertLessEqual(limiter.reserve('https://36kr.com/feed'), 0)
+
+    def test_get_ai_news_runs_hosts_in_parallel(self):
+        """总耗时接近最慢源，而不是所有源之和"""
+        scraper = AINewsScraper(self.config_file)
+        request_times = {}
+
+        def fake_get(url, **kwargs):
+            request_times[url] = time.monotonic()
+            time.sleep(0.5)
+            return make_response(f"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>{url}</title><link>{url}</link><description>d</description></item>
+</channel></rss>""".encode('utf-8'))
+
+        scraper.session.get = fake_get
+
+        start = time.monotonic()
+        articles = scraper.get_ai_news()
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(len(articles), 4)
+        # 串行需要 2 秒以上，并发时约为 0.5 + 0.3（同主机间隔）
+        self.assertLess(elapsed, 1.5)
+        # 同主机的两个源仍按间隔错开
+        arxiv_gap = abs(request_times['https://rss.arxiv.org/rss/cs.LG'] -
+                        request_times['https://rss.arxiv.org/rss/cs.AI'])
+        self.assertGreaterEqual(arxiv_gap, 0.25)
+
+    def test_host_interval_does_not_hold_fetch_slot(self):
+        """等待同一主机的间隔时不占用请求名额，其他主机的源不被阻塞"""
+        scraper = AINewsScraper(self.config_file)
+        scraper.fetch_workers = 1
+        request_times = {}
+
+        def fake_get(url, **kwargs):
+            request_times[url] = time.monotonic()
+            time.sleep(0.05)
+            return make_response(b"<rss version='2.0'><channel></channel></rss>")
+
+        scraper.session.get = fake_get
+
+        start = time.monotonic()
+        scraper.get_ai_news()
+
+        # 名额被等待间隔的arXiv源占用时，其他主机要等到 0.3 秒之后
+        self.assertLess(request_times['https://36kr.com/feed'] - start, 0.25)
+        self.assertLess(request_times['https://www.ithome.com/rss/'] - start, 0.25)
+        arxiv_gap = abs(request_times['https://rss.arxiv.org/rss/cs.LG'] -
+                        request_times['https://rss.arxiv.org/rss/cs.AI'])
+        self.assertGreaterEqual(arxiv_gap, 0.25)
+
+    def test_get_ai_news_async_does_not_block_loop(self):
+        """异步接口在运行中的事件循环里执行，期间事件循环仍可调度其他任务"""
+        scraper = AINewsScraper(self.config_file)
+
+        def slow_get(url, **kwargs):
+            time.sleep(0.3)
+            return make_response(b"<rss version='2.0'><channel></channel></rss>")
+
+        scraper.session.get = slow_get
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.05)
+
+            ticker_task = asyncio.ensure_future(ticker())
+            articles = await scraper.get_ai_news_async()
+            ticker_task.cancel()
+            return articles, ticks
+
+        articles, ticks = asyncio.run(main())
+        self.assertEqual(articles, [])
+        self.assertGreater(ticks, 3)
+
+    def test_sync_wrappers_reject_running_loop(self):
+        """同步接口在运行中的事件循环里调用时抛出明确的错误，提示改用异步接口"""
+        scraper = AINewsScraper(self.config_file)
+
+        async def main():
+            with self.assertRaisesRegex(RuntimeError, 'get_ai_news_async'):
+                scraper.get_ai_news()
+            with self.assertRaisesRegex(RuntimeError, 'fetch_rss_feed_async'):
+                scraper.fetch_rss_feed('https://example.com/feed', 'test')
+
+        asyncio.run(main())
+
+    def test_deadline_returns_partial_results(self):
+        """超过整体时限时放弃慢源，返回已完成源的结果"""
+        scraper = AINewsScraper(self.config_file)
+        scraper.fetch_deadline_seconds = 0.5
+
+        def get(url, **kwargs):
+            if 'ithome' in url:
+                time.sleep(2)
+            return make_response(f"""<rss version="2.0"><channel>
+<item><title>{url}</title><link>{url}</link></item></channel></rss>""".encode('utf-8'))
+
+        scraper.session.get = get
+
+        start = time.monotonic()
+        articles = scraper.get_ai_news()
+        elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(len(articles), 3)
+        self.assertNotIn('ithome', ' '.join(a['link'] for a in articles))
+
+    def test_parse_pool_matches_inline_parsing(self):
+        """大内容交给进程池解析，结果与线程内解析一致；小内容不创建进程池；无法创建进程池时在线程中解析"""
+        items = ''.join(
+            f"<item><title>AI {i}</title><link>https://36kr.com/p/{i}</link>"
+            f"<guid>id-{i}</guid><description>&lt;p&gt;摘要 {i}&lt;/p&gt;</description></item>"
+            for i in range(200)
+        )
+        body = f"<rss version='2.0'><channel>{items}</channel></rss>".encode('utf-8')
+
+        scraper = AINewsScraper(self.config_file)
+        scraper.session.get = lambda url, **kwargs: make_response(body)
+        inline = scraper.fetch_rss_feed('https://36kr.com/feed', 'kr36')
+        self.assertIsNone(scraper._parse_pool)
+
+        pooled_scraper = AINewsScraper(self.config_file)
+        pooled_scraper.parse_workers = 2
+        pooled_scraper.parse_pool_min_bytes = 1024
+        pooled_scraper.session.get = lambda url, **kwargs: make_response(body)
+        try:
+            # 换一个源名，避免命中上面写入的高水位和缓存
+            pooled = pooled_scraper.fetch_rss_feed('https://36kr.com/feed', 'kr36_mirror')
+            self.assertIsNotNone(pooled_scraper._parse_pool)
+        finally:
+            pooled_scraper.close()
+
+        # 平台不支持多进程时，创建进程池失败不算作抓取失败
+        fallback_scraper = AINewsScraper(self.config_file)
+        fallback_scraper.parse_workers = 2
+        fallback_scraper.parse_pool_min_bytes = 1024
+        fallback_scraper.session.get = lambda url, **kwargs: make_response(body)
+        with mock.patch('concurrent.futures.process._check_system_limits',
+                        side_effect=NotImplementedError('sem_open is not available')):
+            fallback = fallback_scraper.fetch_rss_feed('https://36kr.com/feed', 'kr36_fallback')
+        self.assertEqual(fallback_scraper.parse_workers, 0)
+        self.assertEqual(fallback_scraper.database.get_feed_states()['kr36_fallback']['consecutive_failures'], 0)
+
+        def summary(articles):
+            return [(a['title'], a['link'], a['summary'], a['entry_id'], a['content_hash']) for a in articles]
+
+        self.assertEqual(len(pooled), 200)
+        self.assertEqual(summary(pooled), summary(inline))
+        self.assertEqual(summary(fallback), summary(inline))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库连接管理测试脚本
+验证每个线程复用一条长连接、启用WAL等PRAGMA，读取不被未提交的写事务阻塞
+"""
+
+import os
+import sys
+import unittest
+import tempfile
+import threading
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import NewsDatabase
+
+
+class TestDatabaseConnections(unittest.TestCase):
+    """数据库连接管理测试类"""
+
+    def setUp(self):
+        """创建临时配置和数据库"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[database]
+db_path = {os.path.join(self.temp_dir.name, 'test.db')}
+cache_size_kb = 4096
+busy_timeout = 0.2
+""")
+        self.database = NewsDatabase(self.config_file)
+        self.database.add_articles([
+            {'title': '测试文章', 'link': 'https://example.com/1', 'summary': '', 'source': 'test',
+             'published': datetime.now()}
+        ])
+
+    def tearDown(self):
+        """关闭连接并删除临时文件"""
+        self.database.close()
+        self.temp_dir.cleanup()
+
+    def test_pragmas(self):
+        """连接启用WAL、NORMAL同步级别和配置的页缓存大小"""
+        conn = self.database._get_connection()
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 1)
+        self.assertEqual(conn.execute('PRAGMA cache_size').fetchone()[0], -4096)
+
+    def test_connection_per_thread(self):
+        """同一线程复用连接，不同线程使用各自的连接，close() 后重新建立"""
+        conn = self.database._get_connection()
+        self.assertIs(self.database._get_connection(), conn)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.database._get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+        self.database.close()
+        self.assertIsNot(self.database._get_connection(), conn)
+        self.assertEqual(self.database.get_statistics()['total_articles'], 1)
+
+    def test_reader_not_blocked_by_writer(self):
+        """写事务未提交时，其他线程仍能读取统计和文章列表"""
+        writer = self.database._get_connection()
+        writer.execute('BEGIN IMMEDIATE')
+        writer.execute("UPDATE articles SET is_sent = 1")
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            (self.database.get_statistics(), self.database.get_recent_articles())
+        ))
+        thread.start()
+        thread.join()
+        writer.rollback()
+
+        stats, articles = results[0]
+        self.assertEqual(stats['total_articles'], 1)
+        self.assertEqual(stats['unsent_articles'], 1)
+        self.assertEqual(len(articles), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database import NewsDatabase
 from email_sender import EmailSender
+from summary_format import render_summary
 
 def test_email_with_summary():
     """测试包含总结功能的邮件发送"""
@@ -32,7 +33,7 @@ def test_email_with_summary():
         print(f"\n📄 文章 {i}:")
         print(f"   标题: {article['title'][:60]}...")
         print(f"   关键词: {', '.join(article.get('detected_keywords', [])[:3])}")
-        print(f"   总结: {'✅ 已生成' if article.get('ai_summary') else '❌ 未生成'}")
+        print(f"   总结: {'✅ 已生成' if render_summary(article) else '❌ 未生成'}")
     
     print(f"\n📧 正在发送包含 {len(articles)} 篇文章的邮件...")
     
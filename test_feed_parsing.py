@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RSS解析测试脚本
+验证lxml增量解析与feedparser结果一致、不支持时回退，以及内容大小上限
+"""
+
+import os
+import sys
+import unittest
+import tempfile
+from unittest import mock
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from news_scraper import AINewsScraper, iter_fast_entries, iter_feedparser_entries, parse_feed_records
+from test_concurrent_fetch import make_response
+
+
+def rss_feed(count: int) -> bytes:
+    """生成带发布时间的RSS 2.0内容，最新的条目在前"""
+    now = datetime.now(timezone.utc)
+    items = ''.join(
+        f"""<item><title> AI &amp; 模型 {i} </title><link>https://example.com/{i}</link>
+<guid isPermaLink="false">id-{i}</guid>
+<pubDate>{format_datetime(now - timedelta(minutes=i))}</pubDate>
+<description>&lt;p&gt;摘要&amp;nbsp;{i}&lt;/p&gt;</description></item>"""
+        for i in range(count)
+    )
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>t</title>{items}</channel></rss>""".encode('utf-8')
+
+
+ATOM_BODY = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title type="html">&lt;b&gt;Agent&lt;/b&gt; 框架</title>
+<link rel="enclosure" href="https://example.com/a.mp3"/>
+<link rel="alternate" href="https://example.com/a"/>
+<id>tag:example.com,2024:a</id><updated>2024-10-01T10:00:00+08:00</updated>
+<content type="html">&lt;p&gt;正文&lt;/p&gt;</content></entry>
+<entry><title>无链接类型</title><link href="https://example.com/b"/><id>tag:b</id>
+<published>2024-10-01T09:00:00Z</published><summary>摘要</summary></entry>
+</feed>""".encode('utf-8')
+
+
+class TestFeedParsing(unittest.TestCase):
+    """RSS解析测试类"""
+
+    def test_fast_path_matches_feedparser(self):
+        """RSS 2.0 和 Atom 的增量解析结果与feedparser一致"""
+        for body in (rss_feed(5), ATOM_BODY):
+            self.assertEqual(list(iter_fast_entries(body)), list(iter_feedparser_entries(body)))
+
+    def test_unsupported_feeds_fall_back_to_feedparser(self):
+        """格式不规范或非RSS 2.0/Atom的内容交给feedparser"""
+        malformed = rss_feed(2).replace(b'&amp;nbsp;', b'&nbsp;')
+        rdf = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">
+<item><title>RDF</title><link>https://example.com/rdf</link></item></rdf:RDF>"""
+
+        with mock.patch('news_scraper.iter_feedparser_entries', wraps=iter_feedparser_entries) as fallback:
+            records, _ = parse_feed_records(rss_feed(2))
+            self.assertEqual(len(records), 2)
+            fallback.assert_not_called()
+
+            records, _ = parse_feed_records(malformed)
+            self.assertEqual(len(records), 2)
+            records, _ = parse_feed_records(rdf)
+            self.assertEqual([r[0] for r in records], ['RDF'])
+            self.assertEqual(fallback.call_count, 2)
+
+    def test_oversized_feed_is_truncated(self):
+        """超过大小上限时只下载和解析前面完整的条目"""
+        temp_dir = tempfile.mkdtemp()
+        config_file = os.path.join(temp_dir, 'config.ini')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[scraping]
+per_host_interval_seconds = 0
+max_feed_bytes = 1048576
+
+[feed_max_bytes]
+big = 2048
+
+[sources]
+big = https://example.com/rss
+
+[database]
+db_path = {os.path.join(temp_dir, 'test_feed_parsing.db')}
+""")
+        try:
+            scraper = AINewsScraper(config_file)
+            scraper.session.get = mock.Mock(return_value=make_response(rss_feed(100)))
+            self.assertEqual(scraper._max_feed_bytes('big'), 2048)
+            self.assertEqual(scraper._max_feed_bytes('other'), 1048576)
+
+            articles = scraper.fetch_rss_feed('https://example.com/rss', 'big')
+            self.assertGreater(len(articles), 0)
+            self.assertLess(len(articles), 10)
+            # 截断处之前的条目完整，从最新的开始
+            self.assertEqual(articles[0]['entry_id'], 'id-0')
+            self.assertEqual(articles[0]['summary'], '摘要 0...')
+        finally:
+            for name in os.listdir(temp_dir):
+                os.unlink(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
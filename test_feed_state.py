@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RSS源状态测试脚本
+验证条件请求（ETag/Last-Modified）的校验值保存与304短路，已处理条目的高水位，原始内容缓存，以及熔断和自适应超时
+"""
+
+import os
+import sys
+import time
+import unittest
+import tempfile
+from unittest import mock
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+import requests
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from news_scraper import AINewsScraper, html_to_text, parse_feed_records
+from test_concurrent_fetch import make_response
+
+FEED_URL = 'https://example.com/rss'
+
+FEED_BODY = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>OpenAI releases GPT-5</title><link>https://example.com/1</link>
+<description>&lt;p&gt;New model&lt;/p&gt;</description></item>
+</channel></rss>""".encode('utf-8')
+
+
+class TestFeedState(unittest.TestCase):
+    """RSS源状态测试类"""
+
+    def setUp(self):
+        """创建临时配置和数据库"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test_feed_state.db')
+        self.config_file = os.path.join(self.temp_dir, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[scraping]
+per_host_interval_seconds = 0
+
+[sources]
+example = {FEED_URL}
+
+[database]
+db_path = {self.db_path}
+""")
+
+    def tearDown(self):
+        """删除临时文件"""
+        for name in os.listdir(self.temp_dir):
+            try:
+                os.unlink(os.path.join(self.temp_dir, name))
+            except PermissionError:
+                pass
+        os.rmdir(self.temp_dir)
+
+    def test_conditional_get_short_circuits_on_304(self):
+        """第二次抓取发送校验值，收到304时不解析"""
+        scraper = AINewsScraper(self.config_file)
+        scraper.session.get = mock.Mock(return_value=make_response(
+            FEED_BODY, headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+        ))
+
+        articles = scraper.fetch_rss_feed(FEED_URL, 'example')
+        self.assertEqual(len(articles), 1)
+        self.assertEqual(scraper.session.get.call_args.kwargs['headers'], {})
+
+        state = scraper.database.get_feed_states()['example']
+        self.assertEqual(state['etag'], '"v1"')
+
+        scraper.session.get = mock.Mock(return_value=make_response(b'', status_code=304))
+        with mock.patch('news_scraper.parse_feed_records') as parse:
+            articles = scraper.fetch_rss_feed(FEED_URL, 'example')
+            parse.assert_not_called()
+
+        self.assertEqual(articles, [])
+        headers = scraper.session.get.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Mon, 01 Jan 2024 00:00:00 GMT')
+
+    def test_validators_ignored_when_url_changes(self):
+        """配置的URL变化后不再发送旧的校验值"""
+        scraper = AINewsScraper(self.config_file)
+        scraper.database.update_feed_state('example', 'https://old.example.com/rss', etag='"old"')
+        scraper.session.get = mock.Mock(return_value=make_response(FEED_BODY))
+
+        scraper.get_ai_news()
+        self.assertEqual(scraper.session.get.call_args.kwargs['headers'], {})
+
+    def test_high_water_mark_skips_known_entries(self):
+        """已处理过的条目在提取摘要之前被跳过，只处理新条目"""
+        now = datetime.utcnow().replace(microsecond=0)
+
+        def item(n, minutes_ago):
+            pub = format_datetime(now - timedelta(minutes=minutes_ago))
+            return (f"<item><guid>id-{n}</guid><title>Article {n}</title>"
+                    f"<link>https://example.com/{n}</link><pubDate>{pub}</pubDate>"
+                    f"<description>summary {n}</description></item>")
+
+        def feed(*items):
+            return f"<rss version='2.0'><channel>{''.join(items)}</channel></rss>".encode('utf-8')
+
+        scraper = AINewsScraper(self.config_file)
+        scraper.session.get = mock.Mock(return_value=make_response(feed(item(2, 30), item(1, 60))))
+        articles = scraper.fetch_rss_feed(FEED_URL, 'example')
+        self.assertEqual([a['title'] for a in articles], ['Article 2', 'Article 1'])
+
+        state = scraper.database.get_feed_states()['example']
+        self.assertEqual(state['last_entry_id'], 'id-2')
+
+        scraper.session.get = mock.Mock(return_value=make_response(feed(item(3, 5), item(2, 30), item(1, 60))))
+        with mock.patch('news_scraper.html_to_text', wraps=html_to_text) as strip_html:
+            articles = scraper.fetch_rss_feed(FEED_URL, 'example')
+            self.assertEqual(strip_html.call_count, 1)
+
+        self.assertEqual([a['title'] for a in articles], ['Article 3'])
+        self.assertEqual(scraper.database.get_feed_states()['example']['last_entry_id'], 'id-3')
+
+    def test_identical_body_skips_parsing(self):
+        """不支持条件请求的源返回相同内容时，复用缓存而不重新解析"""
+        scraper = AINewsScraper(self.config_file)
+        scraper.session.get = mock.Mock(return_value=make_response(FEED_BODY))
+        self.assertEqual(len(scraper.fetch_rss_feed(FEED_URL, 'example')), 1)
+
+        with mock.patch('news_scraper.parse_feed_records') as parse:
+            scraper.fetch_rss_feed(FEED_URL, 'example')
+            parse.assert_not_called()
+
+        # 内容变化后重新解析
+        scraper.session.get = mock.Mock(return_value=make_response(FEED_BODY + b' '))
+        with mock.patch('news_scraper.parse_feed_records', wraps=parse_feed_records) as parse:
+            scraper.fetch_rss_feed(FEED_URL, 'example')
+            parse.assert_called_once()
+
+    def test_cached_undated_entries_filtered_by_position(self):
+        """无发布时间的源命中缓存时，取到上次最新的条目为止，而不是全部丢弃"""
+        published = datetime.now() - timedelta(days=2)
+        cached = [
+            {'title': f'Article {n}', 'link': f'https://example.com/{n}', 'summary': '', 'source': 'example',
+             'published': published, 'entry_id': f'id-{n}'}
+            for n in (3, 2, 1)
+        ]
+
+        articles = AINewsScraper._filter_cached_articles(cached, {'last_entry_id': 'id-2', 'last_published': None})
+        self.assertEqual([a['title'] for a in articles], ['Article 3'])
+        self.assertGreater(articles[0]['published'], published)
+        self.assertEqual(AINewsScraper._filter_cached_articles(
+            cached, {'last_entry_id': 'id-3', 'last_published': None}), [])
+
+    def test_feed_cache_eviction(self):
+        """缓存超出容量上限时从最旧的开始淘汰"""
+        scraper = AINewsScraper(self.config_file)
+        database = scraper.database
+        article = {'title': 'x' * 100, 'link': 'https://example.com', 'published': datetime.now()}
+        database.save_feed_cache('old', 'h1', [article])
+        time.sleep(1.1)  # CURRENT_TIMESTAMP 精度为秒
+        database.save_feed_cache('new', 'h2', [article])
+
+        deleted = database.evict_feed_cache(max_bytes=200, ttl_hours=24)
+        self.assertEqual(deleted, 1)
+        self.assertIsNone(database.get_feed_cache('old', 24))
+        cached = database.get_feed_cache('new', 24)
+        self.assertEqual(cached['body_hash'], 'h2')
+        self.assertIsInstance(cached['articles'][0]['published'], datetime)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        """连续失败达到阈值后打开熔断，熔断期间不再请求该源"""
+        scraper = AINewsScraper(self.config_file)
+        scraper.session.get = mock.Mock(side_effect=requests.ConnectionError('unreachable'))
+
+        for _ in range(scraper.circuit_failure_threshold):
+            scraper.fetch_rss_feed(FEED_URL, 'example')
+
+        state = scraper.database.get_feed_states()['example']
+        self.assertEqual(state['consecutive_failures'], scraper.circuit_failure_threshold)
+        self.assertGreater(state['circuit_open_until'], datetime.now())
+
+        scraper.session.get.reset_mock()
+        self.assertEqual(scraper.fetch_rss_feed(FEED_URL, 'example'), [])
+        scraper.session.get.assert_not_called()
+
+        # 退避时间过后再次成功，熔断关闭并记录响应时间
+        scraper.database.update_feed_state('example', FEED_URL, circuit_open_until=datetime.now())
+        scraper.session.get = mock.Mock(return_value=make_response(FEED_BODY))
+        scraper.fetch_rss_feed(FEED_URL, 'example')
+        state = scraper.database.get_feed_states()['example']
+        self.assertEqual(state['consecutive_failures'], 0)
+        self.assertIsNone(state['circuit_open_until'])
+        self.assertEqual(len(state['recent_latencies']), 1)
+
+    def test_feed_autodiscovery_cached(self):
+        """配置的地址是网页时，从 <link rel="alternate"> 发现订阅地址并缓存，之后直接抓取订阅"""
+        page = b"""<!DOCTYPE html><html><head><title>AI Blog</title>
+<link rel="stylesheet" href="/style.css">
+<link rel="alternate" type="application/atom+xml" title="Posts" href="/feeds/posts/default">
+</head><body>...</body></html>"""
+        feed_url = 'https://example.com/feeds/posts/default'
+        scraper = AINewsScraper(self.config_file)
+        scraper.session.get = mock.Mock(
+            side_effect=lambda url, **kwargs: make_response(FEED_BODY if url == feed_url else page)
+        )
+
+        self.assertEqual(len(scraper.fetch_rss_feed(FEED_URL, 'example')), 1)
+        self.assertEqual([c.args[0] for c in scraper.session.get.call_args_list], [FEED_URL, feed_url])
+        self.assertEqual(scraper.database.get_feed_states()['example']['feed_url'], feed_url)
+
+        # 缓存有效期内不再请求网页
+        scraper.session.get.reset_mock()
+        scraper.fetch_rss_feed(FEED_URL, 'example')
+        self.assertEqual([c.args[0] for c in scraper.session.get.call_args_list], [feed_url])
+
+        # 缓存过期后重新从网页确认
+        scraper.feed_discovery_ttl_hours = 0
+        scraper.session.get.reset_mock()
+        scraper.fetch_rss_feed(FEED_URL, 'example')
+        self.assertEqual([c.args[0] for c in scraper.session.get.call_args_list], [FEED_URL, feed_url])
+
+    def test_page_without_feed_skipped_until_revalidation(self):
+        """网页中没有订阅地址时记录结果，有效期内不再请求"""
+        scraper = AINewsScraper(self.config_file)
+        scraper.session.get = mock.Mock(return_value=make_response(b'<html><head></head></html>'))
+
+        self.assertEqual(scraper.fetch_rss_feed(FEED_URL, 'example'), [])
+        self.assertEqual(scraper.database.get_feed_states()['example']['feed_url'], '')
+        self.assertEqual(scraper.fetch_rss_feed(FEED_URL, 'example'), [])
+        scraper.session.get.assert_called_once()
+
+    def test_adaptive_timeout(self):
+        """超时按最近响应时间推算，并限制在上下限之间"""
+        scraper = AINewsScraper(self.config_file)
+        self.assertEqual(scraper._adaptive_timeout({}), scraper.max_timeout_seconds)
+        self.assertEqual(scraper._adaptive_timeout({'recent_latencies': [0.1] * 10}),
+                         scraper.min_timeout_seconds)
+        self.assertAlmostEqual(scraper._adaptive_timeout({'recent_latencies': [2.0] * 10}),
+                               2.0 * scraper.timeout_latency_multiplier)
+
+
+if __name__ == "__main__":
+    unittest.main()
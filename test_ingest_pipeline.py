@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+入库流程测试脚本
+验证抓取后立即去重，已处理过的文章（包括未通过筛选的）不再过滤和总结
+"""
+
+import os
+import sys
+import sqlite3
+import unittest
+import tempfile
+from unittest import mock
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import compute_content_hash
+from scheduler import TaskScheduler
+from test_concurrent_fetch import make_response
+
+
+def make_articles(count, offset=0):
+    """构造测试文章：偶数篇为AI相关，奇数篇无关"""
+    articles = []
+    for i in range(offset, offset + count):
+        if i % 2 == 0:
+            title = f'OpenAI发布第{i}代大模型GPT-{i}'
+            summary = f'新一代LLM第{i}版正式发布，编号{i}的多模态智能体'
+        else:
+            title = f'周末第{i}场音乐会'
+            summary = f'第{i}场城市活动安排'
+        articles.append({
+            'title': title, 'summary': summary, 'source': 'test',
+            'link': f'https://example.com/{i}', 'published': datetime.now()
+        })
+    return articles
+
+
+class TestIngestPipeline(unittest.TestCase):
+    """入库流程测试类"""
+
+    def setUp(self):
+        """创建临时配置和数据库"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[email]
+smtp_server = smtp.example.com
+smtp_port = 465
+sender_email = test@example.com
+sender_password = test_password
+receiver_email = test@example.com
+
+[scraping]
+near_duplicate_detection = false
+per_host_interval_seconds = 0
+
+[sources]
+test = https://example.com/rss
+
+[database]
+db_path = {os.path.join(self.temp_dir.name, 'test_ingest.db')}
+""")
+        self.scheduler = TaskScheduler(self.config_file)
+
+    def tearDown(self):
+        """删除临时文件"""
+        self.temp_dir.cleanup()
+
+    def test_seen_articles_skip_expensive_stages(self):
+        """重复抓取到的文章在过滤之前就被丢弃，只有新文章进入过滤和总结"""
+        scraper = self.scheduler.scraper
+        self.assertEqual(self.scheduler.ingest_articles(make_articles(6)), 3)
+
+        with mock.patch.object(scraper, 'filter_ai_keywords', wraps=scraper.filter_ai_keywords) as filter_mock, \
+                mock.patch.object(scraper, 'summarize_articles_batch',
+                                  wraps=scraper.summarize_articles_batch) as summarize_mock:
+            # 全部已处理过（包括未通过筛选的3篇）：不再过滤
+            self.assertEqual(self.scheduler.ingest_articles(make_articles(6)), 0)
+            filter_mock.assert_not_called()
+            summarize_mock.assert_not_called()
+
+            # 混合新旧文章：只有新文章进入过滤，只有其中AI相关的进入总结
+            self.assertEqual(self.scheduler.ingest_articles(make_articles(10)), 2)
+            self.assertEqual(len(filter_mock.call_args[0][0]), 4)
+            self.assertEqual(len(summarize_mock.call_args[0][0]), 2)
+
+    def test_seen_set_survives_restart(self):
+        """已处理记录持久化，重启后仍然生效"""
+        self.scheduler.ingest_articles(make_articles(4))
+
+        scheduler = TaskScheduler(self.config_file)
+        new_articles = scheduler.database.filter_seen_articles(make_articles(6))
+        self.assertEqual([a['link'] for a in new_articles], ['https://example.com/4', 'https://example.com/5'])
+
+    def test_bulk_add_articles(self):
+        """批量入库跳过已存在和批次内重复的文章，新增数量与实际插入行数一致，复用已计算的哈希"""
+        database = self.scheduler.database
+        articles = make_articles(6)
+        new_articles = database.filter_seen_articles(articles)
+        self.assertEqual(database.add_articles(new_articles[:2]), 2)
+
+        with mock.patch('database.compute_content_hash', wraps=compute_content_hash) as hash_mock:
+            self.assertEqual(database.add_articles(new_articles + new_articles[:3]), 4)
+            hash_mock.assert_not_called()
+
+        self.assertEqual(database.get_statistics()['total_articles'], 6)
+        self.assertEqual(database.add_articles([{'title': '缺少字段'}] + make_articles(1, offset=6)), 1)
+
+    def test_probe_existing_hashes(self):
+        """只探测本批次的哈希（跨多个 IN 分块），批次内重复只保留第一篇"""
+        database = self.scheduler.database
+        database.add_articles(make_articles(1200))
+        batch = make_articles(1500, offset=600)
+        hashes = [database.article_hash(article) for article in batch]
+
+        self.assertEqual(database.find_existing_hashes(hashes), set(hashes[:600]))
+        database.mark_articles_seen(make_articles(10, offset=1200))
+        self.assertEqual(database.find_existing_hashes(hashes, ('seen_articles', 'articles')), set(hashes[:610]))
+
+        unique_articles = database.get_duplicate_check_results(batch + batch[-3:])
+        self.assertEqual([a['link'] for a in unique_articles], [a['link'] for a in batch[600:]])
+
+    def test_story_index_skips_ignored_rows(self):
+        """链接已存在、被 INSERT OR IGNORE 跳过的文章不写入近似重复索引"""
+        self.scheduler.story_index.enabled = True
+        database = self.scheduler.database
+        database.add_articles([dict(make_articles(1)[0], title='旧标题', summary='旧摘要')])
+
+        articles = make_articles(1) + [{
+            'title': '谷歌发布Gemini 2.0大模型', 'summary': '谷歌宣布新一代LLM Gemini 2.0上线，面向开发者开放多模态智能体API',
+            'source': 'test', 'link': 'https://example.com/gemini', 'published': datetime.now()
+        }]
+        self.assertEqual(self.scheduler.ingest_articles(articles), 1)
+
+        with database._get_connection() as conn:
+            indexed = {row[0] for row in conn.execute('SELECT content_hash FROM story_signatures')}
+            stored = {row[0] for row in conn.execute('SELECT content_hash FROM articles')}
+        self.assertEqual(indexed, {compute_content_hash(articles[1]['title'], articles[1]['link'])})
+        self.assertLessEqual(indexed, stored)
+
+    def test_watermark_saved_only_after_ingest(self):
+        """入库失败时不保存高水位，下次抓取仍能拿到这些条目；入库成功后才推进高水位"""
+        def feed(count):
+            items = ''.join(
+                f"<item><guid>id-{i}</guid><title>{a['title']}</title><link>{a['link']}</link>"
+                f"<pubDate>{format_datetime(datetime.utcnow() - timedelta(minutes=60 - i))}</pubDate>"
+                f"<description>{a['summary']}</description></item>"
+                for i, a in enumerate(make_articles(count))
+            )
+            return make_response(f"<rss version='2.0'><channel>{items}</channel></rss>".encode('utf-8'))
+
+        scraper = self.scheduler.scraper
+        scraper.session.get = mock.Mock(return_value=feed(4))
+        database = self.scheduler.database
+
+        with mock.patch.object(database, 'add_articles', side_effect=sqlite3.OperationalError('database is locked')):
+            self.scheduler.scrape_and_process_news(send_email=False)
+        self.assertIsNone(database.get_feed_states()['test']['last_published'])
+        self.assertEqual(database.get_statistics()['total_articles'], 0)
+
+        # 内容没有变化，条目仍然重新进入流程
+        self.scheduler.scrape_and_process_news(send_email=False)
+        self.assertEqual(database.get_statistics()['total_articles'], 2)
+
+        scraper.session.get = mock.Mock(return_value=feed(6))
+        self.scheduler.scrape_and_process_news(send_email=False)
+        self.assertEqual(database.get_statistics()['total_articles'], 3)
+        self.assertEqual(database.get_feed_states()['test']['last_entry_id'], 'id-5')
+
+    def test_validators_saved_only_after_ingest(self):
+        """入库失败时不保存ETag，下次抓取不发送条件请求，支持304的源也不会丢掉未入库的条目"""
+        items = ''.join(
+            f"<item><guid>id-{i}</guid><title>{a['title']}</title><link>{a['link']}</link>"
+            f"<pubDate>{format_datetime(datetime.utcnow() - timedelta(minutes=60 - i))}</pubDate>"
+            f"<description>{a['summary']}</description></item>"
+            for i, a in enumerate(make_articles(4))
+        )
+        body = f"<rss version='2.0'><channel>{items}</channel></rss>".encode('utf-8')
+
+        def get(url, headers=None, **kwargs):
+            if (headers or {}).get('If-None-Match') == '"v1"':
+                return make_response(b'', status_code=304)
+            return make_response(body, headers={'ETag': '"v1"'})
+
+        scraper = self.scheduler.scraper
+        scraper.session.get = mock.Mock(side_effect=get)
+        database = self.scheduler.database
+
+        with mock.patch.object(database, 'add_articles', side_effect=sqlite3.OperationalError('database is locked')):
+            self.scheduler.scrape_and_process_news(send_email=False)
+        self.assertIsNone(database.get_feed_states()['test']['etag'])
+        self.assertIsNone(database.get_feed_cache('test', 24))
+
+        self.scheduler.scrape_and_process_news(send_email=False)
+        self.assertEqual(scraper.session.get.call_args.kwargs['headers'], {})
+        self.assertEqual(database.get_statistics()['total_articles'], 2)
+        self.assertEqual(database.get_feed_states()['test']['etag'], '"v1"')
+
+        # 入库成功后才发送条件请求
+        self.scheduler.scrape_and_process_news(send_email=False)
+        self.assertEqual(scraper.session.get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(database.get_statistics()['total_articles'], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词匹配测试脚本
+验证 Aho-Corasick 匹配器与逐个子串查找结果一致，筛选和总结共用特征记录且打分规则不变
+"""
+
+import os
+import sys
+import random
+import unittest
+import tempfile
+from unittest import mock
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from keyword_matcher import KeywordMatcher
+from keyword_rules import KeywordRules
+from news_scraper import AINewsScraper, np
+from summary_format import KEY_INSIGHTS
+
+RULES = KeywordRules.compile(open(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keyword_rules.ini'), encoding='utf-8'
+).read())['extractor'].matcher.groups
+
+SAMPLES = [
+    ('OpenAI released GPT-5 with multimodal agent', 'A breakthrough LLM update from OpenAI'),
+    ('阿里巴巴发布通义千问新版本', '大模型能力全面升级，开源多模态模型'),
+    ('How to use ChatGPT: a tutorial', 'Tips and tricks for prompt marketing'),
+    ('Weekly tech news', 'Nothing about machine learning here, just a version bump'),
+    ('NVIDIA unveils new model for computer vision', 'Deep learning milestone, sponsored'),
+    ('月之暗面Kimi上线智能体', '生成式AI应用更新'),
+]
+
+
+def reference_score(title: str, summary: str):
+    """原有的逐个关键词子串查找打分方式"""
+    content_lower = f"{title} {summary}".lower()
+    score = 0
+    detected = []
+    for keyword in RULES['high']:
+        if keyword.lower() in content_lower:
+            score += 3
+            detected.append(keyword)
+    for keyword in RULES['core']:
+        if keyword.lower() in content_lower:
+            score += 1
+            detected.append(keyword)
+    for keyword in RULES['exclude']:
+        if keyword.lower() in content_lower:
+            score -= 2
+    if any(keyword.lower() in title.lower() for keyword in RULES['high']):
+        score += 2
+    has_core = any(keyword.lower() in content_lower for keyword in RULES['core'])
+    return score, has_core, list(dict.fromkeys(detected))[:5]
+
+
+def reference_value_score(title: str, summary: str) -> int:
+    """原有的价值判断打分方式"""
+    content_lower = f"{title} {summary}".lower()
+    return (3 * sum(word in content_lower for word in RULES['value_high']) +
+            2 * sum(word in content_lower for word in RULES['value_medium']) -
+            sum(word in content_lower for word in RULES['value_low']))
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    """关键词匹配测试类"""
+
+    def setUp(self):
+        """创建临时配置文件"""
+        self.temp_config = tempfile.NamedTemporaryFile(mode='w', suffix='.ini', delete=False)
+        self.temp_config.write("""
+[sources]
+test_source = https://example.com/rss
+
+[database]
+db_path = test_keyword_matcher.db
+""")
+        self.temp_config.close()
+
+    def tearDown(self):
+        """删除临时文件"""
+        for path in (self.temp_config.name, 'test_keyword_matcher.db', 'test_keyword_matcher.db-wal',
+                     'test_keyword_matcher.db-shm'):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_overlapping_patterns(self):
+        """重叠、嵌套的关键词全部命中，结束位置正确"""
+        matcher = KeywordMatcher({'a': ['he', 'she', 'his', 'hers'], 'b': ['大模型', '模型', 'She']})
+        hits = sorted(matcher.search('ushers 大模型'))
+        self.assertEqual(hits, [
+            (3, 'a', 0), (3, 'a', 1), (3, 'b', 2), (5, 'a', 3),
+            (9, 'b', 0), (9, 'b', 1)
+        ])
+        self.assertEqual(matcher.keyword('b', 2), 'She')
+
+    def test_matches_substring_search(self):
+        """随机文本上与 `keyword in text` 的结果一致"""
+        keywords = ['ab', 'abc', 'bca', 'c', 'caab', 'aaa', '人工', '人工智能', '智能']
+        matcher = KeywordMatcher({'k': keywords})
+        alphabet = 'abc人工智能 '
+        rng = random.Random(42)
+        for _ in range(200):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            found = {index for _, _, index in matcher.search(text)}
+            expected = {i for i, keyword in enumerate(keywords) if keyword in text}
+            self.assertEqual(found, expected, text)
+
+    def make_articles(self):
+        """构造测试文章"""
+        return [
+            {'title': t, 'summary': s, 'published': datetime.now(), 'source': 'test'}
+            for t, s in SAMPLES
+        ]
+
+    def test_filter_scores_unchanged(self):
+        """筛选结果、分数和关键词顺序与原有逐个查找方式一致"""
+        scraper = AINewsScraper(self.temp_config.name)
+        filtered = {a['title']: a for a in scraper.filter_ai_keywords(self.make_articles())}
+
+        for title, summary in SAMPLES:
+            score, has_core, keywords = reference_score(title, summary)
+            if score >= 4 and has_core:
+                self.assertEqual(filtered[title]['relevance_score'], score, title)
+                self.assertEqual(filtered[title]['detected_keywords'], keywords, title)
+            else:
+                self.assertNotIn(title, filtered)
+
+    def test_summary_reuses_filter_features(self):
+        """总结阶段复用筛选时的特征记录，每篇文章只扫描一次"""
+        scraper = AINewsScraper(self.temp_config.name)
+        with mock.patch.object(scraper.feature_extractor, 'extract',
+                               wraps=scraper.feature_extractor.extract) as extract:
+            filtered = scraper.filter_ai_keywords(self.make_articles())
+            scraper.summarize_articles_batch(filtered)
+            self.assertEqual(extract.call_count, len(SAMPLES))
+
+        for article in filtered:
+            score = reference_value_score(article['title'], article['summary'])
+            expected = (3 if score >= 6 else 2 if score >= 3 else 1 if score >= 0 else 0)
+            self.assertEqual(article['value_tier'], expected)
+            self.assertIn(article['insight_code'], KEY_INSIGHTS)
+
+    def test_parallel_summary_matches_inline(self):
+        """进程池分块总结与逐篇总结结果一致、顺序不变，并按块报告进度"""
+        scraper = AINewsScraper(self.temp_config.name)
+        articles = scraper.filter_ai_keywords(self.make_articles() * 20)
+        expected = [scraper.summarize_article_fields(article) for article in articles]
+
+        scraper.summary_workers = 2
+        scraper.summary_pool_min_articles = 1
+        scraper.summary_chunk_size = 7
+        reports = []
+        try:
+            scraper.summarize_articles_batch(articles, lambda done, total: reports.append((done, total)))
+            self.assertIsNotNone(scraper._summary_pool)
+        finally:
+            scraper.close()
+
+        self.assertEqual([{key: article[key] for key in ('insight_code', 'value_tier')} for article in articles],
+                         expected)
+        self.assertEqual(reports[-1], (len(articles), len(articles)))
+        self.assertEqual(len(reports), -(-len(articles) // 7))
+
+    def test_summary_falls_back_when_pool_unavailable(self):
+        """平台不支持多进程、无法创建进程池时逐篇总结，文章仍带有总结字段"""
+        scraper = AINewsScraper(self.temp_config.name)
+        articles = scraper.filter_ai_keywords(self.make_articles())
+        expected = [scraper.summarize_article_fields(article) for article in articles]
+
+        scraper.summary_workers = 2
+        scraper.summary_pool_min_articles = 1
+        with mock.patch('concurrent.futures.process._check_system_limits',
+                        side_effect=NotImplementedError('sem_open is not available')):
+            scraper.summarize_articles_batch(articles)
+
+        self.assertEqual(scraper.summary_workers, 0)
+        self.assertIsNone(scraper._summary_pool)
+        self.assertEqual([{key: article[key] for key in ('insight_code', 'value_tier')} for article in articles],
+                         expected)
+
+    def test_parallel_summary_uses_reloaded_rules(self):
+        """规则文件修改并重新加载后，进程池用新规则总结，与逐篇总结结果一致"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        rules_file = os.path.join(temp_dir.name, 'keyword_rules.ini')
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keyword_rules.ini'),
+                  encoding='utf-8') as f:
+            rules_text = f.read()
+        with open(rules_file, 'w', encoding='utf-8') as f:
+            f.write(rules_text)
+        config_file = os.path.join(temp_dir.name, 'config.ini')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[scraping]
+rules_file = {rules_file}
+summary_workers = 1
+summary_pool_min_articles = 1
+
+[sources]
+
+[database]
+db_path = {os.path.join(temp_dir.name, 'test.db')}
+""")
+
+        scraper = AINewsScraper(config_file)
+        self.addCleanup(scraper.close)
+
+        def summarize():
+            """重新总结历史文章（不带筛选阶段的特征），返回进程池和逐篇总结的结果"""
+            articles = self.make_articles()
+            scraper.summarize_articles_batch(articles)
+            return ([{key: article[key] for key in ('insight_code', 'value_tier')} for article in articles],
+                    [scraper.summarize_article_fields(article) for article in self.make_articles()])
+
+        pooled, inline = summarize()
+        self.assertEqual(pooled, inline)
+
+        # 高价值和低价值指示词互换，保证总结结果发生变化
+        with open(rules_file, 'w', encoding='utf-8') as f:
+            f.write(rules_text.replace('value_high =', 'value_tmp =').replace('value_low =', 'value_high =')
+                    .replace('value_tmp =', 'value_low ='))
+        os.utime(rules_file, ns=(0, os.stat(rules_file).st_mtime_ns + 1))
+        self.assertTrue(scraper.rules.reload_if_changed())
+
+        pooled_after, inline_after = summarize()
+        self.assertNotEqual(inline_after, inline)
+        self.assertEqual(pooled_after, inline_after)
+
+    @unittest.skipIf(np is None, "未安装NumPy")
+    def test_batch_scoring_matches_loop(self):
+        """NumPy批量打分与逐篇打分的分数、入选文章和顺序一致"""
+        scraper = AINewsScraper(self.temp_config.name)
+        rng = random.Random(7)
+        words = RULES['high'] + RULES['core'] + RULES['exclude'] + ['news', '今天', 'the']
+        features_list = [
+            scraper.feature_extractor.extract(
+                ' '.join(rng.sample(words, 3)), ' '.join(rng.sample(words, rng.randint(0, 8)))
+            )
+            for _ in range(2000)
+        ]
+
+        self.assertEqual(scraper._rank_articles_batch(features_list), scraper._rank_articles(features_list))
+
+        # 超过阈值时 filter_ai_keywords 走批量打分
+        scraper.batch_scoring_min_articles = 1
+        with mock.patch.object(scraper, '_rank_articles_batch', wraps=scraper._rank_articles_batch) as batch:
+            filtered = scraper.filter_ai_keywords(self.make_articles())
+            batch.assert_called_once()
+        self.assertEqual([a['title'] for a in filtered],
+                         [a['title'] for a in AINewsScraper(self.temp_config.name).filter_ai_keywords(self.make_articles())])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则表测试脚本
+验证规则文件编译结果按哈希缓存、启动时直接加载，以及修改后自动重新加载
+"""
+
+import os
+import sys
+import shutil
+import unittest
+import tempfile
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from keyword_rules import KeywordRules
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keyword_rules.ini')
+
+
+class TestKeywordRules(unittest.TestCase):
+    """规则表测试类"""
+
+    def setUp(self):
+        """复制规则文件到临时目录"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.rules_file = os.path.join(self.temp_dir, 'keyword_rules.ini')
+        shutil.copy(RULES_FILE, self.rules_file)
+
+    def tearDown(self):
+        """删除临时目录"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def edit_rules(self, old: str, new: str):
+        """修改规则文件并确保修改时间变化"""
+        with open(self.rules_file, encoding='utf-8') as f:
+            text = f.read()
+        with open(self.rules_file, 'w', encoding='utf-8') as f:
+            f.write(text.replace(old, new))
+        stat = os.stat(self.rules_file)
+        os.utime(self.rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    def test_artifact_cached_by_file_hash(self):
+        """第二次启动直接加载缓存的编译产物，规则文件内容变化后重新编译"""
+        rules = KeywordRules(self.rules_file)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'keyword_rules.cache')))
+        self.assertIn('openai', rules.groups['core'])
+
+        with mock.patch.object(KeywordRules, 'compile', wraps=KeywordRules.compile) as compile_rules:
+            cached = KeywordRules(self.rules_file)
+            compile_rules.assert_not_called()
+            self.assertEqual(cached.groups, rules.groups)
+            self.assertEqual(cached.keyword_sets, rules.keyword_sets)
+
+            self.edit_rules('面壁智能', '面壁智能, 新公司')
+            KeywordRules(self.rules_file)
+            compile_rules.assert_called_once()
+
+    def test_reload_on_mtime_change(self):
+        """规则文件修改后自动重新加载；文件有误时继续使用旧规则"""
+        rules = KeywordRules(self.rules_file)
+        self.assertFalse(rules.reload_if_changed())
+
+        self.edit_rules('面壁智能', '面壁智能, 新公司')
+        self.assertTrue(rules.reload_if_changed())
+        self.assertIn('新公司', rules.groups['core'])
+
+        self.edit_rules('[indicators]', '[broken')
+        self.assertFalse(rules.reload_if_changed())
+        self.assertIn('新公司', rules.groups['core'])
+        self.assertTrue(rules.has_keyword(['GPT'], 'impact_llm'))
+
+
+if __name__ == "__main__":
+    unittest.main()
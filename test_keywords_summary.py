@@ -11,6 +11,7 @@ sys.path.append('.')
 from news_scraper import AINewsScraper
 from email_sender import EmailSender
 from database import NewsDatabase
+from summary_format import render_summary
 from datetime import datetime
 
 def test_keywords_and_summary():
@@ -67,7 +68,7 @@ def test_keywords_and_summary():
     for i, article in enumerate(summarized_articles, 1):
         print(f"\n文章 {i} AI总结：")
         print("-" * 30)
-        print(article.get('ai_summary', '无总结'))
+        print(render_summary(article) or '无总结')
     
     # 3. 测试邮件模板
     print("\n📧 步骤3：测试邮件模板...")
@@ -96,13 +97,13 @@ def test_keywords_and_summary():
         print("\n数据库中第一篇文章的关键词和总结：")
         first_article = unsent_articles[0]
         print(f"关键词：{first_article.get('detected_keywords', '')}")
-        print(f"AI总结长度：{len(first_article.get('ai_summary', ''))}")
-        print(f"AI总结前100字符：{first_article.get('ai_summary', '')[:100]}...")
+        print(f"AI总结长度：{len(render_summary(first_article))}")
+        print(f"AI总结前100字符：{render_summary(first_article)[:100]}...")
     
     print("\n✅ 测试完成！")
     print("\n📋 测试结果总结：")
     print(f"- 关键词过滤：{'✅ 正常' if len(filtered_articles) > 0 else '❌ 异常'}")
-    print(f"- AI总结生成：{'✅ 正常' if all('ai_summary' in article for article in summarized_articles) else '❌ 异常'}")
+    print(f"- AI总结生成：{'✅ 正常' if all('value_tier' in article for article in summarized_articles) else '❌ 异常'}")
     print(f"- 数据库存储：{'✅ 正常' if added_count > 0 else '❌ 异常'}")
     print(f"- 邮件模板：{'✅ 正常' if len(html_content) > 1000 else '❌ 异常'}")
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+近似重复检测测试脚本
+验证不同来源的同一事件报道合并为一个故事，索引持久化并按时间窗口淘汰
+"""
+
+import os
+import sys
+import sqlite3
+import unittest
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import NewsDatabase
+from near_duplicate import NearDuplicateIndex, minhash_signature, signature_similarity
+
+STORY_A = ('OpenAI发布GPT-5大模型', 'OpenAI今天正式发布了新一代大模型GPT-5，支持多模态输入，推理能力大幅提升')
+STORY_A2 = ('OpenAI正式发布GPT-5', '今天OpenAI正式发布新一代大模型GPT-5，支持多模态输入，推理能力大幅提升。')
+STORY_B = ('谷歌推出Gemini新版本', '谷歌宣布Gemini 2.0上线，面向开发者开放API，并提供免费额度')
+
+
+def make_article(story, source, link):
+    """构造测试文章"""
+    title, summary = story
+    return {'title': title, 'summary': summary, 'source': source, 'link': link, 'published': datetime.now()}
+
+
+class TestNearDuplicate(unittest.TestCase):
+    """近似重复检测测试类"""
+
+    def setUp(self):
+        """创建临时配置文件和数据库"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test.db')
+        self.config_file = os.path.join(self.temp_dir.name, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[database]
+db_path = {self.db_path}
+
+[scraping]
+near_duplicate_threshold = 0.5
+near_duplicate_window_days = 7
+""")
+        self.database = NewsDatabase(self.config_file)
+        self.index = NearDuplicateIndex(self.config_file, self.database)
+
+    def tearDown(self):
+        """删除临时文件"""
+        self.temp_dir.cleanup()
+
+    def ingest(self, articles):
+        """按调度器的顺序合并、入库并写入索引"""
+        stories = self.index.collapse(articles)
+        self.database.add_articles(stories)
+        self.index.add(stories)
+        return stories
+
+    def test_signature_similarity(self):
+        """改写的同一报道相似度高，不同报道相似度低"""
+        a, a2, b = (minhash_signature(' '.join(story)) for story in (STORY_A, STORY_A2, STORY_B))
+        self.assertGreaterEqual(signature_similarity(a, a2), 0.5)
+        self.assertLess(signature_similarity(a, b), 0.2)
+        self.assertEqual(a, minhash_signature(' '.join(STORY_A)))
+        self.assertIsNone(minhash_signature('，。！'))
+
+    def test_collapse_within_batch(self):
+        """同一批次中不同来源的同一报道合并到第一篇"""
+        stories = self.ingest([
+            make_article(STORY_A, '36kr', 'https://36kr.com/p/1'),
+            make_article(STORY_B, 'ithome', 'https://ithome.com/2'),
+            make_article(STORY_A2, 'leiphone', 'https://leiphone.com/3'),
+        ])
+
+        self.assertEqual([s['source'] for s in stories], ['36kr', 'ithome'])
+        self.assertEqual(stories[0]['related_sources'],
+                         [{'source': 'leiphone', 'link': 'https://leiphone.com/3'}])
+
+        unsent = {a['source']: a for a in self.database.get_unsent_articles()}
+        self.assertEqual(unsent['36kr']['related_sources'][0]['source'], 'leiphone')
+        self.assertEqual(unsent['ithome']['related_sources'], [])
+
+    def test_collapse_against_stored_story(self):
+        """后续批次中的重复报道合并到已入库的故事上，不再入库"""
+        self.ingest([make_article(STORY_A, '36kr', 'https://36kr.com/p/1')])
+        stories = self.ingest([
+            make_article(STORY_A2, 'jiqizhixin', 'https://jiqizhixin.com/4'),
+            make_article(STORY_B, 'ithome', 'https://ithome.com/2'),
+        ])
+
+        self.assertEqual([s['source'] for s in stories], ['ithome'])
+        unsent = {a['source']: a for a in self.database.get_unsent_articles()}
+        self.assertEqual(set(unsent), {'36kr', 'ithome'})
+        self.assertEqual(unsent['36kr']['related_sources'],
+                         [{'source': 'jiqizhixin', 'link': 'https://jiqizhixin.com/4'}])
+
+    def test_window_eviction(self):
+        """超过时间窗口的索引被淘汰，之后的同一报道不再合并"""
+        self.ingest([make_article(STORY_A, '36kr', 'https://36kr.com/p/1')])
+
+        old_date = (datetime.now() - timedelta(days=8)).isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('UPDATE story_signatures SET indexed_date = ?', (old_date,))
+            conn.execute('UPDATE story_bands SET indexed_date = ?', (old_date,))
+
+        stories = self.ingest([make_article(STORY_A2, 'leiphone', 'https://leiphone.com/3')])
+        self.assertEqual(len(stories), 1)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM story_signatures').fetchone()[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关性模型测试脚本
+验证从已标注文章训练、保存加载一致，以及配置为 model 时筛选使用学习模型
+"""
+
+import os
+import sys
+import time
+import unittest
+import tempfile
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import NewsDatabase
+from news_scraper import AINewsScraper, np
+from relevance_model import RelevanceModel
+
+RELEVANT = [
+    ('OpenAI发布新一代大模型', '推理能力大幅提升，支持多模态输入'),
+    ('Anthropic releases a new Claude model', 'The LLM improves coding and reasoning'),
+    ('阿里巴巴开源通义千问大模型', '大模型在多个基准上领先'),
+    ('Google DeepMind unveils Gemini update', 'New multimodal model for developers'),
+    ('月之暗面发布Kimi智能体', '大模型助手支持长文本推理'),
+    ('Meta open-sources a new Llama model', 'The language model is free for research'),
+]
+IRRELEVANT = [
+    ('How to use ChatGPT for marketing', 'Ten tips for sponsored posts and promotion'),
+    ('大模型营销推广教程', '教你如何用AI写广告文案'),
+    ('Best AI gadgets gift guide', 'Promotion deals and affiliate links for shoppers'),
+    ('AI写作技巧攻略', '如何用工具写营销推广文案'),
+]
+
+
+class TestRelevanceModel(unittest.TestCase):
+    """相关性模型测试类"""
+
+    def setUp(self):
+        """创建临时配置和数据库"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_file = os.path.join(self.temp_dir.name, 'model.npz')
+        self.config_file = os.path.join(self.temp_dir.name, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[scraping]
+relevance_scorer = model
+relevance_model_file = {self.model_file}
+
+[sources]
+test = https://example.com/rss
+
+[database]
+db_path = {os.path.join(self.temp_dir.name, 'test.db')}
+""")
+
+    def tearDown(self):
+        """删除临时文件"""
+        self.temp_dir.cleanup()
+
+    def train_from_database(self):
+        """把样本写入数据库并标注，再从已标注文章训练模型"""
+        database = NewsDatabase(self.config_file)
+        samples = [(story, 1) for story in RELEVANT] + [(story, 0) for story in IRRELEVANT]
+        database.add_articles([
+            {'title': title, 'summary': summary, 'source': 'test',
+             'link': f'https://example.com/{i}', 'published': datetime.now()}
+            for i, ((title, summary), _) in enumerate(samples)
+        ])
+        for article in database.get_recent_articles(limit=100):
+            label = next(label for (title, _), label in samples if title == article['title'])
+            database.set_article_label(article['id'], label)
+
+        labeled = database.get_labeled_articles()
+        self.assertEqual(len(labeled), len(samples))
+        return RelevanceModel.train([f"{a['title']} {a['summary']}" for a in labeled],
+                                    [a['label'] for a in labeled], feature_bits=16)
+
+    @unittest.skipIf(np is None, "未安装NumPy")
+    def test_train_save_load(self):
+        """训练集上分类正确，保存后加载的模型结果一致"""
+        model = self.train_from_database()
+        texts = [f'{t} {s}' for t, s in RELEVANT + IRRELEVANT]
+        predicted = model.predict_proba(texts) >= 0.5
+        self.assertEqual(predicted.tolist(), [True] * len(RELEVANT) + [False] * len(IRRELEVANT))
+
+        model.save(self.model_file)
+        start = time.perf_counter()
+        loaded = RelevanceModel.load(self.model_file)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        np.testing.assert_allclose(loaded.predict_proba(texts), model.predict_proba(texts))
+
+        with self.assertRaises(ValueError):
+            RelevanceModel.train(texts[:2], [1, 1])
+
+    @unittest.skipIf(np is None, "未安装NumPy")
+    def test_scraper_uses_model(self):
+        """配置为 model 时按模型概率筛选和排序，模型文件不存在时退回关键词规则"""
+        self.assertIsNone(AINewsScraper(self.config_file).relevance_model)
+
+        self.train_from_database().save(self.model_file)
+        scraper = AINewsScraper(self.config_file)
+        self.assertIsNotNone(scraper.relevance_model)
+
+        articles = [
+            {'title': t, 'summary': s, 'source': 'test', 'published': datetime.now()}
+            for t, s in IRRELEVANT[:1] + RELEVANT[:2]
+        ]
+        filtered = scraper.filter_ai_keywords(articles)
+        self.assertEqual({a['title'] for a in filtered}, {RELEVANT[0][0], RELEVANT[1][0]})
+        scores = [a['relevance_score'] for a in filtered]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(0.5 <= score <= 1 for score in scores))
+
+
+if __name__ == "__main__":
+    unittest.main()
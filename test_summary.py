@@ -9,6 +9,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database import NewsDatabase
+from summary_format import render_summary
 
 def test_article_summary():
     """测试文章总结功能"""
@@ -38,8 +39,8 @@ def test_article_summary():
             print("   🏷️  关键词: 无")
         
         # 检查AI总结
-        if 'ai_summary' in article and article['ai_summary']:
-            summary_lines = article['ai_summary'].split('\n')
+        if render_summary(article):
+            summary_lines = render_summary(article).strip().split('\n')
             print(f"   🤖 AI总结: 已生成 ({len(summary_lines)} 行)")
             # 显示总结的前几行
             for line in summary_lines[:3]:
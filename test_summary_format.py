@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化总结测试脚本
+验证总结以编码字段入库、显示时渲染，旧数据的 ai_summary 文本仍能显示，并可按价值等级筛选
+"""
+
+import os
+import sys
+import sqlite3
+import unittest
+import tempfile
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import NewsDatabase
+from email_sender import EmailSender
+from summary_format import KEY_INSIGHTS, VALUE_TIERS, render_summary, summary_parts
+
+LEGACY_SUMMARY = """
+📰 旧文章
+
+🎯 核心亮点：AI技术取得重要突破性进展
+
+📊 价值判断：🟡 重要资讯，值得持续关注
+
+📱 来源：legacy
+"""
+
+
+class TestSummaryFormat(unittest.TestCase):
+    """结构化总结测试类"""
+
+    def setUp(self):
+        """创建临时配置和数据库"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test.db')
+        self.config_file = os.path.join(self.temp_dir.name, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write(f"""
+[email]
+smtp_server = smtp.example.com
+smtp_port = 465
+sender_email = test@example.com
+sender_password = test_password
+receiver_email = test@example.com
+
+[database]
+db_path = {self.db_path}
+""")
+        self.database = NewsDatabase(self.config_file)
+        self.database.add_articles([
+            {'title': f'文章{tier}', 'link': f'https://example.com/{tier}', 'summary': '', 'source': 'test',
+             'published': datetime.now(), 'insight_code': 'funding', 'value_tier': tier}
+            for tier in VALUE_TIERS
+        ] + [
+            {'title': '旧文章', 'link': 'https://example.com/legacy', 'summary': '', 'source': 'legacy',
+             'published': datetime.now(), 'ai_summary': LEGACY_SUMMARY}
+        ])
+
+    def tearDown(self):
+        """删除临时文件"""
+        self.temp_dir.cleanup()
+
+    def test_codes_stored_and_rendered(self):
+        """新文章只保存编码，显示时渲染；旧文章从 ai_summary 文本解析"""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT ai_summary, insight_code, value_tier FROM articles WHERE title = '文章3'").fetchone()
+        self.assertEqual(row, (None, 'funding', 3))
+
+        articles = {a['title']: a for a in self.database.get_unsent_articles()}
+        self.assertEqual(summary_parts(articles['文章3']), (KEY_INSIGHTS['funding'], VALUE_TIERS[3]))
+        self.assertEqual(summary_parts(articles['旧文章']),
+                         (KEY_INSIGHTS['breakthrough'], VALUE_TIERS[2]))
+        self.assertIn(f"🎯 核心亮点：{KEY_INSIGHTS['funding']}", render_summary(articles['文章3']))
+
+        html_content = EmailSender(self.config_file).create_email_content(list(articles.values()))
+        self.assertIn(KEY_INSIGHTS['funding'], html_content)
+        self.assertIn(KEY_INSIGHTS['breakthrough'], html_content)
+
+    def test_filter_by_value_tier(self):
+        """按价值等级筛选，查询使用 value_tier 索引"""
+        articles = self.database.get_recent_articles(min_value_tier=2)
+        self.assertEqual(sorted(a['value_tier'] for a in articles), [2, 3])
+
+        with sqlite3.connect(self.db_path) as conn:
+            plan = conn.execute('EXPLAIN QUERY PLAN SELECT id FROM articles WHERE value_tier >= 2').fetchall()
+        self.assertIn('idx_value_tier', str(plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
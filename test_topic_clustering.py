@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+话题聚类测试脚本
+验证同一话题的文章聚合到一起、选出代表文章，邮件按话题展示
+"""
+
+import os
+import sys
+import time
+import random
+import itertools
+import unittest
+import tempfile
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from email_sender import EmailSender
+from topic_clustering import TopicClusterer, cluster_rows, similarity_matrix, np
+
+ARTICLES = [
+    ('OpenAI发布GPT-5大模型', 'OpenAI正式发布GPT-5，推理和多模态能力大幅提升'),
+    ('谷歌Gemini 2.0上线', '谷歌宣布Gemini 2.0面向开发者开放'),
+    ('GPT-5来了：OpenAI新一代大模型发布', 'GPT-5推理能力提升，OpenAI称多模态能力更强'),
+    ('英伟达发布新一代GPU', '英伟达推出用于训练大模型的新GPU'),
+    ('OpenAI GPT-5发布会回顾', 'OpenAI在发布会上展示了GPT-5的推理能力'),
+    ('Gemini 2.0开发者指南', '谷歌Gemini 2.0开放API，开发者可以免费试用'),
+]
+
+
+def make_cjk_batch(count):
+    """构造中文文章批次：300个事件，每篇约150字，常用词按Zipf分布出现，每篇改写若干个词"""
+    rng = random.Random(0)
+    chars = [chr(code) for code in range(0x4e00, 0x4e00 + 1500)]
+    words = [''.join(rng.choice(chars) for _ in range(rng.randint(2, 4))) for _ in range(3000)]
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    events = [rng.choices(words, cum_weights=cumulative, k=50) for _ in range(300)]
+
+    texts, stories = [], []
+    for _ in range(count):
+        story = rng.randrange(len(events))
+        text = list(events[story])
+        for word in rng.choices(words, cum_weights=cumulative, k=10):
+            text[rng.randrange(len(text))] = word
+        texts.append(''.join(text))
+        stories.append(story)
+    return texts, stories
+
+
+def make_articles():
+    """构造测试文章"""
+    return [
+        {'id': i, 'title': title, 'summary': summary, 'source': f'source{i}',
+         'link': f'https://example.com/{i}', 'published': datetime.now()}
+        for i, (title, summary) in enumerate(ARTICLES)
+    ]
+
+
+@unittest.skipIf(np is None, "未安装NumPy")
+class TestTopicClustering(unittest.TestCase):
+    """话题聚类测试类"""
+
+    def setUp(self):
+        """创建临时配置文件"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, 'config.ini')
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            f.write("""
+[email]
+smtp_server = smtp.example.com
+smtp_port = 465
+sender_email = test@example.com
+sender_password = test_password
+receiver_email = test@example.com
+
+[scraping]
+topic_similarity_threshold = 0.3
+""")
+
+    def tearDown(self):
+        """删除临时文件"""
+        self.temp_dir.cleanup()
+
+    def test_cluster_topics(self):
+        """同一事件的报道归为一个话题，代表文章在前，话题保持首篇文章的顺序"""
+        topics = TopicClusterer(self.config_file).cluster(make_articles())
+
+        groups = [sorted([topic['id']] + [a['id'] for a in topic['topic_articles']]) for topic in topics]
+        self.assertEqual(groups, [[0, 2, 4], [1, 5], [3]])
+        self.assertIn(topics[0]['id'], (0, 2, 4))
+        self.assertEqual(topics[2]['topic_articles'], [])
+
+    def test_email_renders_topics(self):
+        """邮件按话题展示，文章总数包括话题下的文章"""
+        topics = TopicClusterer(self.config_file).cluster(make_articles())
+        html_content = EmailSender(self.config_file).create_email_content(topics)
+
+        self.assertIn('共 6 篇文章（3 个话题）', html_content)
+        self.assertIn('同一话题还有 2 篇', html_content)
+        self.assertEqual(html_content.count('class="article"'), 3)
+
+    def test_similarity_independent_of_max_features(self):
+        """稠密矩阵之外的共享词项逐对累加，相似度与稠密列数无关"""
+        texts, _ = make_cjk_batch(300)
+        expected = similarity_matrix(texts, max_features=100000)
+        for max_features in (0, 16, 2048):
+            np.testing.assert_allclose(similarity_matrix(texts, max_features), expected, atol=1e-5)
+        self.assertTrue(np.all(np.diag(expected) == 1))
+
+    def test_large_batch_speed(self):
+        """几千篇中文文章的批次在一秒内完成聚类，同一事件的报道归为一个话题"""
+        texts, stories = make_cjk_batch(3000)
+
+        elapsed = float('inf')
+        for _ in range(2):
+            start = time.perf_counter()
+            clusters = cluster_rows(similarity_matrix(texts), 0.3)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        self.assertLess(elapsed, 1)
+        self.assertEqual(sorted(i for cluster in clusters for i in cluster), list(range(3000)))
+        self.assertLessEqual(len(clusters), 400)
+        for cluster in clusters:
+            self.assertEqual(len({stories[i] for i in cluster}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import re
+import logging
+import configparser
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：没有NumPy时不聚类，邮件逐篇列出
+    np = None
+
+# 英文按单词切分，连续的中文按相邻两字切分
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]+')
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+
+def topic_terms(text: str) -> List[str]:
+    """把文本切成用于话题聚类的词项"""
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) > 1 and _CJK_RE.match(token):
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return terms
+
+
+def _tfidf_entries(texts: Sequence[str],
+                   max_df: float = 0.5) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """计算各 (文章, 词项) 按行L2归一化的TF-IDF权重
+    
+    分词后把所有 (文章, 词项) 放进一维数组，词频、文档频率、权重和范数都用NumPy整体计算。
+    出现在超过 max_df 比例文章中的词项视为停用词丢弃；只出现在一篇文章中的词项只计入范数。
+    返回共享词项的 (文章下标, 词项编号, 权重) 和各词项的文档频率（停用词记为0），
+    按文章、词项编号排序，词项按首次出现的顺序编号。
+    """
+    count = len(texts)
+    vocabulary = {}  # 词项 -> 编号（按首次出现的顺序）
+    term_ids = []
+    lengths = []
+    for text in texts:
+        ids = [vocabulary.setdefault(term, len(vocabulary)) for term in topic_terms(text)]
+        term_ids.extend(ids)
+        lengths.append(len(ids))
+    
+    term_count = len(vocabulary)
+    if term_count == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0), empty
+    
+    # 每个 (文章, 词项) 对出现一次，tf 为其在文章中的次数
+    keys = np.repeat(np.arange(count, dtype=np.int64), lengths) * term_count + np.asarray(term_ids, dtype=np.int64)
+    keys, tf = np.unique(keys, return_counts=True)
+    rows, terms = np.divmod(keys, term_count)
+    document_frequency = np.bincount(terms, minlength=term_count)
+    
+    max_documents = max(2, int(max_df * count))
+    kept = document_frequency[terms] <= max_documents
+    rows, terms, tf = rows[kept], terms[kept], tf[kept]
+    
+    # 对数词频 × 平滑IDF
+    weights = (1 + np.log(tf)) * (np.log((1 + count) / (1 + document_frequency[terms])) + 1)
+    norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=count))
+    norms[norms == 0] = 1
+    
+    shared = document_frequency[terms] >= 2
+    rows, terms = rows[shared], terms[shared]
+    document_frequency[document_frequency > max_documents] = 0
+    return rows, terms, weights[shared] / norms[rows], document_frequency
+
+
+def similarity_matrix(texts: Sequence[str], max_features: int = 2048, max_df: float = 0.5) -> 'np.ndarray':
+    """计算文章两两之间的TF-IDF余弦相似度（文章 × 文章，对角线为1）
+    
+    只有出现在至少两篇文章中的词项会影响相似度。其中文档频率最高的 max_features 个词项
+    组成稠密矩阵，用一次矩阵乘法计算；其余词项的文档频率都不高于这些词项，按词项枚举
+    共同出现的文章对累加权重乘积。结果与完整向量的余弦相似度一致，max_features 只影响计算量。
+    """
+    count = len(texts)
+    rows, terms, weights, document_frequency = _tfidf_entries(texts, max_df)
+    
+    # 稠密列：文档频率最高的共享词项，频率相同时按首次出现的顺序
+    shared = np.flatnonzero(document_frequency >= 2)
+    shared = shared[np.argsort(-document_frequency[shared], kind='stable')][:max_features]
+    columns = np.full(len(document_frequency), -1, dtype=np.int64)
+    columns[shared] = np.arange(len(shared))
+    
+    in_matrix = columns[terms] >= 0
+    matrix = np.zeros((count, len(shared)), dtype=np.float32)
+    matrix[rows[in_matrix], columns[terms[in_matrix]]] = weights[in_matrix]
+    similarity = matrix @ matrix.T
+    
+    # 其余词项：按词项分组，组内每个条目与排在它后面的条目配对（同一组内文章下标递增）
+    order = np.argsort(terms[~in_matrix], kind='stable')
+    rows, terms, weights = rows[~in_matrix][order], terms[~in_matrix][order], weights[~in_matrix][order]
+    partners = np.searchsorted(terms, terms, side='right') - np.arange(len(terms)) - 1
+    left = np.repeat(np.arange(len(terms)), partners)
+    if len(left):
+        right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(partners) - partners, partners)
+        # 同一对文章可能共享多个词项：按文章对排序后合并，再对称地加到相似度上
+        keys = rows[left] * count + rows[right]
+        order = np.argsort(keys)
+        keys, products = keys[order], (weights[left] * weights[right])[order]
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        first, second = np.divmod(keys[starts], count)
+        sums = np.add.reduceat(products, starts)
+        similarity[first, second] += sums
+        similarity[second, first] += sums
+    
+    np.fill_diagonal(similarity, 1)
+    return similarity
+
+
+def cluster_rows(similarity: 'np.ndarray', threshold: float) -> List[List[int]]:
+    """按顺序做领头聚类：每篇尚未归类的文章开启一个话题，吸收与它余弦相似度达到阈值的未归类文章
+    
+    similarity 为 similarity_matrix 返回的相似度矩阵。返回各话题的文章下标，话题按首篇文章的位置排序，
+    每个话题的第一篇为代表文章（与同话题其他文章相似度之和最大的一篇）。
+    """
+    count = len(similarity)
+    if count == 0:
+        return []
+    
+    # 每篇文章之后与它相似度达到阈值的文章；之前的文章在轮到它时都已归类
+    rows, neighbours = np.nonzero(similarity >= threshold)
+    later = neighbours > rows
+    rows, neighbours = rows[later], neighbours[later]
+    bounds = np.searchsorted(rows, np.arange(count + 1)).tolist()
+    
+    leader = np.full(count, -1, dtype=np.int64)
+    for row in range(count):
+        if leader[row] >= 0:
+            continue
+        leader[row] = row
+        if bounds[row] < bounds[row + 1]:
+            candidates = neighbours[bounds[row]:bounds[row + 1]]
+            leader[candidates[leader[candidates] < 0]] = row
+    
+    # 按领头文章分组，组内保持文章顺序
+    order = np.argsort(leader, kind='stable')
+    starts = np.flatnonzero(np.diff(leader[order])) + 1
+    
+    clusters = []
+    for members in np.split(order, starts):
+        center = members[0]
+        if len(members) > 1:
+            center = members[np.argmax(similarity[np.ix_(members, members)].sum(axis=1))]
+        clusters.append([int(center)] + [int(member) for member in members if member != center])
+    
+    return clusters
+
+
+class TopicClusterer:
+    """话题聚类：把邮件中的文章按TF-IDF相似度分组，每组选一篇代表文章"""
+    
+    def __init__(self, config_file: str = 'config.ini'):
+        self.config = configparser.ConfigParser()
+        self.config.read(config_file, encoding='utf-8')
+        self.logger = logging.getLogger(__name__)
+        
+        self.enabled = self.config.getboolean('scraping', 'topic_clustering', fallback=True)
+        self.threshold = float(self.config.get('scraping', 'topic_similarity_threshold', fallback='0.3'))
+        self.max_features = int(self.config.get('scraping', 'topic_max_features', fallback='2048'))
+    
+    def cluster(self, articles: List[Dict]) -> List[Dict]:
+        """返回各话题的代表文章（同话题的其他文章放在 topic_articles 中），未启用或失败时原样返回"""
+        if not self.enabled or np is None or len(articles) < 2:
+            return articles
+        
+        try:
+            similarity = similarity_matrix(
+                [f"{article['title']} {article.get('summary', '')}" for article in articles],
+                self.max_features
+            )
+            
+            topics = []
+            for members in cluster_rows(similarity, self.threshold):
+                representative = articles[members[0]]
+                representative['topic_articles'] = [articles[index] for index in members[1:]]
+                topics.append(representative)
+            
+            self.logger.info(f"{len(articles)} 篇文章聚合为 {len(topics)} 个话题")
+            return topics
+        
+        except Exception as e:
+            self.logger.error(f"话题聚类失败: {str(e)}")
+            return articles
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关性模型离线训练
+从数据库中已标注的文章（articles.label，1 相关 / 0 不相关）训练学习模型并保存，
+之后在 config.ini 中设置 relevance_scorer = model 即可用于筛选
+用法: python train_relevance_model.py [--config config.ini] [--output relevance_model.npz]
+"""
+
+import os
+import sys
+import time
+import argparse
+import configparser
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import NewsDatabase
+from relevance_model import RelevanceModel
+
+
+def evaluate(model: RelevanceModel, texts, labels):
+    """计算精确率和召回率"""
+    labels = np.asarray(labels, dtype=bool)
+    predicted = model.predict_proba(texts) >= model.threshold
+    true_positive = int((predicted & labels).sum())
+    precision = true_positive / max(int(predicted.sum()), 1)
+    recall = true_positive / max(int(labels.sum()), 1)
+    return precision, recall
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='从已标注文章训练相关性模型')
+    parser.add_argument('--config', default='config.ini', help='配置文件')
+    parser.add_argument('--output', help='模型文件（默认使用配置中的 relevance_model_file）')
+    parser.add_argument('--feature-bits', type=int, default=18, help='哈希特征空间大小为 2 的多少次方')
+    parser.add_argument('--threshold', type=float, default=0.5, help='判为相关的最低概率')
+    parser.add_argument('--holdout', type=float, default=0.2, help='留出多少比例的数据评估效果')
+    args = parser.parse_args()
+
+    config = configparser.ConfigParser()
+    config.read(args.config, encoding='utf-8')
+    output = args.output or config.get('scraping', 'relevance_model_file', fallback='relevance_model.npz')
+
+    articles = NewsDatabase(args.config).get_labeled_articles()
+    texts = [f"{article['title']} {article['summary']}" for article in articles]
+    labels = [article['label'] for article in articles]
+    positive = sum(1 for label in labels if label)
+    print(f"已标注文章: {len(articles)} 篇（相关 {positive} 篇，不相关 {len(articles) - positive} 篇）")
+
+    # 留出一部分数据评估，再用全部数据训练最终模型
+    order = np.random.default_rng(0).permutation(len(articles))
+    split = int(len(articles) * (1 - args.holdout))
+    train_index, test_index = order[:split], order[split:]
+    if args.holdout > 0 and len(test_index):
+        try:
+            model = RelevanceModel.train([texts[i] for i in train_index], [labels[i] for i in train_index],
+                                         args.feature_bits, threshold=args.threshold)
+            precision, recall = evaluate(model, [texts[i] for i in test_index], [labels[i] for i in test_index])
+            print(f"留出数据评估: 精确率 {precision:.2%}，召回率 {recall:.2%}")
+        except ValueError as e:
+            print(f"跳过留出评估: {e}")
+
+    try:
+        model = RelevanceModel.train(texts, labels, args.feature_bits, threshold=args.threshold)
+    except ValueError as e:
+        print(f"❌ 训练失败: {e}")
+        sys.exit(1)
+
+    model.save(output)
+    start = time.perf_counter()
+    RelevanceModel.load(output)
+    print(f"✅ 模型已保存: {output}（{os.path.getsize(output)} 字节，"
+          f"加载耗时 {(time.perf_counter() - start) * 1000:.1f} 毫秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database import NewsDatabase
 from email_sender import EmailSender
+from summary_format import render_summary
 
 def verify_summary_feature():
     """验证文章总结功能在邮件中的显示"""
@@ -33,7 +34,7 @@ def verify_summary_feature():
     articles_with_keywords = 0
     
     for article in all_articles:
-        if article.get('ai_summary'):
+        if render_summary(article):
             articles_with_summary += 1
         if article.get('detected_keywords'):
             articles_with_keywords += 1
@@ -57,7 +58,7 @@ def verify_summary_feature():
                 print(f"   🏷️  关键词: ❌ 无")
             
             # AI总结检查
-            summary = article.get('ai_summary', '')
+            summary = render_summary(article).strip()
             if summary:
                 summary_preview = summary.split('\n')[0] if summary else ''
                 print(f"   🤖 AI总结: ✅ 已生成 ({len(summary.split())} 词)")